@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'run_at', 'attempts', 'max_attempts', 'dedup_key', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'dedup_key')
+    readonly_fields = ('created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error')
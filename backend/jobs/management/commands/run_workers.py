@@ -0,0 +1,49 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from jobs.queue import work
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers on a thread pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'JOB_WORKER_CONCURRENCY', 4),
+            help='Number of jobs to run at the same time'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=getattr(settings, 'JOB_POLL_INTERVAL', 1.0),
+            help='Seconds to wait between polls when the queue is empty'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once there are no due jobs left'
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def stop(signum, frame):  # pylint: disable=unused-argument
+            self.stdout.write('Stopping after running jobs finish...')
+            stop_event.set()
+
+        # Heroku and most process managers send SIGTERM on shutdown
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Starting {options['concurrency']} job worker thread(s)")
+        )
+        work(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+            stop_event=stop_event,
+        )
+        self.stdout.write('Job workers stopped.')
@@ -0,0 +1,52 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Model for a unit of deferred work stored in the database queue."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    task = models.CharField(max_length=200, help_text="Registered task name")
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            (QUEUED, 'Queued'),
+            (RUNNING, 'Running'),
+            (SUCCEEDED, 'Succeeded'),
+            (FAILED, 'Failed'),
+        ],
+        default=QUEUED
+    )
+    dedup_key = models.CharField(
+        max_length=200, blank=True, null=True,
+        help_text="Only one queued job may exist per key"
+    )
+    run_at = models.DateTimeField(default=timezone.now, help_text="Earliest time to run")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        """Meta options for Job."""
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'], condition=Q(status='queued'),
+                name='unique_queued_job_dedup_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
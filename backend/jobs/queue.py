@@ -0,0 +1,277 @@
+"""
+Database-backed background job queue.
+
+Tasks are plain functions registered with @task. Enqueuing stores a Job row
+in the same database (and transaction) as the write that caused it, and
+`manage.py run_workers` claims due jobs and runs them on a thread pool. No
+broker is needed: a job is claimed with a conditional UPDATE, so several
+worker processes can safely share one queue.
+
+Failed jobs are retried with exponential backoff until max_attempts. A
+dedup_key keeps at most one queued job per key, and tasks registered with
+every= re-enqueue themselves after each run.
+
+Example:
+    @task(max_attempts=3, backoff=10)
+    def send_digest(user_id):
+        ...
+
+    send_digest.enqueue(user_id=user.id, dedup_key=f'digest:{user.id}')
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Registered tasks by name
+_registry = {}
+
+
+class Task:
+    """A function registered as a background task."""
+
+    def __init__(self, func, name, max_attempts, backoff, every):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.every = every
+        self.__doc__ = func.__doc__
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, dedup_key=None, run_at=None, delay=None, **kwargs):
+        """Queue a run of this task with JSON-serializable keyword arguments."""
+        return enqueue(self.name, kwargs, dedup_key=dedup_key, run_at=run_at, delay=delay)
+
+    def retry_delay(self, attempts):
+        """Return the backoff before retrying after the given attempt count."""
+        seconds = self.backoff * 2 ** max(attempts - 1, 0)
+        return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def task(func=None, *, name=None, max_attempts=5, backoff=30, every=None):
+    """
+    Register a function as a background task.
+    backoff is the first retry delay in seconds (doubled on each attempt);
+    every is a timedelta for tasks that should run periodically.
+    """
+    def decorator(func):
+        registered = Task(
+            func, name or f'{func.__module__}.{func.__name__}',
+            max_attempts, backoff, every
+        )
+        _registry[registered.name] = registered
+        return registered
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_task(name):
+    """Return the registered task with this name, or None."""
+    return _registry.get(name)
+
+
+def enqueue(task_name, kwargs=None, dedup_key=None, run_at=None, delay=None):
+    """
+    Store a job for a registered task and return it.
+    If dedup_key is given and a job with that key is already queued, that
+    job is returned instead of creating a new one.
+    """
+    registered = get_task(task_name)
+    if registered is None:
+        raise LookupError(f'Unknown task: {task_name}')
+
+    if run_at is None:
+        run_at = timezone.now()
+    if delay is not None:
+        run_at += timedelta(seconds=delay) if isinstance(delay, (int, float)) else delay
+
+    if dedup_key:
+        existing = Job.objects.filter(dedup_key=dedup_key, status=Job.QUEUED).first()
+        if existing is not None:
+            return existing
+
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                task=task_name,
+                kwargs=kwargs or {},
+                dedup_key=dedup_key or None,
+                run_at=run_at,
+                max_attempts=registered.max_attempts,
+            )
+    except IntegrityError:
+        # Another process queued the same key between the check and insert
+        if not dedup_key:
+            raise
+        existing = Job.objects.filter(dedup_key=dedup_key, status=Job.QUEUED).first()
+        if existing is None:
+            raise
+        return existing
+
+
+def schedule_periodic():
+    """Make sure every periodic task has a queued job."""
+    for registered in list(_registry.values()):
+        if registered.every is not None:
+            enqueue(registered.name, dedup_key=f'periodic:{registered.name}')
+
+
+def _release(pk, **fields):
+    """
+    Move a claimed job back to the queue, or mark it failed if another
+    job with the same dedup key was queued in the meantime.
+    """
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=pk).update(
+                status=Job.QUEUED, locked_by='', locked_at=None, **fields
+            )
+    except IntegrityError:
+        Job.objects.filter(pk=pk).update(
+            status=Job.FAILED, finished_at=timezone.now(),
+            last_error=fields.get('last_error', '') + '\nSuperseded by a newer queued job.'
+        )
+
+
+def requeue_stale_jobs():
+    """Return jobs whose worker stopped without finishing them to the queue."""
+    timeout = timedelta(seconds=getattr(settings, 'JOB_LOCK_TIMEOUT', 600))
+    stale = Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=timezone.now() - timeout
+    ).values_list('id', flat=True)
+    for pk in stale:
+        _release(pk, last_error='Worker lock expired.')
+
+
+def claim_jobs(worker_id, limit):
+    """Claim up to limit due jobs for this worker and return their ids."""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).values_list('id', flat=True)[:limit * 2]
+
+    claimed = []
+    for pk in candidates:
+        # Only one worker can move a given row out of the queued state
+        updated = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now,
+            attempts=F('attempts') + 1
+        )
+        if updated:
+            claimed.append(pk)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def run_job(pk):
+    """Run one claimed job and record the outcome."""
+    try:
+        job = Job.objects.get(pk=pk)
+        registered = get_task(job.task)
+        try:
+            if registered is None:
+                raise LookupError(f'Unknown task: {job.task}')
+            registered.func(**job.kwargs)
+        except Exception:  # pylint: disable=broad-except
+            error = traceback.format_exc()
+            if registered is not None and job.attempts < job.max_attempts:
+                logger.warning('Job %s (%s) failed, retrying', pk, job.task)
+                _release(
+                    pk, last_error=error,
+                    run_at=timezone.now() + registered.retry_delay(job.attempts)
+                )
+                return
+            logger.error('Job %s (%s) failed permanently\n%s', pk, job.task, error)
+            Job.objects.filter(pk=pk).update(
+                status=Job.FAILED, finished_at=timezone.now(), last_error=error
+            )
+        else:
+            Job.objects.filter(pk=pk).update(
+                status=Job.SUCCEEDED, finished_at=timezone.now(), last_error=''
+            )
+
+        # Periodic tasks schedule their next run once this one has finished
+        if registered is not None and registered.every is not None:
+            enqueue(
+                registered.name, dedup_key=f'periodic:{registered.name}',
+                run_at=timezone.now() + registered.every
+            )
+    finally:
+        close_old_connections()
+
+
+def worker_id():
+    """Return an identifier for this worker process."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def run_pending(limit=None):
+    """
+    Run due jobs in the current thread until none are left (or limit jobs
+    have run) and return the number of jobs run. Useful in tests.
+    """
+    identity = worker_id()
+    count = 0
+    while limit is None or count < limit:
+        claimed = claim_jobs(identity, 1)
+        if not claimed:
+            break
+        run_job(claimed[0])
+        count += 1
+    return count
+
+
+def work(concurrency=None, poll_interval=None, burst=False, stop_event=None):
+    """
+    Claim and run jobs on a thread pool until stop_event is set.
+    With burst=True, return once no due jobs are left.
+    """
+    if concurrency is None:
+        concurrency = getattr(settings, 'JOB_WORKER_CONCURRENCY', 4)
+    if poll_interval is None:
+        poll_interval = getattr(settings, 'JOB_POLL_INTERVAL', 1.0)
+    if stop_event is None:
+        stop_event = threading.Event()
+
+    identity = worker_id()
+    schedule_periodic()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='jobs') as pool:
+        running = set()
+        while not stop_event.is_set():
+            running = {future for future in running if not future.done()}
+            claimed = []
+            free = concurrency - len(running)
+            if free > 0:
+                requeue_stale_jobs()
+                claimed = claim_jobs(identity, free)
+                running.update(pool.submit(run_job, pk) for pk in claimed)
+            close_old_connections()
+
+            if claimed:
+                continue
+            if running:
+                wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            elif burst:
+                break
+            else:
+                stop_event.wait(poll_interval)
@@ -0,0 +1,17 @@
+"""Housekeeping tasks for the job queue."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import task
+
+
+@task(every=timedelta(days=1))
+def purge_finished_jobs():
+    """Delete succeeded and failed jobs older than JOB_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'JOB_RETENTION_DAYS', 7))
+    Job.objects.filter(
+        status__in=[Job.SUCCEEDED, Job.FAILED], finished_at__lt=cutoff
+    ).delete()
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from users.models import User
+from users.tasks import flush_expired_tokens
+from .models import Job
+from .queue import run_pending, schedule_periodic, task
+
+# Calls made to the test tasks, reset by each test
+calls = []
+
+
+@task(name='jobs.tests.record', max_attempts=3)
+def record(value):
+    calls.append(value)
+
+
+@task(name='jobs.tests.flaky', max_attempts=2, backoff=60)
+def flaky(fail_times):
+    calls.append('flaky')
+    if len(calls) <= fail_times:
+        raise RuntimeError('Temporary failure')
+
+
+class QueueTests(TestCase):
+    """Enqueuing, retries and periodic scheduling of database-backed jobs."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_runs_job(self):
+        job = record.enqueue(value='a')
+        self.assertEqual(job.max_attempts, 3)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['a'])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 1))
+
+    def test_dedup_key_keeps_one_queued_job(self):
+        first = record.enqueue(value='a', dedup_key='record')
+        second = record.enqueue(value='b', dedup_key='record')
+        self.assertEqual(first.pk, second.pk)
+
+        # The constraint also holds for inserts that skip the lookup
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(task=record.name, dedup_key='record')
+
+        run_pending()
+        self.assertEqual(calls, ['a'])
+        # A finished job no longer blocks its key
+        self.assertNotEqual(record.enqueue(value='c', dedup_key='record').pk, first.pk)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = flaky.enqueue(fail_times=1)
+        started = timezone.now()
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.assertEqual(run_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('Temporary failure', job.last_error)
+        delay = job.run_at - started
+        self.assertTrue(timedelta(seconds=48) <= delay <= timedelta(seconds=73))
+        # Not due yet
+        self.assertEqual(run_pending(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 2))
+
+    def test_job_fails_after_max_attempts(self):
+        job = flaky.enqueue(fail_times=5)
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            run_pending()
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(len(calls), 2)
+
+    def test_periodic_jobs_are_rescheduled(self):
+        user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        OutstandingToken.objects.create(
+            user=user, jti='expired', token='token',
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        schedule_periodic()
+        dedup_key = f'periodic:{flush_expired_tokens.name}'
+        self.assertEqual(Job.objects.filter(dedup_key=dedup_key).count(), 1)
+        run_pending()
+
+        self.assertFalse(OutstandingToken.objects.filter(jti='expired').exists())
+        jobs = Job.objects.filter(dedup_key=dedup_key)
+        self.assertEqual(
+            sorted(jobs.values_list('status', flat=True)), [Job.QUEUED, Job.SUCCEEDED]
+        )
+        next_run = jobs.get(status=Job.QUEUED).run_at - timezone.now()
+        self.assertTrue(timedelta(hours=23) < next_run <= timedelta(days=1))
+        # Every periodic task has its next run queued, and none is due
+        self.assertFalse(Job.objects.exclude(status__in=(Job.QUEUED, Job.SUCCEEDED)).exists())
+        self.assertEqual(run_pending(), 0)
@@ -0,0 +1,169 @@
+"""
+Admission control and load shedding.
+
+AdmissionControlMiddleware sorts requests into route classes: 'low' for the
+URL names in ADMISSION_LOW_PRIORITY_ROUTES (recommendations, facets and
+similar nice-to-have work) and 'core' for everything else. For each class it
+tracks the requests in flight and an exponentially weighted moving average
+of recent latency.
+
+Core requests are always admitted. Low-priority requests are rejected with
+a fast 503 and a Retry-After header while the worker looks overloaded:
+
+- more than ADMISSION_MAX_IN_FLIGHT requests in flight in this worker, or
+  ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT low-priority ones;
+- the request waited in the router/proxy queue (X-Request-Start header, as
+  set by Heroku and nginx) longer than ADMISSION_MAX_QUEUE_TIME seconds;
+- recent core latency is above ADMISSION_MAX_LATENCY seconds.
+
+Gunicorn sync workers serve one request at a time, so for them the queue
+time and latency signals are the ones that trigger. The middleware runs
+natively under ASGI as well, where the in-flight limits count the requests
+on the worker's event loop.
+"""
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+CORE = 'core'
+LOW = 'low'
+
+# Weight of the newest sample in the latency average
+LATENCY_ALPHA = 0.2
+
+# Latency averages older than this (seconds) no longer count as recent
+LATENCY_WINDOW = 10.0
+
+
+class RouteStats:
+    """In-flight count and recent latency of one route class."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency = 0.0
+        self.updated = 0.0
+
+    def recent_latency(self, now):
+        """Return the latency average, or 0 if no request finished recently."""
+        if now - self.updated > LATENCY_WINDOW:
+            return 0.0
+        return self.latency
+
+    def record(self, seconds, now):
+        """Fold a finished request's latency into the average."""
+        if now - self.updated > LATENCY_WINDOW:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_ALPHA * (seconds - self.latency)
+        self.updated = now
+
+
+def queue_time(request, now):
+    """Return seconds the request waited before reaching Django, if known."""
+    header = request.headers.get('X-Request-Start', '')
+    # Heroku sends epoch milliseconds, nginx "t=<epoch seconds>"
+    value = header[2:] if header.startswith('t=') else header
+    try:
+        started = float(value)
+    except ValueError:
+        return 0.0
+    if started > 1e11:
+        started /= 1000
+    return max(0.0, now - started)
+
+
+class AdmissionControlMiddleware:
+    """Shed low-priority requests with a 503 while the worker is overloaded."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.lock = threading.Lock()
+        self.stats = {CORE: RouteStats(), LOW: RouteStats()}
+        self.in_flight = 0
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = self.enter()
+        try:
+            return self.get_response(request)
+        finally:
+            self.leave(request, started)
+
+    async def __acall__(self, request):
+        started = self.enter()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.leave(request, started)
+
+    def enter(self):
+        """Count a request in flight and return its start time."""
+        with self.lock:
+            self.in_flight += 1
+        return time.monotonic()
+
+    def leave(self, request, started):
+        """Stop counting a finished request and record its latency."""
+        finished = time.monotonic()
+        route_class = getattr(request, 'route_class', None)
+        with self.lock:
+            self.in_flight -= 1
+            if route_class is not None:
+                stats = self.stats[route_class]
+                stats.in_flight -= 1
+                if not getattr(request, 'shed', False):
+                    stats.record(finished - started, finished)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Classify the request and reject it if it can be shed."""
+        low_priority = getattr(settings, 'ADMISSION_LOW_PRIORITY_ROUTES', ())
+        match = request.resolver_match
+        route_class = LOW if match is not None and match.url_name in low_priority else CORE
+
+        reason = self.shed_reason(request) if route_class == LOW else None
+        with self.lock:
+            request.route_class = route_class
+            self.stats[route_class].in_flight += 1
+        if reason is None:
+            return None
+
+        request.shed = True
+        logger.warning('Shedding %s (%s)', request.path, reason)
+        retry_after = getattr(settings, 'ADMISSION_RETRY_AFTER', 5)
+        response = JsonResponse(
+            {'detail': 'The server is busy. Please try again later.'}, status=503
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def shed_reason(self, request):
+        """Return why a low-priority request should be shed, or None."""
+        now = time.monotonic()
+        with self.lock:
+            in_flight = self.in_flight
+            low_in_flight = self.stats[LOW].in_flight
+            core_latency = self.stats[CORE].recent_latency(now)
+
+        if in_flight > getattr(settings, 'ADMISSION_MAX_IN_FLIGHT', 32):
+            return f'{in_flight} requests in flight'
+        if low_in_flight >= getattr(settings, 'ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT', 4):
+            return f'{low_in_flight} low-priority requests in flight'
+        waited = queue_time(request, time.time())
+        if waited > getattr(settings, 'ADMISSION_MAX_QUEUE_TIME', 1.0):
+            return f'queued for {waited:.2f}s'
+        if core_latency > getattr(settings, 'ADMISSION_MAX_LATENCY', 1.0):
+            return f'core latency {core_latency:.2f}s'
+        return None
@@ -1,11 +1,32 @@
 """
 ASGI config for recipe_app project.
+
+Serves the same site as wsgi.py, but routes GET requests for the hot read
+endpoints (recipe feed, detail, comments and ingredients) to the async views
+in recipes.async_views via recipe_app.asgi_urls. Run it with uvicorn workers:
+
+    gunicorn --pythonpath backend recipe_app.asgi -k uvicorn.workers.UvicornWorker
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recipe_app.settings')
 
-application = get_asgi_application()
+ASYNC_URLCONF = 'recipe_app.asgi_urls'
+
+
+class RecipeASGIHandler(ASGIHandler):
+    """ASGI handler that resolves requests against the async URLconf."""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASYNC_URLCONF
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = RecipeASGIHandler()
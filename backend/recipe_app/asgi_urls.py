@@ -0,0 +1,18 @@
+"""
+URL configuration used by the ASGI application.
+Puts the async read views in front of the regular URL patterns; anything
+they do not handle resolves exactly as it does under WSGI.
+"""
+from django.urls import path
+
+from recipes import async_views
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('api/recipes/', async_views.recipe_list),
+    path('api/recipes/<int:pk>/', async_views.recipe_detail),
+    path('api/recipes/<int:recipe_id>/comments/', async_views.recipe_comments),
+    path('api/ingredients/categories/', async_views.ingredient_categories),
+    path('api/ingredients/', async_views.ingredient_items),
+    *wsgi_urlpatterns,
+]
@@ -0,0 +1,160 @@
+"""
+Background image processing for uploaded pictures.
+
+When a model's image field changes, a job is queued for the background
+workers (see jobs.queue), which use Pillow to write fixed-width JPEG and WebP
+thumbnails and a tiny blurred placeholder. The results are stored in a JSON "variants" field
+on the same row, so serializers can return variant URLs without touching the
+files. The request thread never decodes the image.
+
+Variants JSON layout:
+    {
+        "source": "recipe_images/pie.jpg",
+        "thumbnails": {"320": {"jpeg": "...", "webp": "..."}, ...},
+        "placeholder": "data:image/jpeg;base64,..."
+    }
+"""
+import base64
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps
+from rest_framework import serializers
+
+from jobs.queue import task
+
+PLACEHOLDER_WIDTH = 16
+
+
+def variants_are_current(file, variants):
+    """Return True if the stored variants were generated from this file."""
+    if not file:
+        return not variants
+    return bool(variants) and variants.get('source') == file.name
+
+
+def schedule_variants(instance, field_name, variants_field):
+    """
+    Queue variant generation for an instance whose image changed.
+    The job is stored in the same transaction as the write; does nothing if
+    the stored variants already match the current file.
+    """
+    file = getattr(instance, field_name)
+    if variants_are_current(file, getattr(instance, variants_field)):
+        return
+
+    label = instance._meta.label
+    generate_variants.enqueue(
+        model_label=label, pk=instance.pk,
+        field_name=field_name, variants_field=variants_field,
+        dedup_key=f'image-variants:{label}:{instance.pk}:{field_name}',
+    )
+
+
+def _encode(image, image_format, **options):
+    """Encode a Pillow image into bytes."""
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _variant_name(source_name, suffix):
+    """Build the storage name of a variant next to its source file."""
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f'{stem}_{suffix}')
+
+
+@task(max_attempts=3, backoff=10)
+def generate_variants(model_label, pk, field_name, variants_field):
+    """Generate thumbnails, WebP variants and a placeholder for one row."""
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).only(field_name, variants_field).first()
+    if instance is None:
+        return
+
+    file = getattr(instance, field_name)
+    if variants_are_current(file, getattr(instance, variants_field)):
+        return
+
+    # Variant files are content-addressed and may be shared, so old ones are
+    # left in place rather than deleted here
+    storage = file.storage if file else model._meta.get_field(field_name).storage
+
+    variants = {}
+    if file:
+        with file.open('rb'):
+            with Image.open(file) as original:
+                image = ImageOps.exif_transpose(original).convert('RGB')
+
+        thumbnails = {}
+        for width in getattr(settings, 'IMAGE_THUMBNAIL_WIDTHS', (320, 640)):
+            resized = image
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+            thumbnails[str(width)] = {
+                'jpeg': storage.save(
+                    _variant_name(file.name, f'{width}.jpg'),
+                    ContentFile(_encode(resized, 'JPEG', quality=82, optimize=True,
+                                        progressive=True))
+                ),
+                'webp': storage.save(
+                    _variant_name(file.name, f'{width}.webp'),
+                    ContentFile(_encode(resized, 'WEBP', quality=80, method=4))
+                ),
+            }
+
+        placeholder = image.copy()
+        placeholder.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+        placeholder = placeholder.filter(ImageFilter.GaussianBlur(1))
+        encoded = base64.b64encode(_encode(placeholder, 'JPEG', quality=40)).decode()
+
+        variants = {
+            'source': file.name,
+            'thumbnails': thumbnails,
+            'placeholder': f'data:image/jpeg;base64,{encoded}',
+        }
+
+    # Only store the result if the image was not replaced in the meantime;
+    # update() skips signals so this does not schedule another run
+    rows = model.objects.filter(pk=pk)
+    if file:
+        rows = rows.filter(**{field_name: file.name})
+    rows.update(**{variants_field: variants})
+
+
+def variant_urls(variants, storage, request=None):
+    """
+    Return the API representation of stored variants: thumbnail URLs per
+    width and format plus the inline placeholder, or None if not generated.
+    """
+    if not variants:
+        return None
+
+    def url(name):
+        value = storage.url(name)
+        return request.build_absolute_uri(value) if request is not None else value
+
+    return {
+        'thumbnails': {
+            width: {image_format: url(name) for image_format, name in formats.items()}
+            for width, formats in variants.get('thumbnails', {}).items()
+        },
+        'placeholder': variants.get('placeholder'),
+    }
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Read-only serializer field returning variant URLs for an image field."""
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = self.parent.Meta.model._meta.get_field(self.image_field).storage
+        return variant_urls(value, storage, self.context.get('request'))
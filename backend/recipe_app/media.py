@@ -0,0 +1,75 @@
+"""
+Media file serving.
+
+Uploaded files are handed off to the front web server when one is
+configured (X-Accel-Redirect for nginx, X-Sendfile for Apache/lighttpd);
+otherwise they are streamed with FileResponse, which WSGI servers such as
+gunicorn send with sendfile(). Content-hashed files are served with
+Cache-Control: immutable and every response carries an ETag.
+"""
+import mimetypes
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+from .storage import is_hashed_name
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MUTABLE_MAX_AGE = 60 * 60
+
+
+def _etag(path, stat):
+    """Return the ETag for a media file."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if is_hashed_name(path):
+        return f'"{stem}"'
+    return f'"{int(stat.st_mtime)}-{stat.st_size}"'
+
+
+def _add_caching_headers(response, path, etag, stat):
+    """Set ETag, Last-Modified and Cache-Control on a media response."""
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if is_hashed_name(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MUTABLE_MAX_AGE)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve an uploaded file from MEDIA_ROOT."""
+    # safe_join raises SuspiciousFileOperation (400) for paths outside MEDIA_ROOT
+    full_path = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+
+    stat = os.stat(full_path)
+    etag = _etag(path, stat)
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        return _add_caching_headers(HttpResponseNotModified(), path, etag, stat)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    mode = getattr(settings, 'MEDIA_SENDFILE_MODE', '')
+
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        # pylint: disable=consider-using-with
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = stat.st_size
+    if encoding:
+        response['Content-Encoding'] = encoding
+
+    return _add_caching_headers(response, path, etag, stat)
@@ -0,0 +1,147 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+ReplicaMiddleware marks GET/HEAD requests handled by the recipe views
+(REPLICA_READ_VIEW_MODULES) and picks one alias from DATABASE_REPLICAS for
+the whole request; ReadReplicaRouter sends that request's reads there. All
+writes, and every other request, use the primary ('default').
+
+After a client sends a write request, its reads stay on the primary for
+REPLICA_STICKY_SECONDS so it never sees a replica that has not caught up
+yet. The window is tracked in a cookie for browsers and, for API clients,
+in a PrimaryReadWindow row on the primary keyed by a hash of the
+Authorization header, so every worker sees it. Checking the row costs one
+primary key lookup per replica read that has a token but no cookie.
+"""
+import hashlib
+import random
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+STICKY_COOKIE_NAME = 'primary_until'
+
+# Database alias for reads in the current request, or None for the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replicas():
+    """Return the configured replica aliases."""
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _sticky_key(request):
+    """Return the key identifying an API client, or None."""
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return hashlib.sha1(authorization.encode()).hexdigest()
+
+
+def _windows():
+    """Return the PrimaryReadWindow rows on the primary."""
+    # Imported here: the router is loaded before the apps are ready
+    from recipes.models import PrimaryReadWindow
+    return PrimaryReadWindow.objects.using(DEFAULT_DB_ALIAS)
+
+
+def is_sticky(request):
+    """Return True if the client wrote recently and must read the primary."""
+    try:
+        if float(request.COOKIES.get(STICKY_COOKIE_NAME, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _sticky_key(request)
+    return key is not None and _windows().filter(key=key, until__gt=timezone.now()).exists()
+
+
+def mark_sticky(request, response):
+    """Keep the client's reads on the primary for the sticky window."""
+    seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+    until = time.time() + seconds
+    response.set_cookie(STICKY_COOKIE_NAME, f'{until:.3f}', max_age=seconds, samesite='Lax')
+    key = _sticky_key(request)
+    if key is not None:
+        _windows().update_or_create(
+            key=key, defaults={'until': timezone.now() + timedelta(seconds=seconds)}
+        )
+
+
+class ReplicaMiddleware:
+    """Route reads of recipe view requests to a replica unless sticky."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if request.method not in SAFE_METHODS and get_replicas():
+            mark_sticky(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _read_alias.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if request.method not in SAFE_METHODS and get_replicas():
+            await sync_to_async(mark_sticky)(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Pick a replica for safe requests to the replica-enabled views."""
+        replicas = get_replicas()
+        if not replicas or request.method not in SAFE_METHODS:
+            return None
+        modules = getattr(settings, 'REPLICA_READ_VIEW_MODULES', ('recipes.views',))
+        if view_func.__module__ in modules and not is_sticky(request):
+            _read_alias.set(random.choice(replicas))
+        return None
+
+
+class ReadReplicaRouter:
+    """Database router that reads from the replica chosen for the request."""
+
+    def db_for_read(self, model, **hints):
+        """Use the request's replica, if any, for reads."""
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        """Always write to the primary, even for objects read from a replica."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Replicas hold the same data, so relations across them are fine."""
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Only migrate the primary; replicas receive its schema and data."""
+        if db in get_replicas():
+            return False
+        return None
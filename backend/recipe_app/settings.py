@@ -5,6 +5,7 @@ Django settings for recipe_app project.
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+import importlib.util
 import dj_database_url
 import os
 
@@ -39,20 +40,24 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'recipes',
     'users',
+    'jobs',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'recipe_app.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'recipe_app.static_files.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'recipe_app.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'recipe_app.urls'
@@ -89,11 +94,55 @@ if 'ON_HEROKU' in os.environ:
 else:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'recipe_app.sqlite_backend',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Keep connections open between requests (seconds)
+            'CONN_MAX_AGE': config('SQLITE_CONN_MAX_AGE', default=600, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Applied to every new connection by recipe_app.sqlite_backend
+                'pragmas': {
+                    'journal_mode': 'wal',
+                    'synchronous': 'normal',
+                    'busy_timeout': 5000,
+                    'cache_size': -20000,  # negative = KiB, i.e. 20 MB
+                    'mmap_size': 134217728,  # 128 MB
+                    'temp_store': 'memory',
+                },
+                'transaction_mode': 'IMMEDIATE',
+            },
         }
     }
 
+# Read replicas: GET requests to the recipe views read from one of these
+# (see recipe_app/replicas.py). On Heroku list replica URLs in
+# DATABASE_REPLICA_URLS; locally SQLITE_REPLICAS creates file copies of
+# db.sqlite3 that `python manage.py sync_sqlite_replicas` keeps in sync.
+if 'ON_HEROKU' in os.environ:
+    _replica_urls = [
+        url for url in config('DATABASE_REPLICA_URLS', default='').split(',') if url
+    ]
+    for _index, _url in enumerate(_replica_urls, start=1):
+        DATABASES[f'replica_{_index}'] = {
+            **dj_database_url.parse(
+                _url, conn_max_age=600, conn_health_checks=True, ssl_require=True
+            ),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    for _index in range(1, config('SQLITE_REPLICAS', default=0, cast=int) + 1):
+        DATABASES[f'replica_{_index}'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / f'db.replica_{_index}.sqlite3',
+            'TEST': {'MIRROR': 'default'},
+        }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['recipe_app.replicas.ReadReplicaRouter']
+REPLICA_READ_VIEW_MODULES = ('recipes.views', 'recipes.async_views')
+# Seconds a client's reads stay on the primary after it sends a write
+REPLICA_STICKY_SECONDS = 5
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -125,37 +174,157 @@ STATICFILES_DIRS = [
     BASE_DIR.parent / 'frontend' / 'build' / 'static',
 ] if (BASE_DIR.parent / 'frontend' / 'build' / 'static').exists() else []
 
-# Whitenoise configuration for serving static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Whitenoise serves static files; uploads are stored under content-hash names
+STORAGES = {
+    'default': {
+        'BACKEND': 'recipe_app.storage.HashedMediaStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Catalog snapshot (`manage.py build_catalog_snapshot`), served from
+# CATALOG_SNAPSHOT_ROOT by recipe_app.static_files; the build state for
+# incremental rebuilds is kept outside the served directory
+CATALOG_SNAPSHOT_URL = '/catalog/'
+CATALOG_SNAPSHOT_ROOT = config('CATALOG_SNAPSHOT_ROOT', default=str(BASE_DIR / 'catalog'))
+CATALOG_SNAPSHOT_STATE_FILE = config(
+    'CATALOG_SNAPSHOT_STATE_FILE', default=str(BASE_DIR / 'catalog.state.json')
+)
+
+# Server-rendered recipe pages (recipes/pages.py): browsers and shared caches
+# may reuse the feed page for PAGE_CACHE_MAX_AGE seconds and serve it stale
+# while revalidating (a cheap ETag check) for PAGE_STALE_WHILE_REVALIDATE.
+# Recipe detail pages are reused for RECIPE_PAGE_MAX_AGE seconds and never
+# served stale, so a recipe made private drops out of caches quickly.
+PAGE_CACHE_MAX_AGE = 300
+PAGE_STALE_WHILE_REVALIDATE = 86400
+RECIPE_PAGE_MAX_AGE = 60
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hand media downloads to the front web server: '' (stream from Django),
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd)
+MEDIA_SENDFILE_MODE = config('MEDIA_SENDFILE_MODE', default='')
+# Internal nginx location that maps to MEDIA_ROOT for X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+
+# Uploaded images get these thumbnail widths (JPEG + WebP) in the background
+IMAGE_THUMBNAIL_WIDTHS = (320, 640)
+
+# Background job queue (run with `python manage.py run_workers`)
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=4, cast=int)
+JOB_POLL_INTERVAL = 1.0
+# Running jobs locked for longer than this (seconds) are requeued
+JOB_LOCK_TIMEOUT = 600
+# Finished jobs are purged after this many days
+JOB_RETENTION_DAYS = 7
+
+# Admission control (recipe_app/admission.py): low-priority routes get a 503
+# while a worker is overloaded; everything else is always admitted
+ADMISSION_LOW_PRIORITY_ROUTES = ('recommended-recipes', 'recipe-facets')
+ADMISSION_MAX_IN_FLIGHT = config('ADMISSION_MAX_IN_FLIGHT', default=32, cast=int)
+ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT = 4
+ADMISSION_MAX_QUEUE_TIME = 1.0  # seconds waited in the router queue
+ADMISSION_MAX_LATENCY = 1.0  # seconds, recent average of core requests
+ADMISSION_RETRY_AFTER = 5  # seconds
+
+# Change feed (/api/changes/): entries older than the retention are purged daily
+CHANGE_LOG_RETENTION_DAYS = 30
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
+# Optional in-memory columnar recipe catalog (requires NumPy)
+RECIPE_CATALOG_ENABLED = config('RECIPE_CATALOG_ENABLED', default=False, cast=bool)
+RECIPE_CATALOG_MAX_AGE = 60  # seconds before a full rebuild
+
+# In-memory ingredient catalog snapshot, rebuilt on ingredient writes
+INGREDIENT_CATALOG_MAX_AGE = 300  # seconds before a rebuild to catch other workers' writes
+
+# Optional MessagePack support for internal bulk clients
+MSGPACK_ENABLED = importlib.util.find_spec('msgpack') is not None
+
+# Caches; throttle buckets (recipe_app/throttling.py) use their own cache,
+# local to each worker unless THROTTLE_CACHE_DIR points all workers at a
+# shared file-based cache. Culled buckets start full again, so
+# THROTTLE_MAX_ENTRIES should exceed the number of recently active clients
+THROTTLE_MAX_ENTRIES = config('THROTTLE_MAX_ENTRIES', default=100000, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+        'OPTIONS': {'MAX_ENTRIES': THROTTLE_MAX_ENTRIES},
+    },
+}
+THROTTLE_CACHE_DIR = config('THROTTLE_CACHE_DIR', default='')
+if THROTTLE_CACHE_DIR:
+    CACHES['throttle'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': THROTTLE_CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': THROTTLE_MAX_ENTRIES},
+    }
+
+# Token-bucket throttling can be turned off, e.g. for load tests
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_PAGINATION_CLASS': 'recipes.pagination.RecipePagination',
+    # orjson-backed JSON when installed, stdlib JSON otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'recipes.renderers.FastJSONRenderer',
+        *(['recipes.renderers.MessagePackRenderer'] if MSGPACK_ENABLED else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'recipe_app.throttling.ClientRateThrottle',
+        'recipe_app.throttling.RouteRateThrottle',
+    ] if THROTTLE_ENABLED else [],
+    # "<requests>/<period>[:<burst>]" per client (user, or IP when anonymous)
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '120/min:60',
+        'user': '600/min:120',
+        # Route classes
+        'login': '10/min:5',
+        'search': '60/min:20',
+        'recommendations': '30/min:10',
+    },
 }
 
+if 'ON_HEROKU' in os.environ:
+    # Client IPs for throttling come from the Heroku router's X-Forwarded-For
+    REST_FRAMEWORK['NUM_PROXIES'] = 1
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    # Rotated refresh tokens are blacklisted by jti (unique, indexed); expired
+    # rows are purged daily by users.tasks.flush_expired_tokens
+    'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Per-process cache of users resolved from JWTs (see users/authentication.py)
+JWT_USER_CACHE_TTL = 60  # seconds
+JWT_USER_CACHE_MAX_SIZE = 1024
+
 # CORS settings
 if 'ON_HEROKU' in os.environ:
     # In production, allow requests from the Heroku app
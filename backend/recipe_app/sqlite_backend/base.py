@@ -0,0 +1,55 @@
+"""
+SQLite backend with a production tuning profile.
+
+Applies the PRAGMA statements listed in OPTIONS['pragmas'] to every new
+connection (WAL journal, synchronous=NORMAL, memory-mapped I/O, a larger page
+cache, busy_timeout and in-memory temp storage by default) and can start
+transactions with BEGIN IMMEDIATE (OPTIONS['transaction_mode']), so writers
+queue on busy_timeout instead of failing with "database is locked" when a
+read transaction tries to upgrade to a write.
+
+Usage:
+    DATABASES = {'default': {
+        'ENGINE': 'recipe_app.sqlite_backend',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'pragmas': {...}, 'transaction_mode': 'IMMEDIATE'},
+    }}
+"""
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 134217728,
+    'temp_store': 'memory',
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """sqlite3 DatabaseWrapper that tunes each new connection."""
+
+    def get_connection_params(self):
+        """Remove this backend's options before they reach sqlite3.connect()."""
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        """Open a connection and apply the configured pragmas."""
+        connection = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict['OPTIONS'].get('pragmas', DEFAULT_PRAGMAS)
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        """Start atomic blocks with the configured BEGIN mode."""
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            mode = 'DEFERRED'
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,95 @@
+"""
+Static file serving.
+
+StaticFilesMiddleware is WhiteNoise plus the catalog snapshot files written
+by `manage.py build_catalog_snapshot` (recipes.catalog_snapshot), served
+from CATALOG_SNAPSHOT_ROOT under CATALOG_SNAPSHOT_URL before any view runs.
+WhiteNoise indexes its files once at startup, but snapshot bundles appear
+and latest.json is replaced while workers run, so snapshot files are looked
+up on the filesystem per request. Content-versioned bundles
+(catalog.<version>.json/.idx) are served with Cache-Control: immutable and
+their .gz/.br siblings are chosen by Accept-Encoding.
+
+Under ASGI the middleware runs natively: requests for other paths go
+straight to the next handler, and only lookups that touch the filesystem
+and serving a file run in a thread.
+"""
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import IsDirectoryError, MissingFileError
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+VERSIONED_SNAPSHOT_RE = re.compile(r'^catalog\.[0-9a-f]{16}\.(?:json|idx)$')
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that also serves the catalog snapshot."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        # Set before WhiteNoise indexes its files, which calls immutable_file_test()
+        self.snapshot_prefix = ensure_leading_trailing_slash(
+            getattr(settings, 'CATALOG_SNAPSHOT_URL', '/catalog/')
+        )
+        root = getattr(settings, 'CATALOG_SNAPSHOT_ROOT', None)
+        self.snapshot_root = os.path.join(os.path.abspath(root), '') if root else None
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        static_file = self.lookup(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        path = request.path_info
+        if self.autorefresh or self.is_snapshot_url(path):
+            static_file = await sync_to_async(self.lookup)(path)
+        else:
+            static_file = self.files.get(path)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+    def is_snapshot_url(self, url):
+        """Return True if url is under the catalog snapshot prefix."""
+        return bool(self.snapshot_root) and url.startswith(self.snapshot_prefix)
+
+    def lookup(self, path):
+        """Return the StaticFile for a request path, or None."""
+        if self.is_snapshot_url(path):
+            static_file = self.find_snapshot_file(path)
+            if static_file is not None:
+                return static_file
+        if self.autorefresh:
+            return self.find_file(path)
+        return self.files.get(path)
+
+    def find_snapshot_file(self, url):
+        """Return the StaticFile for a snapshot URL, or None."""
+        name = url[len(self.snapshot_prefix):]
+        if not name or '/' in name or name.startswith('.') or not self.url_is_canonical(url):
+            return None
+        path = os.path.join(self.snapshot_root, name)
+        if self.is_compressed_variant(path):
+            return None
+        try:
+            return self.get_static_file(path, url)
+        except (IsDirectoryError, MissingFileError):
+            return None
+
+    def immutable_file_test(self, path, url):
+        if self.is_snapshot_url(url):
+            return bool(VERSIONED_SNAPSHOT_RE.match(url[len(self.snapshot_prefix):]))
+        return super().immutable_file_test(path, url)
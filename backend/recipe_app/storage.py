@@ -0,0 +1,49 @@
+"""
+Content-addressed storage for uploaded media.
+
+Files are saved under a name derived from the SHA-256 of their content
+(e.g. recipe_images/3f5a...e1.jpg), so a URL always refers to the same
+bytes and can be cached forever. Uploading identical content reuses the
+existing file. Because files may be shared, they are never overwritten.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+# Number of hex digits of the SHA-256 digest used in file names
+HASH_LENGTH = 20
+
+HASHED_NAME_RE = re.compile(rf'^[0-9a-f]{{{HASH_LENGTH}}}$')
+
+
+def is_hashed_name(name):
+    """Return True if a storage name was produced by HashedMediaStorage."""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return bool(HASHED_NAME_RE.match(stem))
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """FileSystemStorage that names files by the hash of their content."""
+
+    def save(self, name, content, max_length=None):
+        """Save content under its content-hash name, reusing identical files."""
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        directory, filename = os.path.split(str(name).replace('\\', '/'))
+        extension = os.path.splitext(filename)[1].lower()
+        hashed_name = os.path.join(directory, digest.hexdigest()[:HASH_LENGTH] + extension)
+
+        if self.exists(hashed_name):
+            return hashed_name.replace('\\', '/')
+        return super().save(hashed_name, content, max_length=max_length)
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from recipes import views
+from .admission import AdmissionControlMiddleware
+from .replicas import ReadReplicaRouter, ReplicaMiddleware
+from .static_files import StaticFilesMiddleware
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(TestCase):
+    """Recipe reads go to a replica unless the client wrote recently."""
+
+    def read_alias(self, request, view=views.recipe_facets):
+        """Return the alias the router picks for reads in this request."""
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(ReadReplicaRouter().db_for_read(None))
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        middleware(request)
+        return seen[0]
+
+    def test_reads_use_replica(self):
+        request = RequestFactory().get('/api/recipes/facets/')
+        self.assertEqual(self.read_alias(request), 'replica')
+        # Views outside REPLICA_READ_VIEW_MODULES stay on the primary
+        self.assertIsNone(self.read_alias(request, view=HttpResponse))
+
+    def test_cookie_keeps_browser_on_primary(self):
+        response = ReplicaMiddleware(lambda request: HttpResponse())(
+            RequestFactory().post('/api/recipes/')
+        )
+        cookie = response.cookies['primary_until'].value
+
+        factory = RequestFactory()
+        factory.cookies['primary_until'] = cookie
+        self.assertIsNone(self.read_alias(factory.get('/api/recipes/facets/')))
+
+    def test_token_client_stays_on_primary_in_every_worker(self):
+        factory = RequestFactory(HTTP_AUTHORIZATION='Bearer writer')
+        ReplicaMiddleware(lambda request: HttpResponse())(factory.post('/api/recipes/'))
+
+        # No cookie, and another worker's empty local cache
+        cache.clear()
+        self.assertIsNone(self.read_alias(factory.get('/api/recipes/facets/')))
+        other = RequestFactory(HTTP_AUTHORIZATION='Bearer reader')
+        self.assertEqual(self.read_alias(other.get('/api/recipes/facets/')), 'replica')
+
+
+class AsyncMiddlewareTests(TestCase):
+    """Under ASGI the project middleware must await the next handler directly."""
+
+    async def test_admission_control(self):
+        seen = []
+
+        async def get_response(request):
+            seen.append(middleware.in_flight)
+            return HttpResponse()
+
+        middleware = AdmissionControlMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/api/recipes/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((seen, middleware.in_flight), ([1], 0))
+
+    async def test_static_files(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = directory.name
+        with open(os.path.join(root, 'latest.json'), 'w', encoding='utf-8') as latest:
+            latest.write('{"version": "0123456789abcdef"}')
+
+        async def get_response(request):
+            return HttpResponse('view')
+
+        with override_settings(CATALOG_SNAPSHOT_ROOT=root):
+            middleware = StaticFilesMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await middleware(RequestFactory().get('/catalog/latest.json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'{"version": "0123456789abcdef"}')
+        response = await middleware(RequestFactory().get('/api/recipes/'))
+        self.assertEqual(response.content, b'view')
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    async def test_replica_routing(self):
+        seen = []
+
+        async def get_response(request):
+            # Django runs sync process_view hooks and ORM queries in a thread
+            await sync_to_async(middleware.process_view)(request, views.recipe_facets, (), {})
+            seen.append(await sync_to_async(ReadReplicaRouter().db_for_read)(None))
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(RequestFactory().get('/api/recipes/facets/'))
+        self.assertEqual(seen, ['replica'])
+
+
+class AdmissionControlTests(TestCase):
+    """Low-priority routes are shed while the worker is overloaded; core routes never are."""
+
+    def get(self, path, queued_seconds):
+        # Heroku's router sends the time it received the request in epoch milliseconds
+        started = int((time.time() - queued_seconds) * 1000)
+        return self.client.get(path, HTTP_X_REQUEST_START=str(started))
+
+    def test_sheds_low_priority_after_long_queue(self):
+        response = self.get('/api/recipes/facets/', queued_seconds=5)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertEqual(self.get('/api/recipes/facets/', queued_seconds=0).status_code, 200)
+
+    def test_never_sheds_core_routes(self):
+        self.assertEqual(self.get('/api/recipes/', queued_seconds=5).status_code, 200)
+
+    @override_settings(ADMISSION_MAX_LATENCY=0.2)
+    def test_sheds_low_priority_while_core_is_slow(self):
+        def get_response(request):
+            shed = middleware.process_view(request, None, (), {})
+            if shed is not None:
+                return shed
+            time.sleep(0.3)
+            return HttpResponse()
+
+        def request(url_name):
+            request = RequestFactory().get('/')
+            request.resolver_match = SimpleNamespace(url_name=url_name)
+            return request
+
+        middleware = AdmissionControlMiddleware(get_response)
+        self.assertEqual(middleware(request('recipe-list-create')).status_code, 200)
+        self.assertEqual(middleware(request('recipe-facets')).status_code, 503)
+        self.assertEqual(middleware(request('recipe-detail')).status_code, 200)
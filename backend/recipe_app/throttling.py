@@ -0,0 +1,168 @@
+"""
+Token-bucket request throttling.
+
+Every client (the user, or the IP address for anonymous requests) has one
+bucket per scope. ClientRateThrottle applies the general 'user'/'anon'
+scopes to every API view; RouteRateThrottle adds a bucket for expensive route
+classes ('login', 'search', 'recommendations'), taken from the view's
+throttle_scope or get_throttle_scope(request).
+
+Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] as
+"<requests>/<period>[:<burst>]": a bucket refills at requests per period and
+holds up to burst tokens (default: requests), so short bursts are allowed
+while the long-run rate is capped. Buckets live in the 'throttle' cache:
+local memory per worker by default, so each worker enforces the rates on its
+own, or a file-based cache shared by the workers on one host. Each bucket
+update is a read-modify-write under a lock striped by key, so only requests
+whose buckets share a stripe wait for each other. For the file-based cache
+that lock is an flock() on the stripe's lock file in the cache directory, so
+concurrent requests in different workers never spend the same token. Checks
+never query the database.
+
+A bucket dropped from the cache starts full again, so the throttle fails
+open for clients whose buckets are culled. The cache culls once it holds
+MAX_ENTRIES buckets; keep that above the number of clients active within
+one bucket lifetime (capacity / refill rate).
+"""
+import math
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Locks per worker, and lock files per file-based cache directory; buckets
+# are spread over them by key
+LOCK_STRIPES = 16
+
+_stripe_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def parse_rate(rate):
+    """Parse "<requests>/<period>[:<burst>]" into (tokens per second, capacity)."""
+    rate, _, burst = rate.partition(':')
+    num, period = rate.split('/')
+    num = int(num)
+    return num / PERIODS[period[0]], int(burst) if burst else num
+
+
+def get_bucket_cache():
+    """Return the cache holding the buckets."""
+    try:
+        return caches[THROTTLE_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+@contextmanager
+def bucket_lock(store, key):
+    """Hold the lock that serializes updates of a bucket across workers."""
+    stripe = zlib.crc32(key.encode()) % LOCK_STRIPES
+    with _stripe_locks[stripe]:
+        if fcntl is None or not isinstance(store, FileBasedCache):
+            yield
+            return
+        directory = store._dir  # pylint: disable=protected-access
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'throttle-{stripe}.lock')
+        with open(path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def take_token(key, refill_rate, capacity):
+    """
+    Take one token from a bucket; returns 0 if allowed, otherwise the
+    number of seconds until a token is available.
+    """
+    store = get_bucket_cache()
+    with bucket_lock(store, key):
+        now = time.time()
+        tokens, updated = store.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / refill_rate
+        # A bucket left alone for this long is full again and can be dropped
+        store.set(key, (tokens, now), math.ceil(capacity / refill_rate) + 1)
+    return wait
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle requests per client and scope with a token bucket."""
+
+    scope = None
+    cache_prefix = 'throttle'
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, request, view):
+        """Return the scope to throttle this request under, or None."""
+        return self.scope
+
+    def get_client_key(self, request):
+        """Identify the client: the user when authenticated, else the IP."""
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+        if rate is None:
+            return True
+
+        refill_rate, capacity = parse_rate(rate)
+        key = f'{self.cache_prefix}:{scope}:{self.get_client_key(request)}'
+        self.wait_seconds = take_token(key, refill_rate, capacity)
+        return not self.wait_seconds
+
+    def wait(self):
+        # Whole seconds, so Retry-After never says 0
+        return math.ceil(self.wait_seconds) if self.wait_seconds else None
+
+
+class ClientRateThrottle(TokenBucketThrottle):
+    """General per-client limit: 'user' for authenticated users, else 'anon'."""
+
+    def get_scope(self, request, view):
+        user = getattr(request, 'user', None)
+        return 'user' if user is not None and user.is_authenticated else 'anon'
+
+
+class RouteRateThrottle(TokenBucketThrottle):
+    """Per-client limit for the view's route class, if it has one."""
+
+    def get_scope(self, request, view):
+        if hasattr(view, 'get_throttle_scope'):
+            return view.get_throttle_scope(request)
+        return getattr(view, 'throttle_scope', None)
+
+
+def throttle_scope(scope):
+    """Set the route class of a function-based (@api_view) view."""
+    def decorator(view):
+        view.cls.throttle_scope = scope
+        return view
+    return decorator
@@ -4,10 +4,12 @@ URL configuration for recipe_app project.
 from django.contrib import admin
 from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from django.http import JsonResponse
 from django.views.generic import TemplateView
 
+from recipes.pages import feed_page, recipe_page
+from .media import serve_media
+
 def api_root(request):
     return JsonResponse({
         'message': 'Recipe App API',
@@ -26,11 +28,16 @@ urlpatterns = [
     path('api/', include('recipes.urls')),
 ]
 
-# Serve media files
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-else:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Serve media files (with caching headers, in development and production)
+urlpatterns += [
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$', serve_media),
+]
+
+# Server-rendered recipe pages (the React app with initial content and data)
+urlpatterns += [
+    re_path(r'^recipes/?$', feed_page),
+    re_path(r'^recipes/(?P<pk>\d+)/?$', recipe_page),
+]
 
 # Serve React app - must be last to catch all remaining routes
 urlpatterns += [
@@ -0,0 +1,255 @@
+"""
+Async read path for the hot recipe endpoints.
+
+These views are only routed by the ASGI application (recipe_app/asgi.py).
+They answer GET requests for the recipe feed, recipe detail and comments
+with Django's async ORM (aiterator, aget), so a slow query suspends one
+coroutine instead of blocking a whole worker; ingredient lists come from the
+in-memory ingredient snapshot. Responses match
+the DRF views in recipes.views; writes, non-JSON formats and the browsable
+API fall through to those views. Throttle checks can wait on a file lock
+(recipe_app.throttling), so they run in a thread like the ORM queries.
+"""
+# pylint: disable=no-member
+# Django models have dynamically added 'objects' manager and 'DoesNotExist' exception
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import exceptions, status
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from users.authentication import CachedJWTAuthentication
+from . import views
+from .cache import aget_recipe_version
+from .cards import arender_cards, card_rows
+from .fieldsets import annotate_user_state, parse_fieldset
+from .filters import filter_recipes
+from .ingredient_catalog import aget_ingredient_snapshot, filter_ingredients
+from .models import Comment, Recipe
+from .pagination import RecipePagination
+from .renderers import FastJSONRenderer
+from .serializers import CommentSerializer, RecipeDetailSerializer
+from .units import convert_recipe, parse_conversion_params
+
+_renderer = FastJSONRenderer()
+_authentication = CachedJWTAuthentication()
+
+
+def _json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    """Render data the way the DRF JSON renderer would."""
+    response = HttpResponse(
+        _renderer.render(data), status=status_code, content_type=_renderer.media_type
+    )
+    for name, value in (headers or {}).items():
+        response[name] = value
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _error_response(exc):
+    """Render an APIException like DRF's default exception handler."""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    headers = {}
+    if isinstance(exc, (exceptions.AuthenticationFailed, exceptions.NotAuthenticated)):
+        headers['WWW-Authenticate'] = _authentication.authenticate_header(None)
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = '%d' % exc.wait
+    return _json_response(data, exc.status_code, headers)
+
+
+def _check_throttles(request, view):
+    """Apply the DRF view's throttles like APIView.check_throttles()."""
+    durations = []
+    for throttle_class in view.throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            durations.append(throttle.wait())
+    if durations:
+        durations = [duration for duration in durations if duration is not None]
+        raise exceptions.Throttled(max(durations, default=None))
+
+
+def _wants_json(request):
+    """Return True if the client negotiates plain JSON."""
+    requested_format = request.GET.get('format')
+    if requested_format:
+        return requested_format == 'json'
+    accept = request.headers.get('Accept', '')
+    if 'text/html' in accept:
+        return False
+    return not accept or 'application/json' in accept or '*/*' in accept
+
+
+def async_read_view(sync_view):
+    """
+    Turn an async GET handler into a view that delegates every other
+    request (writes, msgpack, browsable API) to the given DRF view. GET
+    requests are authenticated and throttled like the DRF view.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method != 'GET' or not _wants_json(request):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            try:
+                auth = await _authentication.aauthenticate(request)
+                request.user = auth[0] if auth is not None else AnonymousUser()
+                # Bucket updates may wait on a file lock, so not on the event loop
+                await sync_to_async(_check_throttles)(request, sync_view.cls())
+                return await handler(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return _error_response(exc)
+
+        # DRF views are CSRF exempt; the JWT-authenticated API uses no cookies
+        view.csrf_exempt = True
+        return view
+    return decorator
+
+
+def _page_size(request):
+    """Return the page size the way RecipePagination.get_page_size() does."""
+    try:
+        size = int(request.GET[RecipePagination.page_size_query_param])
+        if size > 0:
+            return min(size, RecipePagination.max_page_size)
+    except (KeyError, ValueError):
+        pass
+    return RecipePagination.page_size
+
+
+async def _paginate(request, queryset, render):
+    """
+    Paginate a queryset (or an in-memory list) like RecipePagination using
+    the async ORM and return the paginated response with render(items) as
+    the results.
+    """
+    page_size = _page_size(request)
+    in_memory = isinstance(queryset, list)
+    count = len(queryset) if in_memory else await queryset.acount()
+    num_pages = max(1, math.ceil(count / page_size))
+
+    page_number = request.GET.get('page', 1)
+    if page_number in RecipePagination.last_page_strings:
+        page_number = num_pages
+    try:
+        page_number = int(page_number)
+    except (TypeError, ValueError) as exc:
+        raise exceptions.NotFound(RecipePagination.invalid_page_message) from exc
+    if not 1 <= page_number <= num_pages:
+        raise exceptions.NotFound(RecipePagination.invalid_page_message)
+
+    # async for (rather than aiterator()) also supports values_list() rows,
+    # whose iterable runs its query eagerly on Django 4.2
+    offset = (page_number - 1) * page_size
+    if in_memory:
+        items = queryset[offset:offset + page_size]
+    else:
+        items = [item async for item in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_link = previous_link = None
+    if page_number < num_pages:
+        next_link = replace_query_param(url, RecipePagination.page_query_param, page_number + 1)
+    if page_number > 1:
+        if page_number == 2:
+            previous_link = remove_query_param(url, RecipePagination.page_query_param)
+        else:
+            previous_link = replace_query_param(
+                url, RecipePagination.page_query_param, page_number - 1
+            )
+
+    return _json_response({
+        'count': count,
+        'next': next_link,
+        'previous': previous_link,
+        'results': await render(items),
+    })
+
+
+@async_read_view(views.RecipeListCreateView.as_view())
+async def recipe_list(request):
+    """Async GET for the public recipe feed (see RecipeListCreateView)."""
+    fields, expand = parse_fieldset(request, personalize=True)
+    queryset = filter_recipes(Recipe.objects.filter(is_public=True), request.GET)
+    queryset = annotate_user_state(queryset, request.user, fields)
+
+    ordering = request.GET.get('ordering', '-created_at')
+    if ordering not in ('created_at', '-created_at', 'title', '-title'):
+        ordering = '-created_at'
+
+    rows = card_rows(queryset.order_by(ordering), fields, expand)
+    response = await _paginate(
+        request, rows, lambda page: arender_cards(page, fields, expand, request)
+    )
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+@async_read_view(views.RecipeDetailView.as_view())
+async def recipe_detail(request, pk):
+    """Async GET for a single recipe (see RecipeDetailView)."""
+    system, servings = parse_conversion_params(request.GET)
+    queryset = Recipe.objects.select_related('author').prefetch_related(
+        'ingredients__ingredient__category', 'instructions', 'ratings__user'
+    )
+
+    user = request.user
+    if user.is_authenticated:
+        queryset = annotate_user_state(
+            queryset.filter(Q(is_public=True) | Q(author=user)), user
+        )
+    else:
+        queryset = queryset.filter(is_public=True)
+
+    version = None
+    if system is not None or servings is not None:
+        # Read before the recipe so cached conversions never outlive its rows
+        version = await aget_recipe_version(pk)
+    try:
+        recipe = await queryset.aget(pk=pk)
+    except Recipe.DoesNotExist as exc:
+        raise exceptions.NotFound() from exc
+
+    serializer = RecipeDetailSerializer(recipe, context={'request': request})
+    data = serializer.data
+    if system is not None or servings is not None:
+        data = await sync_to_async(convert_recipe)(data, system, servings, version)
+    return _json_response(data)
+
+
+@async_read_view(views.recipe_comments)
+async def recipe_comments(request, recipe_id):
+    """Async GET for a recipe's comments (see views.recipe_comments)."""
+    if not await Recipe.objects.filter(id=recipe_id).aexists():
+        raise exceptions.NotFound()
+
+    comments = [
+        comment async for comment in
+        Comment.objects.filter(recipe_id=recipe_id).select_related('user').aiterator()
+    ]
+    return _json_response(CommentSerializer(comments, many=True).data)
+
+
+async def _rows(items):
+    """Return pre-serialized snapshot rows for _paginate()."""
+    return items
+
+
+@async_read_view(views.IngredientCategoryListView.as_view())
+async def ingredient_categories(request):
+    """Async GET for ingredient categories (see IngredientCategoryListView)."""
+    snapshot = await aget_ingredient_snapshot()
+    return await _paginate(request, snapshot.categories, _rows)
+
+
+@async_read_view(views.IngredientItemListView.as_view())
+async def ingredient_items(request):
+    """Async GET for ingredient items (see IngredientItemListView)."""
+    snapshot = await aget_ingredient_snapshot()
+    rows = filter_ingredients(snapshot.items, request.GET)
+    return await _paginate(request, rows, _rows)
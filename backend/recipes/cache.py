@@ -0,0 +1,100 @@
+"""
+Cache helpers for recipe data.
+
+Derived recipe data (facet counts and similar) is cached under keys that
+include a catalog version. Recipe and rating writes bump the version, which
+invalidates every dependent entry at once without tracking individual keys.
+The ingredient catalog has its own version, bumped by ingredient and
+ingredient category writes, and each recipe has a version bumped by writes
+to the recipe, its ingredients, instructions and ratings.
+
+Versions are VersionCounter rows on the primary database, so a bump made by
+one worker process is seen by every other worker on its next read. Reading
+a version is one primary key lookup; a counter that was never bumped is 0.
+The change feed numbers its log entries with the same counters
+(advance_counter()).
+"""
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+
+from .models import VersionCounter
+
+CATALOG_VERSION_KEY = 'catalog'
+INGREDIENT_VERSION_KEY = 'ingredients'
+RECIPE_VERSION_KEY = 'recipe:{}'
+
+
+def _get_version(key):
+    """Return the current value of a version counter."""
+    # Always the primary: a replica could hand out a version that lags writes
+    value = (
+        VersionCounter.objects.using(DEFAULT_DB_ALIAS)
+        .filter(key=key).values_list('value', flat=True).first()
+    )
+    return value or 0
+
+
+async def _aget_version(key):
+    """Async variant of _get_version() using the async ORM."""
+    value = await (
+        VersionCounter.objects.using(DEFAULT_DB_ALIAS)
+        .filter(key=key).values_list('value', flat=True).afirst()
+    )
+    return value or 0
+
+
+def advance_counter(key, count=1):
+    """Move a shared counter forward by count and return its new value."""
+    counters = VersionCounter.objects.using(DEFAULT_DB_ALIAS)
+    # The UPDATE locks the row until the transaction ends, so the value read
+    # back is the one this call produced
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not counters.filter(key=key).update(value=F('value') + count):
+            try:
+                with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                    counters.create(key=key, value=count)
+                return count
+            except IntegrityError:
+                # Another worker created the counter first
+                counters.filter(key=key).update(value=F('value') + count)
+        return counters.filter(key=key).values_list('value', flat=True).get()
+
+
+def get_catalog_version():
+    """Return the current recipe catalog version."""
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate cached recipe data by moving to a new catalog version."""
+    return advance_counter(CATALOG_VERSION_KEY)
+
+
+def get_ingredient_version():
+    """Return the current ingredient catalog version."""
+    return _get_version(INGREDIENT_VERSION_KEY)
+
+
+async def aget_ingredient_version():
+    """Async variant of get_ingredient_version() for the ASGI read path."""
+    return await _aget_version(INGREDIENT_VERSION_KEY)
+
+
+def bump_ingredient_version():
+    """Invalidate ingredient snapshots by moving to a new version."""
+    return advance_counter(INGREDIENT_VERSION_KEY)
+
+
+def get_recipe_version(recipe_id):
+    """Return the current version of one recipe."""
+    return _get_version(RECIPE_VERSION_KEY.format(recipe_id))
+
+
+async def aget_recipe_version(recipe_id):
+    """Async variant of get_recipe_version() for the ASGI read path."""
+    return await _aget_version(RECIPE_VERSION_KEY.format(recipe_id))
+
+
+def bump_recipe_version(recipe_id):
+    """Invalidate cached data of one recipe by moving to a new version."""
+    return advance_counter(RECIPE_VERSION_KEY.format(recipe_id))
@@ -0,0 +1,295 @@
+"""
+Fast read-only rendering of recipe cards for list endpoints.
+
+Builds card dictionaries straight from values_list() rows instead of going
+through the ModelSerializer field machinery. Output matches
+RecipeListSerializer exactly for the same fieldset, so the JSON rendered
+for a page is byte-identical.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from operator import attrgetter
+
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from recipe_app.images import variant_urls
+from users.models import User
+from .fieldsets import AUTHOR_FULL_COLUMNS, AUTHOR_SUMMARY_COLUMNS, RATING_FIELDS
+from .models import Rating, Recipe
+
+# Record slot -> ORM lookup (relative to the recipe) for every card column
+CARD_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'image': 'image',
+    'image_variants': 'image_variants',
+    'prep_time': 'prep_time',
+    'cook_time': 'cook_time',
+    'servings': 'servings',
+    'difficulty': 'difficulty',
+    'food_type': 'food_type',
+    'is_public': 'is_public',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'author_id': 'author_id',
+    'author_username': 'author__username',
+    'author_email': 'author__email',
+    'author_first_name': 'author__first_name',
+    'author_last_name': 'author__last_name',
+    'author_bio': 'author__bio',
+    'author_profile_picture': 'author__profile_picture',
+    'author_profile_picture_variants': 'author__profile_picture_variants',
+    'author_date_joined': 'author__date_joined',
+    # Personal fields read the annotations added by annotate_user_state()
+    'is_saved': 'saved_by_user',
+    'user_rating': 'rating_by_user',
+}
+
+# Shared DateTimeField used for ISO 8601 output with the API timezone rules
+_datetime_field = serializers.DateTimeField()
+
+
+class CardRecord:
+    """Lightweight record holding the columns of one recipe card."""
+    __slots__ = (*CARD_COLUMNS, 'ratings')
+
+    def __init__(self, slots, row):
+        for slot, value in zip(slots, row):
+            setattr(self, slot, value)
+        self.ratings = ()
+
+
+def _datetime(getter):
+    """Wrap a getter so datetimes render like DRF's DateTimeField."""
+    to_representation = _datetime_field.to_representation
+
+    def accessor(record):
+        value = getter(record)
+        if value is None:
+            return None
+        return to_representation(value)
+    return accessor
+
+
+def _file_url(getter, storage, request):
+    """Wrap a getter so file names render like DRF's FileField."""
+    if not api_settings.UPLOADED_FILES_USE_URL:
+        return lambda record: getter(record) or None
+
+    def accessor(record):
+        name = getter(record)
+        if not name:
+            return None
+        url = storage.url(name)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+    return accessor
+
+
+def _variants(getter, storage, request):
+    """Wrap a getter so stored image variants render like ImageVariantsField."""
+    def accessor(record):
+        return variant_urls(getter(record), storage, request)
+    return accessor
+
+
+def _average_rating(record):
+    """Average rating, computed the same way as Recipe.average_rating."""
+    ratings = record.ratings
+    if ratings:
+        return sum(ratings) / len(ratings)
+    return 0
+
+
+def _total_ratings(record):
+    """Number of ratings, matching Recipe.total_ratings."""
+    return len(record.ratings)
+
+
+class CardPlan:
+    """
+    Precompiled column list and field accessors for one fieldset.
+    Plans are cached per (fields, expand) so compilation happens once per
+    worker; accessors that depend on the request are bound per render.
+    """
+
+    def __init__(self, fields, expand):
+        self.fields = fields
+        self.expand = expand
+        self.author_columns = (
+            AUTHOR_FULL_COLUMNS if 'author' in expand else AUTHOR_SUMMARY_COLUMNS
+        )
+        self.needs_ratings = any(name in fields for name in RATING_FIELDS)
+
+        slots = ['id']
+        for name in fields:
+            if name == 'author':
+                slots.extend(f'author_{column}' for column in self.author_columns)
+            elif name in CARD_COLUMNS and name != 'id':
+                slots.append(name)
+        self.slots = tuple(dict.fromkeys(slots))
+
+    def lookups(self, relation=''):
+        """Return the values_list() lookups for this plan's slots."""
+        prefix = f'{relation}__' if relation else ''
+        return [f'{prefix}{CARD_COLUMNS[slot]}' for slot in self.slots]
+
+    def bind(self, request):
+        """Return (key, accessor) pairs for rendering with this request."""
+        image_storage = Recipe._meta.get_field('image').storage
+        picture_storage = User._meta.get_field('profile_picture').storage
+        author = self._author_accessor(picture_storage, request)
+
+        accessors = []
+        for name in self.fields:
+            if name == 'author':
+                accessors.append((name, author))
+            elif name == 'image':
+                accessors.append((name, _file_url(attrgetter(name), image_storage, request)))
+            elif name == 'image_variants':
+                accessors.append((name, _variants(attrgetter(name), image_storage, request)))
+            elif name in ('created_at', 'updated_at'):
+                accessors.append((name, _datetime(attrgetter(name))))
+            elif name == 'average_rating':
+                accessors.append((name, _average_rating))
+            elif name == 'total_ratings':
+                accessors.append((name, _total_ratings))
+            else:
+                accessors.append((name, attrgetter(name)))
+        return accessors
+
+    def _author_accessor(self, storage, request):
+        """Build the accessor for the nested author dictionary."""
+        author_accessors = []
+        for column in self.author_columns:
+            getter = attrgetter(f'author_{column}')
+            if column == 'profile_picture':
+                getter = _file_url(getter, storage, request)
+            elif column == 'profile_picture_variants':
+                getter = _variants(getter, storage, request)
+            elif column == 'date_joined':
+                getter = _datetime(getter)
+            author_accessors.append((column, getter))
+
+        def accessor(record):
+            return {column: get(record) for column, get in author_accessors}
+        return accessor
+
+    def _ratings_query(self, records):
+        """Return the (recipe_id, rating) query for a list of records."""
+        return Rating.objects.filter(
+            recipe_id__in=[record.id for record in records]
+        ).values_list('recipe_id', 'rating')
+
+    @staticmethod
+    def _attach_ratings(records, ratings):
+        """Attach grouped ratings to their records."""
+        for record in records:
+            record.ratings = ratings.get(record.id, ())
+
+    def records(self, rows):
+        """Build card records from values_list() rows and attach ratings."""
+        slots = self.slots
+        records = [CardRecord(slots, row) for row in rows]
+        if self.needs_ratings and records:
+            ratings = defaultdict(list)
+            for recipe_id, rating in self._ratings_query(records):
+                ratings[recipe_id].append(rating)
+            self._attach_ratings(records, ratings)
+        return records
+
+    async def arecords(self, rows):
+        """Async variant of records() using the async ORM."""
+        slots = self.slots
+        records = [CardRecord(slots, row) for row in rows]
+        if self.needs_ratings and records:
+            ratings = defaultdict(list)
+            # async for, since values_list().aiterator() queries eagerly on Django 4.2
+            async for recipe_id, rating in self._ratings_query(records):
+                ratings[recipe_id].append(rating)
+            self._attach_ratings(records, ratings)
+        return records
+
+    def render_records(self, records, request=None):
+        """Render card records into card dictionaries."""
+        accessors = self.bind(request)
+        return [{key: get(record) for key, get in accessors} for record in records]
+
+    def render(self, rows, request=None):
+        """Render values_list() rows into card dictionaries."""
+        return self.render_records(self.records(rows), request)
+
+    async def arender(self, rows, request=None):
+        """Async variant of render()."""
+        return self.render_records(await self.arecords(rows), request)
+
+
+@lru_cache(maxsize=64)
+def get_card_plan(fields, expand):
+    """Return the cached CardPlan for a (fields, expand) fieldset."""
+    return CardPlan(fields, expand)
+
+
+def card_rows(queryset, fields, expand):
+    """Turn a recipe queryset into values_list() rows for the card plan."""
+    plan = get_card_plan(fields, expand)
+    return queryset.prefetch_related(None).values_list(*plan.lookups())
+
+
+def render_cards(rows, fields, expand, request=None):
+    """Render recipe rows from card_rows() into card dictionaries."""
+    return get_card_plan(fields, expand).render(rows, request)
+
+
+async def arender_cards(rows, fields, expand, request=None):
+    """Async variant of render_cards() for the ASGI read path."""
+    return await get_card_plan(fields, expand).arender(rows, request)
+
+
+def saved_card_rows(queryset, fields, expand):
+    """Turn a SavedRecipe queryset into rows for render_saved_cards()."""
+    plan = get_card_plan(fields, expand)
+    return queryset.prefetch_related(None).values_list(
+        'id', 'saved_at', *plan.lookups('recipe')
+    )
+
+
+def render_saved_cards(rows, fields, expand, request=None):
+    """Render SavedRecipe rows in the shape of SavedRecipeSerializer."""
+    cards = render_cards([row[2:] for row in rows], fields, expand, request)
+    return [
+        {
+            'id': row[0],
+            'recipe': card,
+            'saved_at': _datetime_field.to_representation(row[1]),
+        }
+        for row, card in zip(rows, cards)
+    ]
+
+
+class CardListMixin:
+    """
+    View mixin that renders recipe card pages through the fast path.
+    Expects SparseFieldsetMixin to provide get_fieldset().
+    """
+
+    def get_card_rows(self, queryset):
+        """Return the values_list() rows to paginate."""
+        return card_rows(queryset, *self.get_fieldset())
+
+    def render_card_rows(self, rows):
+        """Render a page of rows into response data."""
+        return render_cards(rows, *self.get_fieldset(), self.request)
+
+    def list(self, request, *args, **kwargs):
+        """List recipe cards without instantiating serializers per row."""
+        rows = self.get_card_rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.render_card_rows(page))
+        return Response(self.render_card_rows(rows))
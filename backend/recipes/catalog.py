@@ -0,0 +1,222 @@
+"""
+In-memory columnar snapshot of public recipe metadata.
+
+Each worker keeps the filterable and sortable recipe columns (food type,
+cuisine, difficulty, cook time, creation time, average rating and title
+order) in NumPy arrays. The recipe list answers filtering, sorting and page
+selection with vectorized masks and only hydrates the selected page from the
+database.
+
+The snapshot follows the change feed (recipes.changes). On each list request
+the worker reads the head cursor and reloads only the recipes with recipe or
+rating changes since its own cursor, whichever worker made them. A snapshot
+older than RECIPE_CATALOG_MAX_AGE, or one whose cursor has been purged from
+the log, is rebuilt in full. Each refresh builds a new CatalogColumns and
+swaps it in with one assignment, so requests in other threads always select
+from a complete set of columns. Requires NumPy and RECIPE_CATALOG_ENABLED.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Avg
+from django.utils import timezone
+
+from .changes import changed_recipe_ids, head_cursor, is_expired
+from .models import Recipe
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Query parameters the snapshot can answer; anything else goes to the database
+SUPPORTED_PARAMS = frozenset((
+    'food_type', 'cuisine', 'difficulty', 'max_cook_time', 'min_rating',
+    'hours_ago', 'ordering', 'page', 'page_size', 'fields', 'expand', 'format',
+))
+
+ALLOWED_ORDERINGS = ('created_at', '-created_at', 'title', '-title')
+
+# Change feed types that alter the catalog columns
+CATALOG_CHANGE_TYPES = ('recipe', 'rating')
+
+
+def catalog_enabled():
+    """Return True if the columnar catalog is configured and available."""
+    return np is not None and getattr(settings, 'RECIPE_CATALOG_ENABLED', False)
+
+
+def _epoch_micros(value):
+    """Convert an aware datetime into integer microseconds since the epoch."""
+    return int(value.timestamp() * 1_000_000)
+
+
+class CatalogColumns:
+    """Column arrays for a fixed set of metadata rows; never modified once built."""
+
+    def __init__(self, rows):
+        rows = sorted(rows)
+        self.rows = rows
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.food_type = np.array([row[1] or '' for row in rows], dtype=str)
+        self.cuisine = np.array([row[2] or '' for row in rows], dtype=str)
+        self.difficulty = np.array([row[3] or '' for row in rows], dtype=str)
+        self.cook_time = np.array(
+            [np.nan if row[4] is None else row[4] for row in rows], dtype=np.float64
+        )
+        self.created_at = np.array(
+            [_epoch_micros(row[5]) for row in rows], dtype=np.int64
+        )
+        self.avg_rating = np.array(
+            [np.nan if row[6] is None else float(row[6]) for row in rows],
+            dtype=np.float64
+        )
+        # Rank of each recipe by title, used for title orderings
+        title_order = sorted(range(len(rows)), key=lambda i: rows[i][7])
+        self.title_rank = np.empty(len(rows), dtype=np.int64)
+        self.title_rank[title_order] = np.arange(len(rows))
+
+    def select(self, params):
+        """Return recipe ids matching the list filters, in list order."""
+        mask = np.ones(len(self.ids), dtype=bool)
+
+        for name in ('food_type', 'cuisine', 'difficulty'):
+            value = params.get(name)
+            if value:
+                mask &= getattr(self, name) == value
+
+        max_cook_time = params.get('max_cook_time')
+        if max_cook_time:
+            try:
+                mask &= self.cook_time <= int(max_cook_time)
+            except (ValueError, TypeError):
+                pass  # Invalid max_cook_time parameter, ignore it
+
+        min_rating = params.get('min_rating')
+        if min_rating:
+            try:
+                mask &= self.avg_rating >= float(min_rating)
+            except (ValueError, TypeError):
+                pass  # Invalid min_rating parameter, ignore it
+
+        hours_ago = params.get('hours_ago')
+        if hours_ago:
+            try:
+                cutoff_time = timezone.now() - timedelta(hours=int(hours_ago))
+                mask &= self.created_at >= _epoch_micros(cutoff_time)
+            except (ValueError, TypeError):
+                pass  # Invalid hours_ago parameter, ignore it
+
+        indexes = np.flatnonzero(mask)
+        ordering = params.get('ordering', '-created_at')
+        if ordering not in ALLOWED_ORDERINGS:
+            ordering = '-created_at'
+        key = self.title_rank if ordering.endswith('title') else self.created_at
+        order = np.argsort(key[indexes], kind='stable')
+        if ordering.startswith('-'):
+            order = order[::-1]
+        return self.ids[indexes[order]]
+
+
+class RecipeCatalog:
+    """Columnar snapshot of public recipe metadata for one worker."""
+
+    def __init__(self):
+        self.cursor = None
+        self.built_at = 0.0
+        self.lock = threading.Lock()
+        self.columns = CatalogColumns([])
+
+    def _load_rows(self, ids=None):
+        """Fetch metadata rows for all public recipes or the given ids."""
+        # Read the primary so a lagging replica never lands behind the cursor
+        queryset = Recipe.objects.using(DEFAULT_DB_ALIAS).filter(is_public=True)
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        return list(
+            queryset.order_by()
+            .annotate(avg_rating=Avg('ratings__rating'))
+            .values_list(
+                'id', 'food_type', 'cuisine', 'difficulty', 'cook_time',
+                'created_at', 'avg_rating', 'title'
+            )
+        )
+
+    def refresh(self):
+        """Bring the snapshot up to date with the change feed."""
+        cursor = head_cursor()
+        max_age = getattr(settings, 'RECIPE_CATALOG_MAX_AGE', 60)
+        if cursor == self.cursor and time.monotonic() - self.built_at < max_age:
+            return
+
+        with self.lock:
+            if cursor == self.cursor and time.monotonic() - self.built_at < max_age:
+                return
+            if (self.cursor is None or cursor < self.cursor or is_expired(self.cursor)
+                    or time.monotonic() - self.built_at >= max_age):
+                self.columns = CatalogColumns(self._load_rows())
+                self.built_at = time.monotonic()
+            elif cursor > self.cursor:
+                changed = changed_recipe_ids(self.cursor, cursor, CATALOG_CHANGE_TYPES)
+                if changed:
+                    kept = [row for row in self.columns.rows if row[0] not in changed]
+                    self.columns = CatalogColumns(kept + self._load_rows(changed))
+            self.cursor = cursor
+
+    def select(self, params):
+        """Return recipe ids matching the list filters, in list order."""
+        return self.columns.select(params)
+
+
+class CatalogPage:
+    """
+    Sequence of card rows for ids selected from the catalog.
+    Slicing hydrates only the requested rows, so the paginator loads a
+    single page from the database. Ids the hydrate query no longer returns
+    (deleted, or filtered out by it) are dropped from the page.
+    """
+
+    def __init__(self, ids, hydrate):
+        self.ids = ids
+        self.hydrate = hydrate
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            ids = [int(pk) for pk in self.ids[index]]
+            rows = {row[0]: row for row in self.hydrate(ids)}
+            return [rows[pk] for pk in ids if pk in rows]
+        return self[index:index + 1][0]
+
+
+_catalog = None
+
+
+def get_catalog():
+    """Return this worker's up-to-date catalog, or None if disabled."""
+    global _catalog  # pylint: disable=global-statement
+    if not catalog_enabled():
+        return None
+    if _catalog is None:
+        _catalog = RecipeCatalog()
+    _catalog.refresh()
+    return _catalog
+
+
+def select_page(params, hydrate):
+    """
+    Answer a recipe list query from the catalog.
+    Returns a CatalogPage, or None if the catalog is disabled or the query
+    uses parameters (such as search) that need the database.
+    """
+    if any(value and name not in SUPPORTED_PARAMS for name, value in params.items()):
+        return None
+    catalog = get_catalog()
+    if catalog is None:
+        return None
+    return CatalogPage(catalog.select(params), hydrate)
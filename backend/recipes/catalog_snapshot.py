@@ -0,0 +1,257 @@
+"""
+Static snapshot of the public recipe catalog.
+
+build_snapshot() writes the recipe cards (the CARD_FIELDS fieldset) and the
+unfiltered facet counts as one JSON bundle under CATALOG_SNAPSHOT_ROOT,
+named by a hash of its content (catalog.<version>.json), with gzip and, when
+the Brotli package is installed, brotli siblings. An optional binary index
+(catalog.<version>.idx) packs the filterable columns of every card into
+fixed-size records, in bundle order, for clients that filter and sort
+without parsing the whole bundle. latest.json points at the current
+version.
+
+The web server serves these files directly (recipe_app.static_files):
+versioned files as immutable, latest.json with the normal static max-age,
+so reading the catalog never reaches a Django view.
+
+Builds are incremental. The cards and the change feed cursor of the last
+build are kept in CATALOG_SNAPSHOT_STATE_FILE (outside the served
+directory); the next build re-renders only the recipes with recipe or rating
+changes since that cursor. Author and image-variant updates are not in the
+change log, so a periodic --full build picks them up.
+"""
+import gzip
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from .cards import card_rows, render_cards
+from .changes import changed_recipe_ids, head_cursor, is_expired
+from .facets import compute_facets
+from .fieldsets import CARD_FIELDS
+from .models import Recipe
+from .renderers import FastJSONRenderer
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+POINTER_NAME = 'latest.json'
+
+# Change types that alter a recipe card
+CARD_CHANGE_TYPES = ('recipe', 'rating')
+
+# Binary index: header (magic, format version, record size, record count),
+# then one record per card: id, created_at (epoch seconds), cook_time
+# (0xFFFF when missing), average rating x 100, then food type, cuisine and
+# difficulty codes (positions in the bundle's index.codes lists, 0xFF when
+# missing)
+INDEX_MAGIC = b'RCIX'
+INDEX_FORMAT_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sHHI')
+INDEX_RECORD = struct.Struct('<IIHHBBBx')
+INDEX_CODE_FIELDS = ('food_type', 'cuisine', 'difficulty')
+MISSING_U16 = 0xFFFF
+MISSING_CODE = 0xFF
+
+
+def snapshot_root():
+    """Return the directory the snapshot files are written to."""
+    return Path(getattr(settings, 'CATALOG_SNAPSHOT_ROOT', settings.BASE_DIR / 'catalog'))
+
+
+def snapshot_url(name):
+    """Return the URL a snapshot file is served at."""
+    return f"{getattr(settings, 'CATALOG_SNAPSHOT_URL', '/catalog/')}{name}"
+
+
+def state_file():
+    """Return the path of the incremental build state."""
+    return Path(getattr(
+        settings, 'CATALOG_SNAPSHOT_STATE_FILE', settings.BASE_DIR / 'catalog.state.json'
+    ))
+
+
+def _write(path, data):
+    """Write bytes to path atomically."""
+    temporary = path.with_name(f'.{path.name}.tmp')
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _write_compressed(path, data):
+    """Write data with its gzip and brotli siblings; returns the paths."""
+    paths = [path, path.with_name(f'{path.name}.gz')]
+    # Compressed variants go first so the server never sees a bundle
+    # without them; mtime=0 keeps the gzip output reproducible
+    _write(paths[1], gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        paths.append(path.with_name(f'{path.name}.br'))
+        _write(paths[2], brotli.compress(data))
+    _write(path, data)
+    return paths
+
+
+def _index_codes():
+    """Return {field: [choice values]} for the index code columns."""
+    return {
+        name: [value for value, _ in Recipe._meta.get_field(name).choices]
+        for name in INDEX_CODE_FIELDS
+    }
+
+
+def _load_recipes(ids=None):
+    """
+    Return ({id: card}, {id: [cuisine, created_at in epoch microseconds]})
+    for the public recipes, or those among ids.
+    """
+    recipes = Recipe.objects.using(DEFAULT_DB_ALIAS).filter(is_public=True)
+    if ids is not None:
+        recipes = recipes.filter(pk__in=ids)
+    cards = render_cards(card_rows(recipes, CARD_FIELDS, ()), CARD_FIELDS, ())
+    columns = {
+        pk: [cuisine, int(created_at.timestamp() * 1_000_000)]
+        for pk, cuisine, created_at in recipes.values_list('id', 'cuisine', 'created_at')
+    }
+    return {card['id']: card for card in cards}, columns
+
+
+def _load_state():
+    """Return the state of the last build, or None."""
+    try:
+        state = json.loads(state_file().read_text())
+    except (OSError, ValueError):
+        return None
+    cards = {int(pk): card for pk, card in state['cards'].items()}
+    columns = {int(pk): values for pk, values in state['columns'].items()}
+    return state['cursor'], cards, columns, state['facets'], state['version']
+
+
+def _save_state(cursor, cards, columns, facets, version):
+    """Store the state for the next incremental build."""
+    path = state_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write(path, FastJSONRenderer().render({
+        'cursor': cursor,
+        'cards': {str(pk): card for pk, card in cards.items()},
+        'columns': {str(pk): values for pk, values in columns.items()},
+        'facets': facets,
+        'version': version,
+    }))
+
+
+def _pack_index(cards, columns, codes):
+    """Pack the filterable columns of cards into the binary index."""
+    positions = {
+        name: {value: code for code, value in enumerate(values)}
+        for name, values in codes.items()
+    }
+    records = []
+    for card in cards:
+        cuisine, created_at = columns[card['id']]
+        values = {'food_type': card['food_type'], 'cuisine': cuisine,
+                  'difficulty': card['difficulty']}
+        records.append(INDEX_RECORD.pack(
+            card['id'],
+            created_at // 1_000_000,
+            MISSING_U16 if card['cook_time'] is None else min(card['cook_time'], MISSING_U16 - 1),
+            round(card['average_rating'] * 100),
+            *(positions[name].get(values[name], MISSING_CODE) for name in INDEX_CODE_FIELDS),
+        ))
+    header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, INDEX_RECORD.size, len(records))
+    return header + b''.join(records)
+
+
+def _order(cards, columns):
+    """Return cards newest first, matching the recipe list's default ordering."""
+    return sorted(
+        cards.values(), key=lambda card: (columns[card['id']][1], card['id']), reverse=True
+    )
+
+
+def _prune(root, keep):
+    """Delete all but the keep most recent bundle versions."""
+    versions = {}
+    for path in root.glob('catalog.*'):
+        version = path.name.split('.')[1]
+        versions[version] = max(versions.get(version, 0), path.stat().st_mtime)
+    stale = sorted(versions, key=versions.get, reverse=True)[keep:]
+    for version in stale:
+        for path in root.glob(f'catalog.{version}.*'):
+            path.unlink()
+    return len(stale)
+
+
+def build_snapshot(full=False, binary_index=False, keep=3):
+    """
+    Build the catalog snapshot, incrementally unless full is True or there is
+    no usable state. Returns a summary dict; 'version' is None when the
+    existing snapshot was already current.
+    """
+    root = snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    # Read the cursor first so changes made during the build are picked up
+    # by the next one
+    cursor = head_cursor()
+
+    state = None if full else _load_state()
+    if state is not None and is_expired(state[0]):
+        state = None
+
+    if state is None:
+        cards, columns = _load_recipes()
+        facets = compute_facets({})
+        changed = len(cards)
+        previous = None
+    else:
+        since, cards, columns, facets, previous = state
+        ids = changed_recipe_ids(since, cursor, CARD_CHANGE_TYPES)
+        changed = len(ids)
+        if ids:
+            for pk in ids:
+                cards.pop(pk, None)
+                columns.pop(pk, None)
+            fresh_cards, fresh_columns = _load_recipes(ids)
+            cards.update(fresh_cards)
+            columns.update(fresh_columns)
+            facets = compute_facets({})
+
+    ordered = _order(cards, columns)
+    bundle = {'count': len(ordered), 'recipes': ordered, 'facets': facets}
+    if binary_index:
+        bundle['index'] = {
+            'format': INDEX_FORMAT_VERSION,
+            'fields': ['id', 'created_at', 'cook_time', 'average_rating', *INDEX_CODE_FIELDS],
+            'codes': _index_codes(),
+        }
+    data = FastJSONRenderer().render(bundle)
+    version = hashlib.sha256(data).hexdigest()[:16]
+
+    result = {'version': None, 'recipes': len(ordered), 'changed': changed, 'pruned': 0}
+    current = root / f'catalog.{version}.json'
+    if version != previous or not current.exists():
+        _write_compressed(current, data)
+        pointer = {
+            'version': version,
+            'url': snapshot_url(current.name),
+            'count': len(ordered),
+            'cursor': str(cursor),
+            'generated_at': timezone.localtime().isoformat(),
+        }
+        if binary_index:
+            index_path = root / f'catalog.{version}.idx'
+            _write_compressed(index_path, _pack_index(ordered, columns, bundle['index']['codes']))
+            pointer['index_url'] = snapshot_url(index_path.name)
+        _write(root / POINTER_NAME, FastJSONRenderer().render(pointer))
+        result['version'] = version
+        result['pruned'] = _prune(root, keep)
+
+    _save_state(cursor, cards, columns, facets, version)
+    return result
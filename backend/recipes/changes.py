@@ -0,0 +1,163 @@
+"""
+Change feed for incremental sync of the public catalog.
+
+Signal handlers append a ChangeLogEntry for every save and delete of a
+recipe, recipe ingredient, instruction, rating or comment. The feed reads
+the entries after a cursor (the last entry id a client has seen), compacts
+them to the latest change per object and returns each object's current
+state as an upsert, or a tombstone when it was deleted or its recipe is not
+public. Recipe upserts carry the full recipe detail (ingredients,
+instructions, ratings), so a recipe that becomes public again arrives
+complete; a recipe tombstone removes its children too. A sync costs one
+query for the log plus a few per changed object type, however large the
+catalog is.
+
+Cursors are entry sequence numbers, not ids. Ids are handed out when a row
+is inserted, so a slow transaction can commit an entry with a lower id than
+entries a client has already read past. Sequence numbers are assigned after
+commit (assign_sequences(), run by transaction.on_commit) from the shared
+'change-log' counter, in one transaction with the counter update; the row
+lock on the counter makes numbers become visible in order, so an entry
+that shows up later always gets a number above every cursor handed out
+before it. Entries without a number yet are not read.
+"""
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+from .cache import advance_counter
+from .models import ChangeLogEntry, Comment, Instruction, Rating, Recipe, RecipeIngredient
+from .serializers import (
+    CommentSerializer, InstructionSerializer, RatingSerializer,
+    RecipeDetailSerializer, RecipeIngredientSerializer
+)
+
+# Change types: model, serializer and related objects needed to serialize it
+CHANGE_TYPES = {
+    'recipe': (
+        Recipe, RecipeDetailSerializer, ('author',),
+        ('ingredients__ingredient__category', 'instructions', 'ratings__user'),
+    ),
+    'recipe_ingredient': (
+        RecipeIngredient, RecipeIngredientSerializer, ('ingredient__category',), ()
+    ),
+    'instruction': (Instruction, InstructionSerializer, (), ()),
+    'rating': (Rating, RatingSerializer, ('user',), ()),
+    'comment': (Comment, CommentSerializer, ('user',), ()),
+}
+MODEL_CHANGE_TYPES = {model: name for name, (model, *_) in CHANGE_TYPES.items()}
+
+# Largest number of log entries read per request
+MAX_PAGE_SIZE = 1000
+
+# Shared counter (recipes.cache) that numbers log entries in commit order
+SEQUENCE_COUNTER_KEY = 'change-log'
+
+
+def record_change(instance, action):
+    """Append a log entry for a write to a tracked model instance."""
+    model = type(instance)
+    ChangeLogEntry.objects.create(
+        model=MODEL_CHANGE_TYPES[model],
+        object_id=instance.pk,
+        recipe_id=instance.pk if model is Recipe else instance.recipe_id,
+        action=action,
+    )
+    transaction.on_commit(assign_sequences)
+
+
+def assign_sequences():
+    """Number the committed log entries that have no sequence yet, in id order."""
+    pending = ChangeLogEntry.objects.using(DEFAULT_DB_ALIAS).filter(sequence__isnull=True)
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        ids = list(pending.order_by('id').values_list('id', flat=True))
+        if not ids:
+            return
+        # Entries numbered meanwhile by another worker leave an unused gap
+        last = advance_counter(SEQUENCE_COUNTER_KEY, len(ids))
+        for sequence, pk in enumerate(ids, start=last - len(ids) + 1):
+            pending.filter(pk=pk).update(sequence=sequence)
+
+
+def sequenced_entries():
+    """Return the log entries that have been numbered and can be read."""
+    return ChangeLogEntry.objects.filter(sequence__isnull=False)
+
+
+def head_cursor():
+    """Return the cursor of the newest change, to start syncing from now."""
+    return (
+        sequenced_entries().order_by('-sequence')
+        .values_list('sequence', flat=True).first() or 0
+    )
+
+
+def is_expired(since):
+    """Return True if entries right after since may have been purged."""
+    oldest = (
+        sequenced_entries().order_by('sequence')
+        .values_list('sequence', flat=True).first()
+    )
+    return oldest is not None and since < oldest - 1
+
+
+def changed_recipe_ids(since, until, change_types):
+    """Return the ids of recipes with changes of change_types in (since, until]."""
+    return set(
+        sequenced_entries().filter(
+            sequence__gt=since, sequence__lte=until, model__in=change_types
+        ).values_list('recipe_id', flat=True)
+    )
+
+
+def _load(change_type, ids):
+    """Return {id: serialized data} of the public objects among ids."""
+    model, serializer_class, related, prefetch = CHANGE_TYPES[change_type]
+    visible = Q(is_public=True) if model is Recipe else Q(recipe__is_public=True)
+    objects = (
+        model.objects.filter(visible, pk__in=ids)
+        .select_related(*related).prefetch_related(*prefetch)
+    )
+    return {obj.pk: serializer_class(obj).data for obj in objects}
+
+
+def read_changes(since, limit):
+    """
+    Return (changes, cursor, has_more) for the entries after since.
+
+    Each object appears once, at the position of its latest change.
+    """
+    entries = list(
+        sequenced_entries().filter(sequence__gt=since).order_by('sequence')
+        .values_list('sequence', 'model', 'object_id', 'recipe_id')[:limit]
+    )
+    if not entries:
+        return [], since, False
+
+    # Compact to the latest entry per object
+    latest = {}
+    for sequence, change_type, object_id, recipe_id in entries:
+        latest.pop((change_type, object_id), None)
+        latest[(change_type, object_id)] = (sequence, recipe_id)
+
+    ids = {}
+    for change_type, object_id in latest:
+        ids.setdefault(change_type, []).append(object_id)
+    current = {
+        change_type: _load(change_type, object_ids)
+        for change_type, object_ids in ids.items() if change_type in CHANGE_TYPES
+    }
+
+    changes = []
+    for (change_type, object_id), (sequence, recipe_id) in latest.items():
+        data = current.get(change_type, {}).get(object_id)
+        change = {
+            'cursor': str(sequence),
+            'type': change_type,
+            'id': object_id,
+            'recipe_id': recipe_id,
+            'action': ChangeLogEntry.UPSERT if data is not None else ChangeLogEntry.DELETE,
+        }
+        if data is not None:
+            change['data'] = data
+        changes.append(change)
+    return changes, entries[-1][0], len(entries) == limit
@@ -0,0 +1,132 @@
+"""
+Faceted filter counts for the recipe browser.
+
+Counts per cuisine, food type, difficulty and cook time are computed from a
+single grouped query over the recipes matching the non-facet filters. Each
+facet then honors every applied filter except its own, so the filter bar can
+show how many recipes each alternative choice would return.
+"""
+import hashlib
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count
+
+from .cache import get_catalog_version
+from .filters import FACET_FILTERS, filter_recipes
+from .models import Recipe
+
+# Cook time thresholds offered by the filter bar (cook_time <= minutes)
+COOK_TIME_BUCKETS = (
+    (15, 'Under 15 min'),
+    (30, 'Under 30 min'),
+    (45, 'Under 45 min'),
+    (60, 'Under 1 hour'),
+    (90, 'Under 1.5 hours'),
+)
+
+# Grouped counts are cached per catalog version and filter signature; writes
+# bump the shared version, so every worker misses after a write
+FACET_CACHE_TIMEOUT = 300
+
+# Query parameters applied in SQL before grouping
+SQL_FILTERS = ('search', 'min_rating', 'hours_ago')
+
+
+def _signature(params):
+    """Return a stable cache key fragment for the SQL-level filters."""
+    raw = '&'.join(f'{name}={params.get(name) or ""}' for name in SQL_FILTERS)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def grouped_counts(params):
+    """
+    Return (cuisine, food_type, difficulty, cook_time, count) rows for the
+    public recipes matching the non-facet filters, using the cache if possible.
+    """
+    key = f'recipes:facets:{get_catalog_version()}:{_signature(params)}'
+    rows = cache.get(key)
+    if rows is None:
+        # Read the primary so a lagging replica is never cached under this version
+        recipes = filter_recipes(
+            Recipe.objects.using(DEFAULT_DB_ALIAS).filter(is_public=True),
+            params, exclude=FACET_FILTERS
+        )
+        if 'avg_rating' in recipes.query.annotations:
+            # Rating filter groups per recipe, so regroup over matching ids
+            recipes = Recipe.objects.using(DEFAULT_DB_ALIAS).filter(
+                pk__in=recipes.values('pk')
+            )
+        rows = list(
+            recipes.order_by()
+            .values_list('cuisine', 'food_type', 'difficulty', 'cook_time')
+            .annotate(count=Count('pk'))
+        )
+        cache.set(key, rows, FACET_CACHE_TIMEOUT)
+    return rows
+
+
+def _max_cook_time(params):
+    """Return the max_cook_time filter as an int, or None if absent/invalid."""
+    try:
+        return int(params.get('max_cook_time'))
+    except (ValueError, TypeError):
+        return None
+
+
+def _choices(field_name, counts):
+    """Build the facet entries for a choice field, in declaration order."""
+    field = Recipe._meta.get_field(field_name)
+    return [
+        {'value': value, 'label': label, 'count': counts[value]}
+        for value, label in field.choices
+    ]
+
+
+def compute_facets(params):
+    """Return the facet counts for the recipe list filters in params."""
+    selected = {
+        'cuisine': params.get('cuisine') or None,
+        'food_type': params.get('food_type') or None,
+        'difficulty': params.get('difficulty') or None,
+    }
+    max_cook_time = _max_cook_time(params)
+
+    counts = {name: Counter() for name in selected}
+    cook_time_counts = Counter()
+    total = 0
+
+    for cuisine, food_type, difficulty, cook_time, count in grouped_counts(params):
+        values = {'cuisine': cuisine, 'food_type': food_type, 'difficulty': difficulty}
+        misses = [
+            name for name, value in selected.items()
+            if value is not None and values[name] != value
+        ]
+        within_cook_time = max_cook_time is None or (
+            cook_time is not None and cook_time <= max_cook_time
+        )
+
+        # A facet counts rows that pass every filter except its own
+        if within_cook_time:
+            if not misses:
+                total += count
+            for name in selected:
+                if not misses or misses == [name]:
+                    counts[name][values[name]] += count
+
+        if not misses and cook_time is not None:
+            for minutes, _ in COOK_TIME_BUCKETS:
+                if cook_time <= minutes:
+                    cook_time_counts[minutes] += count
+
+    return {
+        'count': total,
+        'cuisine': _choices('cuisine', counts['cuisine']),
+        'food_type': _choices('food_type', counts['food_type']),
+        'difficulty': _choices('difficulty', counts['difficulty']),
+        'cook_time': [
+            {'value': minutes, 'label': label, 'count': cook_time_counts[minutes]}
+            for minutes, label in COOK_TIME_BUCKETS
+        ],
+    }
@@ -0,0 +1,135 @@
+"""
+Sparse fieldset support for recipe list endpoints.
+Lets clients request only the card fields they render; recipes.cards loads
+just the matching columns with values_list().
+
+Query parameters:
+    - fields: Comma-separated card fields to return (e.g. ?fields=id,title,image)
+    - expand: Comma-separated relations to return in full (e.g. ?expand=author)
+
+Views that personalize their cards also return is_saved and user_rating to
+authenticated users. Both are annotated onto the page query with Exists()
+and Subquery(), so personalization adds no queries; anonymous requests get
+the same cards as before.
+"""
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils.cache import patch_vary_headers
+
+from .models import Rating, SavedRecipe
+
+# Fields a recipe card may request, in serializer output order
+CARD_FIELDS = (
+    'id', 'title', 'description', 'author', 'image', 'image_variants',
+    'prep_time', 'cook_time', 'servings', 'difficulty', 'food_type',
+    'is_public', 'created_at', 'updated_at', 'average_rating', 'total_ratings'
+)
+
+# Relations that are returned as a compact summary unless expanded
+EXPANDABLE_FIELDS = ('author',)
+
+# Card fields computed from the recipe's ratings rather than its own columns
+RATING_FIELDS = ('average_rating', 'total_ratings')
+
+# Per-user card fields, returned to authenticated users by personalized views
+PERSONAL_FIELDS = ('is_saved', 'user_rating')
+
+# Author columns loaded for the compact summary and for the expanded author
+AUTHOR_SUMMARY_COLUMNS = ('id', 'username')
+AUTHOR_FULL_COLUMNS = (
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'bio', 'profile_picture', 'profile_picture_variants', 'date_joined'
+)
+
+
+def _split_param(value):
+    """Split a comma-separated query parameter into a list of names."""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse_fieldset(request, personalize=False):
+    """
+    Read the requested card fields and expansions from the query string.
+    Returns a (fields, expand) tuple; unknown names are ignored and the
+    recipe id is always included so cards can link to the detail page.
+    With personalize=True, authenticated users also get PERSONAL_FIELDS.
+    Accepts DRF requests and plain Django requests (the async read path).
+    """
+    params = getattr(request, 'query_params', request.GET)
+    requested = _split_param(params.get('fields'))
+    if requested:
+        fields = tuple(
+            name for name in CARD_FIELDS
+            if name == 'id' or name in requested
+        )
+    else:
+        fields = CARD_FIELDS
+
+    user = getattr(request, 'user', None)
+    if personalize and user is not None and user.is_authenticated:
+        fields += tuple(
+            name for name in PERSONAL_FIELDS
+            if not requested or name in requested
+        )
+
+    expand = tuple(
+        name for name in _split_param(params.get('expand'))
+        if name in EXPANDABLE_FIELDS
+    )
+    return fields, expand
+
+
+def annotate_user_state(queryset, user, fields=PERSONAL_FIELDS):
+    """
+    Annotate a recipe queryset with the user's saved and rating state.
+    Adds saved_by_user (Exists) and rating_by_user (Subquery) for the
+    personal fields in fields; anonymous users get the queryset unchanged.
+    """
+    if not user.is_authenticated:
+        return queryset
+    annotations = {}
+    if 'is_saved' in fields:
+        annotations['saved_by_user'] = Exists(
+            SavedRecipe.objects.filter(recipe=OuterRef('pk'), user=user)
+        )
+    if 'user_rating' in fields:
+        annotations['rating_by_user'] = Subquery(
+            Rating.objects.filter(recipe=OuterRef('pk'), user=user).values('rating')[:1]
+        )
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin that applies ?fields= and ?expand= to recipe card listings.
+    Passes the parsed fieldset to the serializer context. Set
+    personalize_fieldset to return PERSONAL_FIELDS to authenticated users.
+    """
+    personalize_fieldset = False
+
+    def get_fieldset(self):
+        """Return the (fields, expand) tuple for the current request."""
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = parse_fieldset(self.request, self.personalize_fieldset)
+        return self._fieldset
+
+    def get_serializer_context(self):
+        """Add the requested fieldset to the serializer context."""
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_fieldset()
+        return context
+
+    def personalize_queryset(self, queryset):
+        """Annotate the personal fields of the requested fieldset."""
+        fields = self.get_fieldset()[0]
+        return annotate_user_state(queryset, self.request.user, fields)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Key cached responses on the credentials when cards are personalized."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.personalize_fieldset:
+            patch_vary_headers(response, ['Authorization'])
+        return response
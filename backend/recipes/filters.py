@@ -0,0 +1,78 @@
+"""
+Shared query-parameter filters for recipe listings.
+Used by the recipe list and the facet counts so both see the same recipes.
+"""
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Avg
+from django.utils import timezone
+
+# Filters that the facet endpoint evaluates per facet value instead of in SQL
+FACET_FILTERS = ('food_type', 'cuisine', 'difficulty', 'max_cook_time')
+
+
+def filter_recipes(queryset, params, exclude=()):
+    """
+    Apply the recipe list filters found in params to a recipe queryset.
+    Filters named in exclude are skipped; invalid numeric values are ignored.
+    """
+    def param(name):
+        return None if name in exclude else params.get(name, None)
+
+    food_type = param('food_type')
+    cuisine = param('cuisine')
+    search = param('search')
+    min_rating = param('min_rating')
+    hours_ago = param('hours_ago')
+    difficulty = param('difficulty')
+    max_cook_time = param('max_cook_time')
+
+    # Filter by food type (appetizer, main_course, dessert, etc.)
+    if food_type:
+        queryset = queryset.filter(food_type=food_type)
+
+    # Filter by cuisine (italian, mexican, chinese, etc.)
+    if cuisine:
+        queryset = queryset.filter(cuisine=cuisine)
+
+    # Search in title and description
+    if search:
+        queryset = queryset.filter(
+            models.Q(title__icontains=search) |
+            models.Q(description__icontains=search)
+        )
+
+    # Filter by difficulty
+    if difficulty:
+        queryset = queryset.filter(difficulty=difficulty)
+
+    # Filter by maximum cook time
+    if max_cook_time:
+        try:
+            max_time = int(max_cook_time)
+            queryset = queryset.filter(cook_time__lte=max_time)
+        except (ValueError, TypeError):
+            pass  # Invalid max_cook_time parameter, ignore it
+
+    # Filter by minimum rating (4+ stars for featured recipes)
+    if min_rating:
+        try:
+            min_rating_float = float(min_rating)
+            # Use aggregation to filter by average rating
+            queryset = queryset.annotate(
+                avg_rating=Avg('ratings__rating')
+            ).filter(avg_rating__gte=min_rating_float)
+        except (ValueError, TypeError):
+            pass  # Invalid min_rating parameter, ignore it
+
+    # Filter by time (e.g., last 24 hours for recent recipes)
+    if hours_ago:
+        try:
+            hours = int(hours_ago)
+            cutoff_time = timezone.now() - timedelta(hours=hours)
+            queryset = queryset.filter(created_at__gte=cutoff_time)
+        except (ValueError, TypeError):
+            pass  # Invalid hours_ago parameter, ignore it
+
+    return queryset
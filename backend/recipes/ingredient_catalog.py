@@ -0,0 +1,213 @@
+"""
+Versioned in-memory snapshot of the ingredient catalog.
+
+Each worker keeps all ingredient categories and active ingredient items
+serialized once, both as dictionaries (for the list endpoints) and as JSON
+bytes (for the catalog endpoint), so a read costs only the version lookup.
+The snapshot follows the shared ingredient version from recipes.cache, which
+ingredient and category writes bump, and is also rebuilt every
+INGREDIENT_CATALOG_MAX_AGE seconds to pick up writes that skipped signals.
+
+Each rebuild is diffed against the previous snapshot and every changed or
+removed row is stamped with the version that first contained the change, so
+a client holding a copy at version V can fetch only the rows stamped after V
+(?since_version=V). Versions are shared by all workers, so any worker that
+has been running since V can answer the delta, whichever worker issued V;
+a worker started after V returns the full catalog instead.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import aget_ingredient_version, bump_ingredient_version, get_ingredient_version
+from .models import IngredientCategory, IngredientItem
+from .renderers import FastJSONRenderer
+from .serializers import IngredientCategorySerializer, IngredientItemSerializer
+
+_renderer = FastJSONRenderer()
+
+
+def _stamp(previous_json, previous_stamps, previous_removed, rows_json, version):
+    """Carry over stamps of unchanged rows and stamp new, changed and removed rows."""
+    stamps = {
+        pk: previous_stamps[pk] if previous_json.get(pk) == data else version
+        for pk, data in rows_json.items()
+    }
+    removed = {pk: stamp for pk, stamp in previous_removed.items() if pk not in rows_json}
+    removed.update({pk: version for pk in previous_json if pk not in rows_json})
+    return stamps, removed
+
+
+def _json_list(chunks):
+    """Join pre-rendered JSON values into a JSON array."""
+    return b'[' + b','.join(chunks) + b']'
+
+
+class IngredientSnapshot:
+    """Serialized ingredient catalog at one version, with per-row change stamps."""
+
+    def __init__(self, version, categories, items, previous=None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.categories = categories
+        self.items = items
+        self.category_json = {row['id']: _renderer.render(row) for row in categories}
+        self.item_json = {row['id']: _renderer.render(row) for row in items}
+
+        if previous is None:
+            # Deltas can only be answered from the first version this worker saw
+            self.base_version = version
+            self.category_stamps = dict.fromkeys(self.category_json, version)
+            self.item_stamps = dict.fromkeys(self.item_json, version)
+            self.removed_categories = {}
+            self.removed_items = {}
+        else:
+            self.base_version = previous.base_version
+            self.category_stamps, self.removed_categories = _stamp(
+                previous.category_json, previous.category_stamps,
+                previous.removed_categories, self.category_json, version
+            )
+            self.item_stamps, self.removed_items = _stamp(
+                previous.item_json, previous.item_stamps,
+                previous.removed_items, self.item_json, version
+            )
+
+        self.body = self._render_full()
+
+    def same_rows(self, category_json, item_json):
+        """Return True if the given rendered rows match this snapshot."""
+        return category_json == self.category_json and item_json == self.item_json
+
+    @property
+    def etag(self):
+        """ETag of the full catalog response."""
+        return f'"ingredients-{self.version}"'
+
+    def _render_full(self):
+        """Render the full catalog response body."""
+        return b''.join((
+            b'{"version":"', str(self.version).encode(), b'","full":true,',
+            b'"categories":', _json_list(self.category_json.values()), b',',
+            b'"items":', _json_list(self.item_json.values()), b'}',
+        ))
+
+    def can_answer_since(self, since_version):
+        """Return True if a delta since this version can be computed."""
+        return since_version is not None and self.base_version <= since_version <= self.version
+
+    def render_since(self, since_version):
+        """Render only the rows changed or removed after since_version."""
+        categories = [
+            data for pk, data in self.category_json.items()
+            if self.category_stamps[pk] > since_version
+        ]
+        items = [
+            data for pk, data in self.item_json.items()
+            if self.item_stamps[pk] > since_version
+        ]
+        removed_categories = [
+            pk for pk, stamp in self.removed_categories.items() if stamp > since_version
+        ]
+        removed_items = [
+            pk for pk, stamp in self.removed_items.items() if stamp > since_version
+        ]
+        return b''.join((
+            b'{"version":"', str(self.version).encode(), b'","full":false,',
+            b'"since_version":"', str(since_version).encode(), b'",',
+            b'"categories":', _json_list(categories), b',',
+            b'"items":', _json_list(items), b',',
+            b'"removed_categories":', _renderer.render(removed_categories), b',',
+            b'"removed_items":', _renderer.render(removed_items), b'}',
+        ))
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def _load_rows():
+    """Serialize all categories and active items from the primary database."""
+    categories = IngredientCategorySerializer(
+        IngredientCategory.objects.using(DEFAULT_DB_ALIAS).order_by('name'), many=True
+    ).data
+    items = IngredientItemSerializer(
+        IngredientItem.objects.using(DEFAULT_DB_ALIAS).filter(is_active=True)
+        .select_related('category').order_by('name'),
+        many=True
+    ).data
+    return [dict(row) for row in categories], [dict(row) for row in items]
+
+
+def _is_fresh(snapshot, version):
+    """Return True if a snapshot can be served for the current version."""
+    max_age = getattr(settings, 'INGREDIENT_CATALOG_MAX_AGE', 300)
+    return (
+        snapshot is not None and snapshot.version == version
+        and time.monotonic() - snapshot.built_at < max_age
+    )
+
+
+def get_ingredient_snapshot():
+    """Return this worker's up-to-date ingredient snapshot."""
+    global _snapshot  # pylint: disable=global-statement
+    version = get_ingredient_version()
+    if _is_fresh(_snapshot, version):
+        return _snapshot
+
+    with _snapshot_lock:
+        previous = _snapshot
+        if _is_fresh(previous, version):
+            return previous
+
+        categories, items = _load_rows()
+        if previous is not None and previous.version == version:
+            # Periodic rebuild: keep the version unless another worker
+            # changed the catalog without this worker seeing the bump
+            rendered = (
+                {row['id']: _renderer.render(row) for row in categories},
+                {row['id']: _renderer.render(row) for row in items},
+            )
+            if previous.same_rows(*rendered):
+                previous.built_at = time.monotonic()
+                return previous
+            version = bump_ingredient_version()
+
+        _snapshot = IngredientSnapshot(version, categories, items, previous)
+        return _snapshot
+
+
+async def aget_ingredient_snapshot():
+    """Async variant of get_ingredient_snapshot(); rebuilds run in a thread."""
+    if _is_fresh(_snapshot, await aget_ingredient_version()):
+        return _snapshot
+    return await sync_to_async(get_ingredient_snapshot)()
+
+
+def filter_ingredients(items, params):
+    """
+    Apply the ingredient list filters to snapshot rows.
+
+    Query Parameters:
+        - category: Filter by category name (case-insensitive substring)
+        - search: Search in ingredient name (case-insensitive substring)
+    """
+    category = params.get('category')
+    search = params.get('search')
+
+    # Filter by category name
+    if category:
+        needle = category.lower()
+        items = [
+            row for row in items
+            if row['category'] and needle in row['category']['name'].lower()
+        ]
+
+    # Search by ingredient name
+    if search:
+        needle = search.lower()
+        items = [row for row in items if needle in row['name'].lower()]
+
+    return items
@@ -0,0 +1,229 @@
+"""
+Ranked typeahead index for ingredient suggestions.
+
+The index covers the names and aliases of the active ingredients in the
+ingredient snapshot (recipes.ingredient_catalog). A prefix trie answers
+exact, whole-name prefix and word prefix matches ("oil" finds "Olive Oil"),
+and a trigram index catches typos ("tomatoe", "brocoli") by Jaccard
+similarity, or by a single edit for short words ("olvie"). Results are
+ranked by match kind (exact, prefix, word prefix, fuzzy), then by how many
+recipes use the ingredient, then by name length.
+
+Each worker builds the index once per ingredient snapshot and refreshes the
+usage counts every INGREDIENT_CATALOG_MAX_AGE seconds, so lookups never
+query the database.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count
+
+from .ingredient_catalog import get_ingredient_snapshot
+from .models import IngredientItem, RecipeIngredient
+
+EXACT, PREFIX, WORD_PREFIX, FUZZY = range(4)
+
+# Minimum trigram similarity for a typo match
+FUZZY_THRESHOLD = 0.3
+
+# Short terms share few trigrams, so one edit ("olvie") also counts as a match
+MAX_EDITS = 1
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Lowercase text, strip accents and collapse punctuation into single spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def trigrams(term):
+    """Return the set of padded character trigrams of a normalized term."""
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=MAX_EDITS):
+    """Return the edit distance (with transpositions) of a and b, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+class _Node:
+    """Prefix trie node with the best match tier of every item below it."""
+
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = {}
+
+
+class IngredientIndex:
+    """Prefix trie and trigram index over ingredient names and aliases."""
+
+    def __init__(self, snapshot, aliases, usage):
+        self.snapshot = snapshot
+        self.built_at = time.monotonic()
+        self.items = {row['id']: row for row in snapshot.items}
+        self.usage = usage
+        self.exact = {}
+        self.root = _Node()
+        self.terms = []
+        self.term_ids = []
+        self.term_trigrams = []
+        self.trigram_terms = {}
+
+        for pk, row in self.items.items():
+            for name in (row['name'], *aliases.get(pk, ())):
+                self._add(pk, normalize(name))
+
+    def _add(self, pk, term):
+        """Index one name or alias of an ingredient."""
+        if not term:
+            return
+        self.exact.setdefault(term, set()).add(pk)
+        self._insert(term, pk, PREFIX)
+
+        words = term.split(' ')
+        for position in range(1, len(words)):
+            self._insert(' '.join(words[position:]), pk, WORD_PREFIX)
+
+        # Index every word too, so a typo in one word of a longer name matches
+        for fuzzy_term in {term, *(word for word in words if len(word) >= 3)}:
+            grams = trigrams(fuzzy_term)
+            number = len(self.terms)
+            self.terms.append(fuzzy_term)
+            self.term_ids.append(pk)
+            self.term_trigrams.append(len(grams))
+            for gram in grams:
+                self.trigram_terms.setdefault(gram, []).append(number)
+
+    def _insert(self, term, pk, tier):
+        """Record pk with the given tier on every trie node along term."""
+        node = self.root
+        for char in term:
+            node = node.children.setdefault(char, _Node())
+            if node.ids.get(pk, FUZZY) > tier:
+                node.ids[pk] = tier
+
+    def _prefix_matches(self, query):
+        """Return {pk: tier} of items with a name or word starting with query."""
+        node = self.root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+        return node.ids
+
+    def _fuzzy_matches(self, query):
+        """Return {pk: similarity} of items with a term similar to query."""
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.trigram_terms.get(gram, ()))
+
+        matches = {}
+        for number, common in shared.items():
+            similarity = common / (len(grams) + self.term_trigrams[number] - common)
+            if similarity < FUZZY_THRESHOLD:
+                if common < 2 or edit_distance(query, self.terms[number]) > MAX_EDITS:
+                    continue
+                similarity = FUZZY_THRESHOLD
+            pk = self.term_ids[number]
+            if similarity > matches.get(pk, 0):
+                matches[pk] = similarity
+        return matches
+
+    def suggest(self, query, limit=10, category=None):
+        """Return up to limit snapshot rows matching query, best first."""
+        query = normalize(query)
+        if not query:
+            return []
+
+        ranks = {pk: (tier, 0) for pk, tier in self._prefix_matches(query).items()}
+        for pk in self.exact.get(query, ()):
+            ranks[pk] = (EXACT, 0)
+        if len(ranks) < limit:
+            for pk, similarity in self._fuzzy_matches(query).items():
+                if pk not in ranks:
+                    ranks[pk] = (FUZZY, -similarity)
+
+        # Filter by category name
+        if category:
+            needle = category.lower()
+            ranks = {
+                pk: rank for pk, rank in ranks.items()
+                if self.items[pk]['category']
+                and needle in self.items[pk]['category']['name'].lower()
+            }
+
+        # Among equal matches, prefer used, then shorter names
+        ranked = sorted(ranks, key=lambda pk: (
+            *ranks[pk], -self.usage.get(pk, 0),
+            len(self.items[pk]['name']), self.items[pk]['name'],
+        ))
+        return [self.items[pk] for pk in ranked[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _load_aliases():
+    """Return {ingredient id: aliases} for active ingredients with aliases."""
+    rows = IngredientItem.objects.using(DEFAULT_DB_ALIAS).filter(is_active=True)
+    return {pk: aliases for pk, aliases in rows.values_list('id', 'aliases') if aliases}
+
+
+def _load_usage():
+    """Return {ingredient id: number of recipe ingredient rows using it}."""
+    rows = (
+        RecipeIngredient.objects.using(DEFAULT_DB_ALIAS)
+        .values('ingredient_id').annotate(uses=Count('id'))
+        .values_list('ingredient_id', 'uses')
+    )
+    return dict(rows)
+
+
+def _is_fresh(index, snapshot):
+    """Return True if the index matches the snapshot and its usage is recent."""
+    max_age = getattr(settings, 'INGREDIENT_CATALOG_MAX_AGE', 300)
+    return (
+        index is not None and index.snapshot is snapshot
+        and time.monotonic() - index.built_at < max_age
+    )
+
+
+def get_ingredient_index():
+    """Return this worker's up-to-date ingredient index."""
+    global _index  # pylint: disable=global-statement
+    snapshot = get_ingredient_snapshot()
+    if _is_fresh(_index, snapshot):
+        return _index
+
+    with _index_lock:
+        if _is_fresh(_index, snapshot):
+            return _index
+        _index = IngredientIndex(snapshot, _load_aliases(), _load_usage())
+        return _index
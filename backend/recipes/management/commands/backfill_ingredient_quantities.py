@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes.models import RecipeIngredient
+
+QUANTITY_FIELDS = ['quantity', 'canonical_quantity', 'canonical_unit']
+
+
+class Command(BaseCommand):
+    help = 'Fill the numeric quantity columns of existing recipe ingredients in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000, help='Rows to update per transaction'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every row, not only rows without quantities'
+        )
+
+    def handle(self, *args, **options):
+        queryset = RecipeIngredient.objects.only('id', 'amount', 'unit', *QUANTITY_FIELDS)
+        if not options['all']:
+            # Rows written before the columns existed have none of them set
+            queryset = queryset.filter(quantity__isnull=True, canonical_unit__isnull=True)
+
+        updated = 0
+        last_id = 0
+        while True:
+            # Walk the primary key so each batch is an index range scan
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:options['batch_size']])
+            if not batch:
+                break
+            for row in batch:
+                row.set_quantities()
+            with transaction.atomic():
+                RecipeIngredient.objects.bulk_update(batch, QUANTITY_FIELDS)
+            updated += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Updated {updated} rows')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Backfilled quantities for {updated} recipe ingredients')
+        )
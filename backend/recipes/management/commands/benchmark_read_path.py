@@ -0,0 +1,91 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.models import Recipe
+
+DEFAULT_PATHS = (
+    '/api/recipes/',
+    '/api/recipes/{recipe_id}/',
+    '/api/recipes/{recipe_id}/comments/',
+    '/api/ingredients/',
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent read throughput of running WSGI and ASGI servers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--wsgi-url', default='http://127.0.0.1:8000',
+            help='Base URL of the WSGI deployment (gunicorn sync workers)'
+        )
+        parser.add_argument(
+            '--asgi-url', default='http://127.0.0.1:8001',
+            help='Base URL of the ASGI deployment (uvicorn workers)'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=50,
+            help='Number of concurrent clients'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Requests to send to each deployment'
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Path to request (repeatable); {recipe_id} is filled in'
+        )
+
+    def handle(self, *args, **options):
+        recipe = Recipe.objects.filter(is_public=True).order_by('id').first()
+        if recipe is None:
+            raise CommandError('No public recipes found; run seed_data first.')
+        paths = [
+            path.format(recipe_id=recipe.id)
+            for path in options['paths'] or DEFAULT_PATHS
+        ]
+
+        self.stdout.write(
+            f"{options['requests']} requests per mode, "
+            f"{options['concurrency']} concurrent clients over {len(paths)} path(s)"
+        )
+        for mode in ('wsgi', 'asgi'):
+            base_url = options[f'{mode}_url'].rstrip('/')
+            urls = [base_url + paths[i % len(paths)] for i in range(options['requests'])]
+            result = self.run_load(urls, options['concurrency'])
+            self.stdout.write(
+                f"{mode.upper()}  {result['throughput']:8.1f} req/s  "
+                f"p50 {result['p50']:7.1f} ms  p95 {result['p95']:7.1f} ms  "
+                f"errors {result['errors']}"
+            )
+
+    def run_load(self, urls, concurrency):
+        """Request every URL with a pool of concurrent clients."""
+        def fetch(url):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, urls))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for ok, latency in results if ok)
+        if not latencies:
+            raise CommandError(f'Every request to {urls[0]} failed; is the server running?')
+        return {
+            'throughput': len(latencies) / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'errors': len(results) - len(latencies),
+        }
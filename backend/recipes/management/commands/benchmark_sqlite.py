@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipe_app.sqlite_backend.base import DEFAULT_PRAGMAS
+
+
+class Command(BaseCommand):
+    help = 'Compare SQLite reader/writer throughput with default and tuned settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Reader threads')
+        parser.add_argument('--writers', type=int, default=4, help='Writer threads')
+        parser.add_argument(
+            '--duration', type=float, default=5.0, help='Seconds to run each profile'
+        )
+        parser.add_argument(
+            '--rows', type=int, default=5000, help='Rows to seed before running'
+        )
+
+    def handle(self, *args, **options):
+        options_dict = settings.DATABASES['default'].get('OPTIONS', {})
+        profiles = (
+            # Django's sqlite3 defaults: rollback journal, full fsync, deferred BEGIN
+            ('default', {}, 'DEFERRED'),
+            (
+                'tuned',
+                options_dict.get('pragmas', DEFAULT_PRAGMAS),
+                options_dict.get('transaction_mode', 'IMMEDIATE'),
+            ),
+        )
+
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, "
+            f"{options['duration']:.0f}s per profile"
+        )
+        for name, pragmas, transaction_mode in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.seed(path, options['rows'])
+                result = self.run_profile(path, pragmas, transaction_mode, options)
+            self.stdout.write(
+                f"{name:<8} reads {result['reads'] / options['duration']:9.1f}/s  "
+                f"writes {result['writes'] / options['duration']:8.1f}/s  "
+                f"locked errors {result['errors']}"
+            )
+
+    def seed(self, path, rows):
+        """Create a recipe-like table with some rows."""
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE recipe (id INTEGER PRIMARY KEY, title TEXT, '
+            'food_type TEXT, cook_time INTEGER, created_at REAL)'
+        )
+        connection.executemany(
+            'INSERT INTO recipe (title, food_type, cook_time, created_at) VALUES (?, ?, ?, ?)',
+            [(f'Recipe {i}', ('dessert', 'soup', 'salad')[i % 3], i % 90, time.time())
+             for i in range(rows)]
+        )
+        connection.execute('CREATE INDEX recipe_food_type ON recipe (food_type)')
+        connection.commit()
+        connection.close()
+
+    def connect(self, path, pragmas):
+        """Open a connection the way the Django backend would."""
+        connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def run_profile(self, path, pragmas, transaction_mode, options):
+        """Run readers and writers concurrently and count completed operations."""
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def record(key):
+            with lock:
+                counts[key] += 1
+
+        def reader():
+            connection = self.connect(path, pragmas)
+            while not stop.is_set():
+                try:
+                    connection.execute(
+                        'SELECT COUNT(*), AVG(cook_time) FROM recipe WHERE food_type = ?',
+                        ('dessert',)
+                    ).fetchone()
+                    record('reads')
+                except sqlite3.OperationalError:
+                    record('errors')
+            connection.close()
+
+        def writer():
+            connection = self.connect(path, pragmas)
+            while not stop.is_set():
+                try:
+                    # Read-then-write transaction, like get_or_create()
+                    connection.execute(f'BEGIN {transaction_mode}')
+                    connection.execute('SELECT MAX(id) FROM recipe').fetchone()
+                    connection.execute(
+                        'INSERT INTO recipe (title, food_type, cook_time, created_at) '
+                        'VALUES (?, ?, ?, ?)',
+                        ('New recipe', 'soup', 30, time.time())
+                    )
+                    connection.execute('COMMIT')
+                    record('writes')
+                except sqlite3.OperationalError:
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                    record('errors')
+            connection.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return counts
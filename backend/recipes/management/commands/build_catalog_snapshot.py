@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipes.catalog_snapshot import brotli, build_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the public recipe catalog as a versioned, compressed JSON bundle '
+        'served as a static file; rebuilds only recipes changed since the last build'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Rebuild every recipe instead of only those changed since the last build'
+        )
+        parser.add_argument(
+            '--binary-index', action='store_true',
+            help='Also write a compact binary index of the filterable columns'
+        )
+        parser.add_argument(
+            '--keep', type=int, default=3, help='Number of bundle versions to keep on disk'
+        )
+
+    def handle(self, *args, **options):
+        if options['keep'] < 1:
+            raise CommandError('--keep must be at least 1.')
+        if brotli is None:
+            self.stdout.write('Brotli is not installed; writing gzip variants only')
+
+        result = build_snapshot(
+            full=options['full'], binary_index=options['binary_index'], keep=options['keep']
+        )
+        if result['version'] is None:
+            self.stdout.write(self.style.SUCCESS(
+                f"Catalog snapshot is up to date ({result['recipes']} recipes)"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote catalog snapshot {result['version']}: {result['recipes']} recipes, "
+            f"{result['changed']} rebuilt, {result['pruned']} old version(s) removed"
+        ))
@@ -140,6 +140,19 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(f'Created ingredient: {ingredient.name}')
 
+        # Alternative names matched by ingredient suggestions
+        aliases_data = {
+            'Bell Pepper': ['capsicum', 'sweet pepper'],
+            'Zucchini': ['courgette'],
+            'Eggplant': ['aubergine'],
+            'Ground Beef': ['minced beef', 'beef mince'],
+            'Chickpeas': ['garbanzo beans'],
+            'Heavy Cream': ['double cream', 'whipping cream'],
+            'Cilantro': ['coriander'],
+        }
+        for name, aliases in aliases_data.items():
+            IngredientItem.objects.filter(name=name, aliases=[]).update(aliases=aliases)
+
         self.stdout.write(
             self.style.SUCCESS('Successfully populated ingredients and categories!')
         )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from recipes.user_stats import STATS_BATCH_SIZE, refresh_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized recipe stats of every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=STATS_BATCH_SIZE,
+            help='Users recomputed per batch of grouped queries'
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_user_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed stats for {refreshed} users'))
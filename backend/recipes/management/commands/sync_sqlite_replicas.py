@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database to the local SQLite read replicas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep syncing every INTERVAL seconds instead of copying once'
+        )
+
+    def handle(self, *args, **options):
+        primary = connections['default'].settings_dict
+        replicas = [connections[alias].settings_dict for alias in settings.DATABASE_REPLICAS]
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('The primary database is not SQLite.')
+        if not replicas:
+            raise CommandError('No replicas configured; set SQLITE_REPLICAS.')
+
+        while True:
+            for replica in replicas:
+                self.copy(primary['NAME'], replica['NAME'])
+            self.stdout.write(self.style.SUCCESS(f'Synced {len(replicas)} replica(s)'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def copy(self, source_name, target_name):
+        """Snapshot the primary with the SQLite backup API and swap it in."""
+        temporary_name = f'{target_name}.tmp'
+        source = sqlite3.connect(source_name)
+        target = sqlite3.connect(temporary_name)
+        try:
+            source.backup(target)
+            # The primary runs in WAL mode; a rollback-journal copy has no
+            # -wal/-shm side files that could be mismatched by the swap below
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+            source.close()
+        # Readers keep their open snapshot; new connections see the new file
+        os.replace(temporary_name, target_name)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredientitem',
+            name='aliases',
+            field=models.JSONField(blank=True, default=list, help_text='Alternative names matched by ingredient suggestions'),
+        ),
+    ]
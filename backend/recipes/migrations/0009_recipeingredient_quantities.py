@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_ingredientitem_aliases'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='canonical_quantity',
+            field=models.FloatField(blank=True, editable=False, help_text='Quantity in canonical_unit', null=True),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='canonical_unit',
+            field=models.CharField(blank=True, editable=False, help_text='ml for volumes, g for weights, piece for whole items, else the unit', max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='quantity',
+            field=models.FloatField(blank=True, editable=False, help_text='Amount parsed as a number; empty if it could not be parsed', null=True),
+        ),
+    ]
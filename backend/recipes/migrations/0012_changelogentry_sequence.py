@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:38
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def number_existing_entries(apps, schema_editor):
+    """Keep existing cursors valid: number the current entries by their id."""
+    ChangeLogEntry = apps.get_model('recipes', 'ChangeLogEntry')
+    VersionCounter = apps.get_model('recipes', 'VersionCounter')
+    ChangeLogEntry.objects.update(sequence=F('id'))
+    last = ChangeLogEntry.objects.aggregate(last=Max('id'))['last']
+    if last is not None:
+        VersionCounter.objects.update_or_create(key='change-log', defaults={'value': last})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_versioncounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelogentry',
+            name='sequence',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_changelogentry_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrimaryReadWindow',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('until', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
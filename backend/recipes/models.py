@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .units import canonicalize
+
 User = get_user_model()
 
 
@@ -28,6 +30,10 @@ class IngredientItem(models.Model):
         null=True, blank=True, related_name='ingredients'
     )
     description = models.TextField(blank=True, null=True)
+    aliases = models.JSONField(
+        default=list, blank=True,
+        help_text="Alternative names matched by ingredient suggestions"
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -45,6 +51,10 @@ class Recipe(models.Model):
     description = models.TextField(blank=True, null=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recipes')
     image = models.ImageField(upload_to='recipe_images/', blank=True, null=True)
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Thumbnails and placeholder generated from the image"
+    )
     prep_time = models.PositiveIntegerField(
         help_text="Preparation time in minutes", blank=True, null=True
     )
@@ -138,6 +148,18 @@ class RecipeIngredient(models.Model):
     )
     amount = models.CharField(max_length=50, blank=True, null=True)
     unit = models.CharField(max_length=20, blank=True, null=True)
+    quantity = models.FloatField(
+        blank=True, null=True, editable=False,
+        help_text="Amount parsed as a number; empty if it could not be parsed"
+    )
+    canonical_quantity = models.FloatField(
+        blank=True, null=True, editable=False,
+        help_text="Quantity in canonical_unit"
+    )
+    canonical_unit = models.CharField(
+        max_length=20, blank=True, null=True, editable=False,
+        help_text="ml for volumes, g for weights, piece for whole items, else the unit"
+    )
     order = models.PositiveIntegerField(default=0)
     notes = models.TextField(
         blank=True, null=True,
@@ -156,6 +178,21 @@ class RecipeIngredient(models.Model):
             return f"{self.amount} {self.ingredient.name}"
         return str(self.ingredient.name)
 
+    def set_quantities(self):
+        """Fill the numeric quantity columns from amount and unit."""
+        self.quantity, self.canonical_quantity, self.canonical_unit = canonicalize(
+            self.amount, self.unit
+        )
+
+    def save(self, *args, **kwargs):
+        self.set_quantities()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'amount', 'unit'} & set(update_fields):
+            kwargs['update_fields'] = {
+                *update_fields, 'quantity', 'canonical_quantity', 'canonical_unit'
+            }
+        super().save(*args, **kwargs)
+
 
 class Instruction(models.Model):
     """Model for storing recipe cooking instructions."""
@@ -218,3 +255,47 @@ class Comment(models.Model):
 
     def __str__(self):
         return f"{self.user.username} commented on {self.recipe.title}"
+
+
+class ChangeLogEntry(models.Model):
+    """Append-only log of catalog writes, served by the change feed."""
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    ACTION_CHOICES = [
+        (UPSERT, 'Upsert'),
+        (DELETE, 'Delete'),
+    ]
+
+    model = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    recipe_id = models.BigIntegerField(db_index=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Position in commit order, assigned once the write has committed
+    sequence = models.BigIntegerField(null=True, blank=True, unique=True)
+
+    class Meta:
+        """Meta options for ChangeLogEntry."""
+        ordering = ['id']
+        verbose_name_plural = 'Change log entries'
+
+    def __str__(self):
+        return f"{self.action} {self.model} {self.object_id}"
+
+
+class VersionCounter(models.Model):
+    """Shared version counter used to invalidate cached data (see recipes.cache)."""
+    key = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class PrimaryReadWindow(models.Model):
+    """Time until which an API client reads the primary (see recipe_app.replicas)."""
+    key = models.CharField(max_length=40, primary_key=True)
+    until = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key} until {self.until}"
@@ -0,0 +1,166 @@
+"""
+Server-rendered recipe pages.
+
+The React app is served as one index.html shell for every route. For the
+recipe detail page (/recipes/<id>) and the recipe feed (/recipes) the shell
+is filled in on the server: the page title and description, readable markup
+inside #root for crawlers and first paint, and the API data the page fetches
+first, inlined as <script id="initial-state" type="application/json">. The
+app uses that data as the initial query data (frontend/src/utils/
+initialState.js) and refreshes it in the background, which also fills in the
+signed-in user's saved and rating state.
+
+Rendered pages are cached per recipe version (bumped by writes to the
+recipe, its ingredients, instructions and ratings) or, for the feed, per
+catalog version, so writes invalidate them without tracking keys. Responses
+carry that version as an ETag, so revalidation is a 304 that costs only the
+version lookup, plus a visibility check for recipe pages. The feed may be
+cached by browsers and shared caches for PAGE_CACHE_MAX_AGE seconds and
+served stale while revalidating for PAGE_STALE_WHILE_REVALIDATE; recipe
+pages only for RECIPE_PAGE_MAX_AGE seconds and never stale. Private and
+missing recipes get the plain shell.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.html import format_html, json_script
+from django.utils.http import parse_etags
+from django.utils.text import Truncator
+from django.views.decorators.http import require_safe
+from rest_framework.utils.encoders import JSONEncoder
+
+from .cache import get_catalog_version, get_recipe_version
+from .cards import card_rows, render_cards
+from .fieldsets import CARD_FIELDS
+from .models import Recipe
+from .serializers import RecipeDetailSerializer
+
+# The first page RecipeList.jsx requests
+FEED_PAGE_SIZE = 12
+FEED_ORDERING = '-created_at'
+
+# Pages are keyed by version, so entries only need a timeout to bound memory
+PAGE_CACHE_TIMEOUT = 300
+
+SITE_NAME = 'Pulp Kitchen'
+
+_TITLE_RE = re.compile(r'<title>.*?</title>', re.S)
+_DESCRIPTION_RE = re.compile(r'<meta name="description"[^>]*>', re.S)
+_EMPTY_ROOT = '<div id="root"></div>'
+
+
+@lru_cache(maxsize=1)
+def _shell():
+    """Return the React app's index.html and a digest of it."""
+    html = render_to_string('index.html')
+    return html, hashlib.sha1(html.encode()).hexdigest()[:12]
+
+
+def _fill_shell(title, description, markup, state):
+    """Put page metadata, markup and initial state into the shell."""
+    html = _shell()[0]
+    description = Truncator(description or '').chars(160)
+    html = _DESCRIPTION_RE.sub('', html, count=1)
+    html = _TITLE_RE.sub(lambda match: format_html(
+        '<title>{}</title><meta name="description" content="{}"/>'
+        '<meta property="og:title" content="{}"/><meta property="og:description" content="{}"/>',
+        title, description, title, description,
+    ), html, count=1)
+    # DRF's encoder, so numbers and dates match the API responses
+    state = json_script(state, 'initial-state', encoder=JSONEncoder)
+    root = f'<div id="root">{markup}</div>{state}'
+    return html.replace(_EMPTY_ROOT, root, 1)
+
+
+def render_recipe_page(pk):
+    """Render the detail page of a public recipe, or return None."""
+    recipe = (
+        Recipe.objects.filter(is_public=True, pk=pk)
+        .select_related('author')
+        .prefetch_related('ingredients__ingredient__category', 'instructions', 'ratings__user')
+        .first()
+    )
+    if recipe is None:
+        return None
+    data = RecipeDetailSerializer(recipe).data
+    markup = render_to_string('recipes/pages/recipe_detail.html', {'recipe': data})
+    return _fill_shell(
+        f'{recipe.title} | {SITE_NAME}', recipe.description, markup, {'recipe': data}
+    )
+
+
+def render_feed_page():
+    """Render the first page of the recipe feed."""
+    recipes = Recipe.objects.filter(is_public=True).order_by(FEED_ORDERING)
+    count = recipes.count()
+    results = render_cards(
+        card_rows(recipes[:FEED_PAGE_SIZE], CARD_FIELDS, ()), CARD_FIELDS, ()
+    )
+    query = {'ordering': FEED_ORDERING, 'page_size': FEED_PAGE_SIZE}
+    data = {
+        'count': count,
+        'next': (
+            f"/api/recipes/?{urlencode({**query, 'page': 2})}"
+            if count > FEED_PAGE_SIZE else None
+        ),
+        'previous': None,
+        'results': results,
+    }
+    markup = render_to_string('recipes/pages/recipe_feed.html', {'recipes': results})
+    return _fill_shell(
+        f'Discover Recipes | {SITE_NAME}', 'The newest recipes shared on Pulp Kitchen.',
+        markup, {'recipes': data}
+    )
+
+
+def _page_response(request, name, version, render, max_age, stale_while_revalidate=None):
+    """Serve a rendered page from the cache, or the plain shell if render returns None."""
+    shell, digest = _shell()
+    etag = f'"{name}-{version}-{digest}"'
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        key = f'recipes:page:{name}:{version}:{digest}'
+        html = cache.get(key)
+        if html is None:
+            html = render()
+            if html is None:
+                return HttpResponse(shell)
+            cache.set(key, html, PAGE_CACHE_TIMEOUT)
+        response = HttpResponse(html)
+    response['ETag'] = etag
+    cache_control = {'public': True, 'max_age': max_age}
+    if stale_while_revalidate:
+        cache_control['stale_while_revalidate'] = stale_while_revalidate
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+@require_safe
+def recipe_page(request, pk):
+    """Serve the server-rendered recipe detail page."""
+    pk = int(pk)
+    # Checked before the ETag, so a recipe made private is never revalidated
+    if not Recipe.objects.filter(is_public=True, pk=pk).exists():
+        return HttpResponse(_shell()[0])
+    return _page_response(
+        request, f'recipe-{pk}', get_recipe_version(pk), lambda: render_recipe_page(pk),
+        max_age=getattr(settings, 'RECIPE_PAGE_MAX_AGE', 60),
+    )
+
+
+@require_safe
+def feed_page(request):
+    """Serve the server-rendered recipe feed."""
+    return _page_response(
+        request, 'feed', get_catalog_version(), render_feed_page,
+        max_age=getattr(settings, 'PAGE_CACHE_MAX_AGE', 300),
+        stale_while_revalidate=getattr(settings, 'PAGE_STALE_WHILE_REVALIDATE', 86400),
+    )
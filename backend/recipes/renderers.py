@@ -0,0 +1,75 @@
+"""
+High-performance renderers for the recipe API.
+
+FastJSONRenderer uses orjson when it is installed and falls back to DRF's
+stdlib-based JSONRenderer otherwise. MessagePackRenderer offers a compact
+binary encoding (application/msgpack) for internal bulk consumers.
+"""
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+# DRF's encoder knows how to turn Decimal, datetime, lazy strings, UUIDs and
+# querysets into JSON-compatible values; both renderers reuse it as fallback.
+_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    """Convert values the binary encoders don't support natively."""
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson when available.
+
+    Output matches DRF's JSONRenderer: compact separators, UTF-8 text,
+    Decimals as numbers and datetimes in DRF's ISO 8601 format. Indented
+    output (browsable API, ?indent=) and non-default JSON settings use the
+    stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring."""
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=encode_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+        # Keep output a strict javascript subset, like JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer which serializes to MessagePack.
+    Requires the optional msgpack package.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into MessagePack, returning a bytestring."""
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
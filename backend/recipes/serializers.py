@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from users.serializers import UserSerializer
+from recipe_app.images import ImageVariantsField
+from users.serializers import UserSerializer, UserSummarySerializer
+from .fieldsets import CARD_FIELDS
 from .models import (
     Recipe, RecipeIngredient, Instruction, Rating, SavedRecipe,
     IngredientItem, IngredientCategory, Comment
@@ -33,9 +35,11 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         """Meta options for RecipeIngredientSerializer."""
         model = RecipeIngredient
         fields = [
-            'id', 'ingredient', 'ingredient_id', 'amount', 
-            'unit', 'order', 'notes'
+            'id', 'ingredient', 'ingredient_id', 'amount',
+            'unit', 'quantity', 'canonical_quantity', 'canonical_unit',
+            'order', 'notes'
         ]
+        read_only_fields = ['quantity', 'canonical_quantity', 'canonical_unit']
 
 
 class InstructionSerializer(serializers.ModelSerializer):
@@ -58,20 +62,48 @@ class RatingSerializer(serializers.ModelSerializer):
 
 
 class RecipeListSerializer(serializers.ModelSerializer):
-    """Serializer for recipe list view."""
+    """
+    Serializer for recipe list view.
+    Honors the 'fields' and 'expand' sparse fieldset in the serializer
+    context; the author is a compact summary unless expanded. The personal
+    fields are only returned when the fieldset includes them.
+    """
     author = UserSerializer(read_only=True)
+    image_variants = ImageVariantsField('image')
     average_rating = serializers.ReadOnlyField()
     total_ratings = serializers.ReadOnlyField()
+    is_saved = serializers.SerializerMethodField()
+    user_rating = serializers.SerializerMethodField()
 
     class Meta:
         """Meta options for RecipeListSerializer."""
         model = Recipe
         fields = [
-            'id', 'title', 'description', 'author', 'image', 'prep_time',
-            'cook_time', 'servings', 'difficulty', 'food_type', 'is_public',
-            'created_at', 'updated_at', 'average_rating', 'total_ratings'
+            'id', 'title', 'description', 'author', 'image', 'image_variants',
+            'prep_time', 'cook_time', 'servings', 'difficulty', 'food_type',
+            'is_public', 'created_at', 'updated_at', 'average_rating', 'total_ratings',
+            'is_saved', 'user_rating'
         ]
 
+    def get_fields(self):
+        """Drop fields outside the requested fieldset and shrink the author."""
+        fields = super().get_fields()
+        requested = self.context.get('fields') or CARD_FIELDS
+        for name in list(fields):
+            if name not in requested:
+                fields.pop(name)
+        if 'author' in fields and 'author' not in self.context.get('expand', ()):
+            fields['author'] = UserSummarySerializer(read_only=True)
+        return fields
+
+    def get_is_saved(self, obj):
+        """Saved state annotated by annotate_user_state()."""
+        return getattr(obj, 'saved_by_user', False)
+
+    def get_user_rating(self, obj):
+        """Current user's rating annotated by annotate_user_state()."""
+        return getattr(obj, 'rating_by_user', None)
+
 
 class RecipeDetailSerializer(serializers.ModelSerializer):
     """Serializer for detailed recipe view."""
@@ -96,6 +128,9 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
 
     def get_is_saved(self, obj):
         """Check if recipe is saved by current user."""
+        # Use the value annotated by the queryset when present
+        if hasattr(obj, 'saved_by_user'):
+            return obj.saved_by_user
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return SavedRecipe.objects.filter(
@@ -105,6 +140,8 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
 
     def get_user_rating(self, obj):
         """Get current user's rating for this recipe."""
+        if hasattr(obj, 'rating_by_user'):
+            return obj.rating_by_user
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
@@ -0,0 +1,148 @@
+"""
+Shopping list aggregation across recipes.
+
+Sums the numeric ingredient quantities (RecipeIngredient.canonical_quantity)
+of the selected recipes per ingredient and unit family (ml, g, piece, or
+any other unit) in a single grouped query. Scaling to the requested
+servings happens in the same query as SQL arithmetic. The totals are then
+rounded to readable units and grouped by ingredient category.
+"""
+from django.db.models import (
+    Case, Count, F, FloatField, Q, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from rest_framework.exceptions import ValidationError
+
+from .models import RecipeIngredient
+from .units import (
+    IMPERIAL, MAX_SERVINGS, METRIC, SYSTEMS, convert_to_imperial, format_number
+)
+
+# Largest number of recipes merged into one list
+MAX_RECIPES = 50
+
+
+def _parse_id(value, name):
+    """Parse a recipe id from a query parameter value."""
+    try:
+        return int(value)
+    except (TypeError, ValueError) as exc:
+        raise ValidationError({name: f'Invalid recipe id: "{value.strip()}".'}) from exc
+
+
+def _parse_int(value, name, maximum):
+    """Parse a positive integer query parameter value."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if not 1 <= number <= maximum:
+        raise ValidationError({name: f'Must be a whole number from 1 to {maximum}.'})
+    return number
+
+
+def parse_shopping_params(params):
+    """
+    Read the shopping list query parameters.
+
+    Returns (recipe ids or None for all saved recipes, default servings,
+    {recipe id: servings}, units system).
+
+    Query Parameters:
+        - recipes: Comma-separated recipe ids (default: the user's saved recipes)
+        - servings: Servings for every recipe ("8"), or per recipe ("1:4,2:6")
+        - units: "metric" (default) or "imperial"
+    """
+    recipe_ids = None
+    if params.get('recipes'):
+        recipe_ids = list(dict.fromkeys(
+            _parse_id(value, 'recipes')
+            for value in params['recipes'].split(',') if value.strip()
+        ))
+        if len(recipe_ids) > MAX_RECIPES:
+            raise ValidationError({'recipes': f'At most {MAX_RECIPES} recipes are allowed.'})
+
+    servings = None
+    per_recipe = {}
+    for part in (params.get('servings') or '').split(','):
+        if ':' in part:
+            recipe_id, value = part.split(':', 1)
+            per_recipe[_parse_id(recipe_id, 'servings')] = _parse_int(
+                value, 'servings', MAX_SERVINGS
+            )
+        elif part.strip():
+            servings = _parse_int(part, 'servings', MAX_SERVINGS)
+
+    system = params.get('units') or METRIC
+    if system not in SYSTEMS:
+        raise ValidationError({'units': f'Must be one of: {", ".join(SYSTEMS)}.'})
+    return recipe_ids, servings, per_recipe, system
+
+
+def _scale_factor(servings, per_recipe):
+    """Return a SQL expression scaling each row to the requested servings."""
+    recipe_servings = NullIf(Cast('recipe__servings', FloatField()), Value(0.0))
+    target = Case(
+        *(When(recipe_id=pk, then=Value(float(value))) for pk, value in per_recipe.items()),
+        default=Value(float(servings)) if servings else recipe_servings,
+        output_field=FloatField(),
+    )
+    # Recipes without servings are not scaled
+    return Coalesce(target / recipe_servings, Value(1.0), output_field=FloatField())
+
+
+def _display(total, canonical_unit, system):
+    """Return a readable (amount, unit) for a canonical total."""
+    if system == IMPERIAL:
+        return convert_to_imperial(total, canonical_unit)
+    if canonical_unit == 'ml' and total >= 1000:
+        return format_number(total / 1000, 'l'), 'l'
+    if canonical_unit == 'g' and total >= 1000:
+        return format_number(total / 1000, 'kg'), 'kg'
+    return format_number(total, canonical_unit), canonical_unit
+
+
+def build_shopping_list(recipes, servings=None, per_recipe=None, system=METRIC):
+    """
+    Aggregate the ingredients of a recipe queryset into a shopping list
+    grouped by ingredient category, with one database query.
+    """
+    per_recipe = per_recipe or {}
+    rows = (
+        RecipeIngredient.objects.filter(recipe__in=recipes)
+        .values(
+            'ingredient_id', 'ingredient__name', 'ingredient__category_id',
+            'ingredient__category__name', 'canonical_unit',
+        )
+        .annotate(
+            total=Sum(
+                F('canonical_quantity') * _scale_factor(servings, per_recipe),
+                output_field=FloatField(),
+            ),
+            recipe_count=Count('recipe_id', distinct=True),
+            unmeasured=Count('id', filter=Q(canonical_quantity__isnull=True)),
+        )
+        .order_by('ingredient__category__name', 'ingredient__name', 'canonical_unit')
+    )
+
+    categories = {}
+    for row in rows:
+        category = categories.setdefault(row['ingredient__category_id'], {
+            'id': row['ingredient__category_id'],
+            'name': row['ingredient__category__name'],
+            'items': [],
+        })
+        amount, unit = None, row['canonical_unit']
+        if row['total'] is not None:
+            amount, unit = _display(row['total'], unit, system)
+        category['items'].append({
+            'ingredient_id': row['ingredient_id'],
+            'name': row['ingredient__name'],
+            'amount': amount,
+            'unit': unit,
+            'canonical_quantity': row['total'],
+            'canonical_unit': row['canonical_unit'],
+            'recipe_count': row['recipe_count'],
+            'unmeasured': row['unmeasured'],
+        })
+    return list(categories.values())
@@ -0,0 +1,87 @@
+"""
+Signal handlers that keep cached recipe data and author stats in sync with
+writes and record catalog writes in the change feed log.
+Connected in RecipesConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipe_app.images import schedule_variants
+from .cache import bump_catalog_version, bump_ingredient_version, bump_recipe_version
+from .changes import record_change
+from .models import (
+    ChangeLogEntry, Comment, IngredientCategory, IngredientItem, Instruction, Rating,
+    Recipe, RecipeIngredient, SavedRecipe
+)
+from .user_stats import schedule_stats_refresh
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_catalog(sender, instance, **kwargs):
+    """Bump the catalog version when recipes or their ratings change."""
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_save, sender=Instruction)
+@receiver(post_delete, sender=Instruction)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_recipe(sender, instance, **kwargs):
+    """Bump the recipe's version when it or its detail data change."""
+    bump_recipe_version(instance.pk if sender is Recipe else instance.recipe_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=SavedRecipe)
+@receiver(post_delete, sender=SavedRecipe)
+def refresh_author_stats(sender, instance, **kwargs):
+    """Queue a refresh of the stats of the author whose recipes changed."""
+    if sender is Recipe:
+        schedule_stats_refresh(user_id=instance.author_id)
+    else:
+        schedule_stats_refresh(recipe_id=instance.recipe_id)
+
+
+@receiver(post_save, sender=IngredientItem)
+@receiver(post_delete, sender=IngredientItem)
+@receiver(post_save, sender=IngredientCategory)
+@receiver(post_delete, sender=IngredientCategory)
+def invalidate_ingredient_snapshot(sender, instance, **kwargs):
+    """Bump the ingredient version when items or categories change."""
+    bump_ingredient_version()
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(sender, instance, **kwargs):
+    """Generate thumbnails and placeholder when the recipe image changes."""
+    schedule_variants(instance, 'image', 'image_variants')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_save, sender=Instruction)
+@receiver(post_save, sender=Rating)
+@receiver(post_save, sender=Comment)
+def log_upsert(sender, instance, **kwargs):
+    """Record a save in the change feed log."""
+    record_change(instance, ChangeLogEntry.UPSERT)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_delete, sender=Instruction)
+@receiver(post_delete, sender=Rating)
+@receiver(post_delete, sender=Comment)
+def log_delete(sender, instance, **kwargs):
+    """Record a delete in the change feed log."""
+    record_change(instance, ChangeLogEntry.DELETE)
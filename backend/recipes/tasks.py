@@ -0,0 +1,31 @@
+"""Housekeeping tasks for recipe data."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.queue import task
+from .changes import head_cursor
+from .models import ChangeLogEntry, PrimaryReadWindow
+from .user_stats import refresh_user_stats
+
+
+@task(every=timedelta(days=1))
+def purge_change_log():
+    """Delete change log entries older than CHANGE_LOG_RETENTION_DAYS."""
+    days = getattr(settings, 'CHANGE_LOG_RETENTION_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=days)
+    # Keep the newest entry so expired cursors can still be detected
+    ChangeLogEntry.objects.filter(created_at__lt=cutoff).exclude(sequence=head_cursor()).delete()
+
+
+@task(every=timedelta(days=1))
+def refresh_all_user_stats():
+    """Recompute every user's stats to correct drift from unsignalled writes."""
+    refresh_user_stats()
+
+
+@task(every=timedelta(days=1))
+def purge_primary_read_windows():
+    """Delete expired read-your-writes windows of API clients."""
+    PrimaryReadWindow.objects.filter(until__lt=timezone.now()).delete()
@@ -0,0 +1,569 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+import msgpack
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from users.models import User
+from . import catalog, ingredient_catalog
+from .catalog_snapshot import build_snapshot
+from .changes import assign_sequences
+from .cards import card_rows, render_cards, render_saved_cards, saved_card_rows
+from .fieldsets import annotate_user_state, parse_fieldset
+from .models import (
+    ChangeLogEntry, Comment, IngredientCategory, IngredientItem, Rating, Recipe,
+    RecipeIngredient, SavedRecipe
+)
+from .renderers import FastJSONRenderer
+from .serializers import RecipeDetailSerializer, RecipeListSerializer, SavedRecipeSerializer
+from .units import convert_recipe
+
+# Query strings covering the fieldset variants the list endpoints accept
+FIELDSET_QUERIES = (
+    {},
+    {'fields': 'title,image,average_rating'},
+    {'fields': 'title,author,created_at', 'expand': 'author'},
+    {'expand': 'author'},
+    {'fields': 'title,is_saved,user_rating'},
+)
+
+
+class CardParityTests(TestCase):
+    """The card fast path must render the same bytes as the serializers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass12345'
+        )
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345',
+            first_name='Ada', bio='Bakes bread'
+        )
+        User.objects.filter(pk=author.pk).update(
+            profile_picture='profile_pictures/cook.jpg',
+            profile_picture_variants={
+                'thumbnails': {'64': {'webp': 'profile_pictures/cook.64.webp'}},
+                'placeholder': 'data:image/webp;base64,AAAA',
+            },
+        )
+
+        cls.recipes = [
+            Recipe.objects.create(
+                title=f'Recipe {index}', description='Tasty', author=author,
+                prep_time=10, cook_time=20 + index, servings=4,
+                difficulty='easy', food_type='dessert', is_public=True,
+            )
+            for index in range(3)
+        ]
+        Recipe.objects.filter(pk=cls.recipes[0].pk).update(
+            image='recipe_images/cake.jpg',
+            image_variants={
+                'thumbnails': {'320': {'webp': 'recipe_images/cake.320.webp'}},
+                'placeholder': 'data:image/webp;base64,BBBB',
+            },
+        )
+        Rating.objects.create(recipe=cls.recipes[0], user=cls.user, rating=Decimal('4.5'))
+        Rating.objects.create(recipe=cls.recipes[0], user=author, rating=Decimal('3.0'))
+        Rating.objects.create(recipe=cls.recipes[1], user=cls.user, rating=Decimal('2.5'))
+        SavedRecipe.objects.create(user=cls.user, recipe=cls.recipes[0])
+        SavedRecipe.objects.create(user=cls.user, recipe=cls.recipes[2])
+
+    def make_request(self, query, user=None):
+        """Return a DRF request for the recipe list with the given query."""
+        request = Request(APIRequestFactory().get('/api/recipes/', query))
+        if user is not None:
+            request.user = user
+        return request
+
+    def assertSameBytes(self, serialized, rendered):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(serialized), renderer.render(rendered))
+
+    def check_recipe_cards(self, query, user=None):
+        request = self.make_request(query, user)
+        fields, expand = parse_fieldset(request, personalize=True)
+        queryset = Recipe.objects.filter(is_public=True).order_by('-created_at', '-id')
+        if user is not None:
+            queryset = annotate_user_state(queryset, user, fields)
+
+        serialized = RecipeListSerializer(
+            queryset, many=True,
+            context={'request': request, 'fields': fields, 'expand': expand}
+        ).data
+        rendered = render_cards(card_rows(queryset, fields, expand), fields, expand, request)
+        self.assertSameBytes(serialized, rendered)
+        return rendered
+
+    def test_recipe_cards_match_serializer(self):
+        for query in FIELDSET_QUERIES:
+            with self.subTest(query=query):
+                cards = self.check_recipe_cards(query)
+                self.assertNotIn('is_saved', cards[0])
+
+    def test_personalized_cards_match_serializer(self):
+        for query in FIELDSET_QUERIES:
+            with self.subTest(query=query):
+                self.check_recipe_cards(query, self.user)
+
+        cards = {card['id']: card for card in self.check_recipe_cards({}, self.user)}
+        self.assertIs(cards[self.recipes[0].pk]['is_saved'], True)
+        self.assertEqual(cards[self.recipes[0].pk]['user_rating'], Decimal('4.5'))
+        self.assertIs(cards[self.recipes[1].pk]['is_saved'], False)
+        self.assertIsNone(cards[self.recipes[2].pk]['user_rating'])
+
+    def test_saved_cards_match_serializer(self):
+        for query in FIELDSET_QUERIES:
+            with self.subTest(query=query):
+                request = self.make_request(query, self.user)
+                fields, expand = parse_fieldset(request)
+                queryset = SavedRecipe.objects.filter(user=self.user).order_by('-saved_at', '-id')
+
+                serialized = SavedRecipeSerializer(
+                    queryset, many=True,
+                    context={'request': request, 'fields': fields, 'expand': expand}
+                ).data
+                rendered = render_saved_cards(
+                    saved_card_rows(queryset, fields, expand), fields, expand, request
+                )
+                self.assertSameBytes(serialized, rendered)
+
+
+class IngredientCatalogDeltaTests(TestCase):
+    """Deltas must work for versions issued by another worker process."""
+
+    def setUp(self):
+        self.category = IngredientCategory.objects.create(name='Dairy')
+        self.butter = IngredientItem.objects.create(name='Butter', category=self.category)
+        self.milk = IngredientItem.objects.create(name='Milk', category=self.category)
+        self.addCleanup(self.start_process)
+
+    def start_process(self):
+        """Forget this process's snapshot and local cache, like a new worker."""
+        ingredient_catalog._snapshot = None
+        cache.clear()
+
+    def get_catalog(self, since_version=None):
+        query = {} if since_version is None else {'since_version': since_version}
+        response = APIClient().get('/api/ingredients/catalog/', query, SERVER_NAME='localhost')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_delta_since_version_from_other_process(self):
+        # Process B builds its snapshot, then process A serves the full catalog
+        self.start_process()
+        self.get_catalog()
+        worker_b = ingredient_catalog._snapshot
+
+        self.start_process()
+        issued = self.get_catalog()
+        self.assertTrue(issued['full'])
+        self.assertEqual(issued['version'], str(worker_b.version))
+
+        # A write lands, and the client syncs against process B
+        self.milk.description = 'Whole milk'
+        self.milk.save()
+        ingredient_catalog._snapshot = worker_b
+        cache.clear()
+
+        delta = self.get_catalog(since_version=issued['version'])
+        self.assertFalse(delta['full'])
+        self.assertEqual(delta['since_version'], issued['version'])
+        self.assertEqual([item['id'] for item in delta['items']], [self.milk.pk])
+        self.assertEqual(delta['categories'], [])
+
+
+@override_settings(ROOT_URLCONF='recipe_app.asgi_urls')
+class AsyncViewTests(TestCase):
+    """The async views must not run blocking work on the event loop."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = IngredientCategory.objects.create(name='Spices')
+        IngredientItem.objects.create(name='Cumin', category=category)
+        IngredientItem.objects.create(name='Paprika', category=category)
+
+    def setUp(self):
+        ingredient_catalog._snapshot = None
+        self.addCleanup(setattr, ingredient_catalog, '_snapshot', None)
+
+    async def test_ingredient_categories(self):
+        response = await AsyncClient().get('/api/ingredients/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Spices'])
+
+    async def test_throttled_request(self):
+        caches['throttle'].clear()
+        client = AsyncClient()
+        # The 'search' route class allows a burst of 20
+        for _ in range(20):
+            response = await client.get('/api/recipes/', {'search': 'stew'})
+            self.assertEqual(response.status_code, 200)
+        response = await client.get('/api/recipes/', {'search': 'stew'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    async def test_ingredient_items(self):
+        client = AsyncClient()
+        # The second request is answered from the snapshot after the version check
+        for _ in range(2):
+            response = await client.get('/api/ingredients/', {'search': 'pap'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['name'] for row in response.json()['results']], ['Paprika'])
+
+
+class ChangeFeedTests(TestCase):
+    """Cursors must follow commit order, so a slow write is never skipped."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+
+    def create_recipe(self, title):
+        return Recipe.objects.create(
+            title=title, description='Tasty', author=self.author, prep_time=5,
+            cook_time=10, servings=2, difficulty='easy', food_type='dinner',
+            is_public=True,
+        )
+
+    def get_changes(self, since=None):
+        query = {} if since is None else {'since': since}
+        response = APIClient().get('/api/changes/', query, SERVER_NAME='localhost')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_upserts_and_tombstones(self):
+        cursor = self.get_changes()['cursor']
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe('Soup')
+        feed = self.get_changes(cursor)
+        self.assertEqual(
+            [(change['type'], change['id'], change['action']) for change in feed['changes']],
+            [('recipe', recipe.pk, 'upsert')]
+        )
+        self.assertEqual(feed['changes'][0]['data']['title'], 'Soup')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.is_public = False
+            recipe.save()
+        feed = self.get_changes(feed['cursor'])
+        self.assertEqual(
+            [(change['id'], change['action']) for change in feed['changes']],
+            [(recipe.pk, 'delete')]
+        )
+
+    def test_late_commit_is_not_skipped(self):
+        cursor = self.get_changes()['cursor']
+        # The slow write gets the lower id but commits after the fast one
+        with self.captureOnCommitCallbacks():
+            slow = self.create_recipe('Slow')
+            fast = self.create_recipe('Fast')
+        slow_entry = ChangeLogEntry.objects.get(model='recipe', object_id=slow.pk)
+        slow_id = slow_entry.pk
+        slow_entry.delete()
+        assign_sequences()
+
+        feed = self.get_changes(cursor)
+        self.assertEqual([change['id'] for change in feed['changes']], [fast.pk])
+
+        slow_entry.pk = slow_id
+        slow_entry.save(force_insert=True)
+        assign_sequences()
+
+        feed = self.get_changes(feed['cursor'])
+        self.assertEqual([change['id'] for change in feed['changes']], [slow.pk])
+
+
+@override_settings(RECIPE_CATALOG_ENABLED=True)
+class RecipeCatalogTests(TestCase):
+    """The columnar catalog must follow writes from any worker incrementally."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                title=title, description='Tasty', author=author, prep_time=5,
+                cook_time=10, servings=2, difficulty='easy', food_type='dinner',
+                is_public=True,
+            )
+            for title in ('Stew', 'Pie', 'Salad')
+        ]
+        assign_sequences()
+
+    def setUp(self):
+        self.catalog = catalog.RecipeCatalog()
+        self.catalog.refresh()
+
+    def test_applies_changes_from_the_log(self):
+        stew, pie, salad = self.recipes
+        columns = self.catalog.columns
+        built_at = self.catalog.built_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pie.food_type = 'dessert'
+            pie.save()
+            salad.is_public = False
+            salad.save()
+        self.catalog.refresh()
+
+        self.assertEqual(self.catalog.built_at, built_at)
+        self.assertEqual(list(self.catalog.select({'food_type': 'dessert'})), [pie.pk])
+        self.assertEqual(list(self.catalog.select({'food_type': 'dinner'})), [stew.pk])
+        # The previous columns are left intact for requests still reading them
+        self.assertEqual(len(columns.select({})), 3)
+
+    def test_rebuilds_when_cursor_was_purged(self):
+        built_at = self.catalog.built_at
+        with self.captureOnCommitCallbacks(execute=True):
+            for recipe in self.recipes[:2]:
+                recipe.cook_time = 45
+                recipe.save()
+        # The purge job keeps only the newest entry
+        head = ChangeLogEntry.objects.latest('sequence').sequence
+        ChangeLogEntry.objects.exclude(sequence=head).delete()
+        self.catalog.refresh()
+
+        self.assertGreater(self.catalog.built_at, built_at)
+        self.assertEqual(len(self.catalog.select({'max_cook_time': 30})), 1)
+
+
+class RecipeConversionTests(TestCase):
+    """Cached conversions must always match the ingredients being returned."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        cls.recipe = Recipe.objects.create(
+            title='Pancakes', description='Fluffy', author=author, prep_time=5,
+            cook_time=10, servings=2, difficulty='easy', food_type='breakfast',
+            is_public=True,
+        )
+        category = IngredientCategory.objects.create(name='Baking')
+        cls.flour = IngredientItem.objects.create(name='Flour', category=category)
+        cls.milk = IngredientItem.objects.create(name='Milk', category=category)
+        RecipeIngredient.objects.create(
+            recipe=cls.recipe, ingredient=cls.flour, amount='1', unit='cup'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_ingredients(self):
+        response = APIClient().get(
+            f'/api/recipes/{self.recipe.pk}/', {'servings': 4}, SERVER_NAME='localhost'
+        )
+        self.assertEqual(response.status_code, 200)
+        rows = json.loads(response.content)['ingredients']
+        return [(row['amount'], row['unit']) for row in rows]
+
+    def test_ingredient_changes_between_requests(self):
+        self.assertEqual(self.get_ingredients(), [('2', 'cup')])
+        RecipeIngredient.objects.create(
+            recipe=self.recipe, ingredient=self.milk, amount='3', unit='tbsp'
+        )
+        self.assertEqual(self.get_ingredients(), [('2', 'cup'), ('6', 'tbsp')])
+
+    def test_stale_rows_are_not_cached_under_a_version(self):
+        data = RecipeDetailSerializer(self.recipe).data
+        # A stale read of the rows lands under the same version as a fresh one
+        stale = convert_recipe({**data, 'ingredients': []}, servings=4, version=7)
+        self.assertEqual(stale['ingredients'], [])
+
+        fresh = convert_recipe(data, servings=4, version=7)
+        self.assertEqual(
+            [(row['amount'], row['unit']) for row in fresh['ingredients']], [('2', 'cup')]
+        )
+
+
+class AsyncReadPathTests(TestCase):
+    """The async views must answer exactly like the DRF views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        cls.recipe = Recipe.objects.create(
+            title='Chili', description='Spicy', author=author, prep_time=15,
+            cook_time=60, servings=4, difficulty='medium', food_type='dinner',
+            is_public=True,
+        )
+        Recipe.objects.create(
+            title='Secret', description='Hidden', author=author, prep_time=5,
+            cook_time=5, servings=1, difficulty='easy', food_type='dinner',
+            is_public=False,
+        )
+        category = IngredientCategory.objects.create(name='Pantry')
+        beans = IngredientItem.objects.create(name='Beans', category=category)
+        RecipeIngredient.objects.create(
+            recipe=cls.recipe, ingredient=beans, amount='2', unit='cup'
+        )
+        Rating.objects.create(recipe=cls.recipe, user=author, rating=Decimal('4.0'))
+        Comment.objects.create(recipe=cls.recipe, user=author, text='Family favourite')
+
+    def assertSameResponse(self, path, query=None):
+        async def get():
+            return await AsyncClient().get(path, query)
+
+        expected = APIClient().get(path, query)
+        with override_settings(ROOT_URLCONF='recipe_app.asgi_urls'):
+            response = async_to_sync(get)()
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        return response.json()
+
+    def test_recipe_list(self):
+        data = self.assertSameResponse('/api/recipes/')
+        self.assertEqual([row['title'] for row in data['results']], ['Chili'])
+        self.assertSameResponse('/api/recipes/', {'fields': 'title,author', 'expand': 'author'})
+
+    def test_recipe_detail(self):
+        path = f'/api/recipes/{self.recipe.pk}/'
+        self.assertEqual(self.assertSameResponse(path)['title'], 'Chili')
+        self.assertSameResponse(path, {'units': 'metric', 'servings': 2})
+        secret = Recipe.objects.get(title='Secret')
+        self.assertSameResponse(f'/api/recipes/{secret.pk}/')
+
+    def test_recipe_comments(self):
+        data = self.assertSameResponse(f'/api/recipes/{self.recipe.pk}/comments/')
+        self.assertEqual([row['text'] for row in data], ['Family favourite'])
+
+
+class RendererTests(TestCase):
+    """The fast renderers must encode like DRF's JSON renderer."""
+
+    data = {
+        'rating': Decimal('4.50'),
+        'created_at': datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc),
+        'title': 'Cr\u00e8me br\u00fbl\u00e9e \u2028 line',
+        'tags': ['a', None, 3, 1.5, True],
+        1: 'integer key',
+    }
+
+    def test_fast_json_matches_drf(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertIn(b'\\u2028', FastJSONRenderer().render(self.data))
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, 'application/json; indent=2'),
+            JSONRenderer().render(self.data, 'application/json; indent=2'),
+        )
+
+    def test_msgpack_response(self):
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        Recipe.objects.create(
+            title='Toast', description='Crisp', author=author, prep_time=1,
+            cook_time=2, servings=1, difficulty='easy', food_type='breakfast',
+            is_public=True,
+        )
+        response = APIClient().get('/api/recipes/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(data, APIClient().get('/api/recipes/').json())
+
+
+class RecipePageTests(TestCase):
+    """Server-rendered recipe pages must stop serving recipes made private."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        cls.recipe = Recipe.objects.create(
+            title='Focaccia', description='Olive oil bread', author=author,
+            prep_time=30, cook_time=25, servings=8, difficulty='medium',
+            food_type='bread', is_public=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_private_recipe_is_not_revalidated_or_cached(self):
+        path = f'/recipes/{self.recipe.pk}'
+        response = self.client.get(path)
+        self.assertContains(response, 'Focaccia')
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertNotIn('stale-while-revalidate', response['Cache-Control'])
+        etag = response['ETag']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # The ETag and cached HTML both survive, as the version is unchanged
+        Recipe.objects.filter(pk=self.recipe.pk).update(is_public=False)
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Focaccia')
+        self.assertNotIn('ETag', response)
+        self.assertNotContains(self.client.get(path), 'Focaccia')
+
+
+class CatalogSnapshotTests(TestCase):
+    """Snapshot builds must pick up changes from the change feed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                title=title, description='Tasty', author=author, prep_time=5,
+                cook_time=10, servings=2, difficulty='easy', food_type='lunch',
+                is_public=True,
+            )
+            for title in ('Wrap', 'Bowl')
+        ]
+        assign_sequences()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        settings = override_settings(
+            CATALOG_SNAPSHOT_ROOT=os.path.join(self.root, 'catalog'),
+            CATALOG_SNAPSHOT_STATE_FILE=os.path.join(self.root, 'state.json'),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def read_bundle(self):
+        with open(os.path.join(self.root, 'catalog', 'latest.json'), 'rb') as pointer:
+            version = json.load(pointer)['version']
+        with open(os.path.join(self.root, 'catalog', f'catalog.{version}.json'), 'rb') as bundle:
+            return json.load(bundle)
+
+    def test_incremental_build(self):
+        first = build_snapshot()
+        self.assertEqual((first['recipes'], first['changed']), (2, 2))
+        self.assertEqual(
+            sorted(card['title'] for card in self.read_bundle()['recipes']), ['Bowl', 'Wrap']
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[0].title = 'Big wrap'
+            self.recipes[0].save()
+            self.recipes[1].is_public = False
+            self.recipes[1].save()
+        second = build_snapshot()
+        self.assertEqual((second['recipes'], second['changed']), (1, 2))
+        self.assertNotEqual(second['version'], first['version'])
+        self.assertEqual([card['title'] for card in self.read_bundle()['recipes']], ['Big wrap'])
+
+        # Nothing changed since, so the current bundle is kept
+        self.assertIsNone(build_snapshot()['version'])
@@ -0,0 +1,340 @@
+"""
+Unit conversion and servings scaling for recipe ingredients.
+
+Uses the same imperial and metric tables and rounding rules as the React
+app (frontend/src/utils/unitConversion.js), so API clients get the amounts
+the recipe page shows. Amounts are stored as free text, so they are parsed
+first ("2", "1.5", "1/2", "1 1/2", "1½"); amounts that cannot be parsed
+("2-3", "a handful") are returned unchanged.
+
+canonicalize() also fills the numeric RecipeIngredient.quantity and
+canonical_quantity/canonical_unit columns (millilitres, grams, pieces) on
+write, so aggregation can run as SQL arithmetic.
+
+The recipe detail endpoint applies this to a whole ingredient list at once
+(?units=metric&servings=8) and memoizes the converted amounts per recipe
+version, target system and servings.
+"""
+import math
+import re
+
+from django.core.cache import cache
+from rest_framework.exceptions import ValidationError
+
+METRIC = 'metric'
+IMPERIAL = 'imperial'
+SYSTEMS = (METRIC, IMPERIAL)
+
+# Largest servings value accepted for scaling
+MAX_SERVINGS = 100
+
+# Converted amounts are keyed by recipe version, which ingredient writes bump,
+# so entries only need a timeout to bound memory
+CONVERSION_CACHE_TIMEOUT = 3600
+
+# Imperial (and already metric) units: (metric unit, factor)
+CONVERSIONS = {
+    # Volume
+    'cup': ('ml', 236.588),
+    'tablespoon': ('ml', 14.787),
+    'tbsp': ('ml', 14.787),
+    'teaspoon': ('ml', 4.929),
+    'tsp': ('ml', 4.929),
+    'fluid ounce': ('ml', 29.574),
+    'fl oz': ('ml', 29.574),
+    'pint': ('ml', 473.176),
+    'quart': ('l', 0.946),
+    'gallon': ('l', 3.785),
+
+    # Weight
+    'ounce': ('g', 28.35),
+    'oz': ('g', 28.35),
+    'pound': ('g', 453.592),
+    'lb': ('g', 453.592),
+    'lbs': ('g', 453.592),
+
+    # Already metric (return as-is)
+    'ml': ('ml', 1),
+    'milliliter': ('ml', 1),
+    'l': ('l', 1),
+    'liter': ('l', 1),
+    'g': ('g', 1),
+    'gram': ('g', 1),
+    'kg': ('kg', 1),
+    'kilogram': ('kg', 1),
+}
+
+# Metric (and already imperial) units: (imperial unit, factor)
+REVERSE_CONVERSIONS = {
+    # Volume
+    'ml': ('cup', 0.00423),
+    'l': ('quart', 1.057),
+
+    # Weight
+    'g': ('oz', 0.0353),
+    'kg': ('lb', 2.205),
+
+    # Already imperial (return as-is)
+    'cup': ('cup', 1),
+    'tablespoon': ('tablespoon', 1),
+    'tbsp': ('tbsp', 1),
+    'teaspoon': ('teaspoon', 1),
+    'tsp': ('tsp', 1),
+    'oz': ('oz', 1),
+    'ounce': ('ounce', 1),
+    'lb': ('lb', 1),
+    'pound': ('pound', 1),
+}
+
+IMPERIAL_UNITS = frozenset((
+    'cup', 'tablespoon', 'tbsp', 'teaspoon', 'tsp', 'oz', 'ounce', 'lb', 'pound',
+    'lbs', 'pint', 'quart', 'gallon', 'fl oz', 'fluid ounce',
+))
+METRIC_UNITS = frozenset(('ml', 'milliliter', 'l', 'liter', 'g', 'gram', 'kg', 'kilogram'))
+
+# Count-based units are never converted and are rounded to whole numbers
+COUNT_UNITS = frozenset(('piece', 'pieces', 'pinch', 'dash', 'whole', 'slice', 'clove', 'to taste'))
+
+# Units stored in RecipeIngredient.canonical_unit: (canonical unit, factor)
+CANONICAL_UNITS = {
+    # Volume, in millilitres
+    'ml': ('ml', 1),
+    'milliliter': ('ml', 1),
+    'l': ('ml', 1000),
+    'liter': ('ml', 1000),
+    'cup': ('ml', 236.588),
+    'tablespoon': ('ml', 14.787),
+    'tbsp': ('ml', 14.787),
+    'teaspoon': ('ml', 4.929),
+    'tsp': ('ml', 4.929),
+    'fluid ounce': ('ml', 29.574),
+    'fl oz': ('ml', 29.574),
+    'pint': ('ml', 473.176),
+    'quart': ('ml', 946.353),
+    'gallon': ('ml', 3785.41),
+
+    # Weight, in grams
+    'g': ('g', 1),
+    'gram': ('g', 1),
+    'kg': ('g', 1000),
+    'kilogram': ('g', 1000),
+    'ounce': ('g', 28.35),
+    'oz': ('g', 28.35),
+    'pound': ('g', 453.592),
+    'lb': ('g', 453.592),
+    'lbs': ('g', 453.592),
+
+    # Counts
+    'piece': ('piece', 1),
+    'pieces': ('piece', 1),
+    'whole': ('piece', 1),
+}
+
+UNICODE_FRACTIONS = {
+    '½': '1/2', '⅓': '1/3', '⅔': '2/3', '¼': '1/4', '¾': '3/4',
+    '⅛': '1/8', '⅜': '3/8', '⅝': '5/8', '⅞': '7/8',
+}
+
+_AMOUNT_RE = re.compile(r'^(?:(\d+)\s+)?(\d+(?:\.\d+)?)(?:\s*/\s*(\d+))?$')
+
+
+def parse_amount(text):
+    """Parse a free-text amount into a number, or return None."""
+    if text is None:
+        return None
+    text = str(text).strip()
+    for char, fraction in UNICODE_FRACTIONS.items():
+        text = text.replace(char, f' {fraction}')
+    match = _AMOUNT_RE.match(text.strip())
+    if match is None:
+        return None
+    whole, numerator, denominator = match.groups()
+    if denominator is None:
+        if whole is not None:
+            return None
+        return float(numerator)
+    if '.' in numerator or int(denominator) == 0:
+        return None
+    return int(whole or 0) + int(numerator) / int(denominator)
+
+
+def canonicalize(amount, unit):
+    """
+    Return (quantity, canonical_quantity, canonical_unit) for a free-text
+    amount and unit. Volumes become millilitres, weights grams and whole
+    items pieces; other units are kept (lowercased) with the same quantity.
+    """
+    quantity = parse_amount(amount)
+    normalized = ' '.join((unit or '').lower().split())
+    if normalized not in CANONICAL_UNITS and normalized.endswith('s'):
+        # Plurals such as "cups" or "grams"
+        singular = normalized[:-1]
+        if singular in CANONICAL_UNITS:
+            normalized = singular
+    canonical_unit, factor = CANONICAL_UNITS.get(normalized, (normalized, 1))
+    if quantity is None:
+        return None, None, canonical_unit or None
+    return quantity, quantity * factor, canonical_unit or None
+
+
+def _round(num, digits=0):
+    """Round half up like JavaScript's Math.round()."""
+    if not digits:
+        return math.floor(num + 0.5)
+    scale = 10 ** digits
+    return math.floor(num * scale + 0.5) / scale
+
+
+def format_number(num, unit=''):
+    """Round an amount to a readable precision for its unit."""
+    if (unit or '').lower() in COUNT_UNITS:
+        # Scaled counts never round down to nothing
+        return max(1, _round(num)) if num > 0 else 0
+    if num < 0.1:
+        return _round(num, 2)
+    if num < 10:
+        return _round(num, 1)
+    return _round(num)
+
+
+def convert_to_metric(amount, unit):
+    """Convert an amount to metric units; returns (amount, unit)."""
+    normalized = (unit or '').lower().strip()
+    if normalized in COUNT_UNITS:
+        return format_number(amount, normalized), normalized
+
+    conversion = CONVERSIONS.get(normalized)
+    if conversion is None or normalized not in IMPERIAL_UNITS:
+        # Unknown, metric and count units are returned as-is
+        return format_number(amount, unit), unit
+
+    final_unit, factor = conversion
+    final_amount = format_number(amount * factor, final_unit)
+
+    # Switch to larger units for large values
+    if final_unit == 'ml' and final_amount >= 1000:
+        final_amount, final_unit = format_number(final_amount / 1000, 'l'), 'l'
+    elif final_unit == 'g' and final_amount >= 1000:
+        final_amount, final_unit = format_number(final_amount / 1000, 'kg'), 'kg'
+    return final_amount, final_unit
+
+
+def convert_to_imperial(amount, unit):
+    """Convert an amount to imperial units; returns (amount, unit)."""
+    normalized = (unit or '').lower().strip()
+    if normalized in COUNT_UNITS:
+        return format_number(amount, normalized), normalized
+
+    conversion = REVERSE_CONVERSIONS.get(normalized)
+    if conversion is None or normalized not in METRIC_UNITS:
+        # Unknown, imperial and count units are returned as-is
+        return format_number(amount, unit), unit
+
+    final_unit, factor = conversion
+    converted = amount * factor
+
+    # Switch to smaller or larger units where they read better
+    if final_unit == 'cup' and converted < 0.25:
+        converted, final_unit = converted * 16, 'tbsp'
+        if converted < 1:
+            converted, final_unit = converted * 3, 'tsp'
+    elif final_unit == 'oz' and converted >= 16:
+        converted, final_unit = converted / 16, 'lb'
+    return format_number(converted, final_unit), final_unit
+
+
+def _amount_text(num):
+    """Render a rounded amount like the stored free-text amounts ("2", "0.5")."""
+    return f'{num:.2f}'.rstrip('0').rstrip('.')
+
+
+def convert_ingredients(rows, system=None, factor=1):
+    """
+    Scale and convert serialized ingredient rows in one pass.
+
+    Returns an (amount, unit) pair per row, in order. Rows whose amount
+    cannot be parsed keep their amount and unit.
+    """
+    converters = {METRIC: convert_to_metric, IMPERIAL: convert_to_imperial}
+    converted = []
+    for row in rows:
+        # Prefer the quantity parsed on write (RecipeIngredient.quantity)
+        amount = row.get('quantity')
+        if amount is None:
+            amount = parse_amount(row.get('amount'))
+        unit = row.get('unit')
+        if amount is None:
+            converted.append((row.get('amount'), unit))
+            continue
+        if system is not None:
+            amount, unit = converters[system](amount * factor, unit)
+        else:
+            amount = format_number(amount * factor, unit)
+        converted.append((_amount_text(amount), unit))
+    return converted
+
+
+def parse_conversion_params(params):
+    """
+    Read the conversion query parameters; returns (system, servings).
+
+    Query Parameters:
+        - units: Target measurement system, "metric" or "imperial"
+        - servings: Number of servings to scale the ingredients to
+    """
+    system = params.get('units') or None
+    if system is not None and system not in SYSTEMS:
+        raise ValidationError({'units': f'Must be one of: {", ".join(SYSTEMS)}.'})
+
+    servings = params.get('servings') or None
+    if servings is not None:
+        try:
+            servings = int(servings)
+        except ValueError:
+            servings = 0
+        if not 1 <= servings <= MAX_SERVINGS:
+            raise ValidationError(
+                {'servings': f'Must be a whole number from 1 to {MAX_SERVINGS}.'}
+            )
+    return system, servings
+
+
+def convert_recipe(data, system=None, servings=None, version=None):
+    """
+    Return serialized recipe detail data with its ingredients converted to
+    system and scaled to servings. Recipes without servings are not scaled.
+
+    Pass the recipe version read before data was loaded; conversions are
+    cached under it. Each cache entry keeps the rows it was computed from,
+    so data that does not match them (a read that raced a write, or one
+    from a lagging replica) is converted afresh instead of reusing it.
+    """
+    if not data.get('servings'):
+        servings = None
+    if system is None and servings is None:
+        return data
+
+    if version is None:
+        # Imported here: recipes.cache imports the models, which import this module
+        from .cache import get_recipe_version
+        version = get_recipe_version(data['id'])
+
+    rows = data['ingredients']
+    source = [(row['id'], row.get('amount'), row.get('unit')) for row in rows]
+    key = f"recipes:ingredients:{data['id']}:{version}:{system or ''}:{servings or ''}"
+    cached = cache.get(key)
+    if cached is not None and cached[0] == source:
+        converted = cached[1]
+    else:
+        factor = servings / data['servings'] if servings else 1
+        converted = convert_ingredients(rows, system, factor)
+        cache.set(key, (source, converted), CONVERSION_CACHE_TIMEOUT)
+
+    data = dict(data)
+    data['ingredients'] = [
+        {**row, 'amount': amount, 'unit': unit}
+        for row, (amount, unit) in zip(rows, converted)
+    ]
+    if servings is not None:
+        data['servings'] = servings
+    return data
@@ -6,13 +6,18 @@ urlpatterns = [
     path('recipes/<int:pk>/', views.RecipeDetailView.as_view(), name='recipe-detail'),
     path('recipes/my-recipes/', views.UserRecipeListView.as_view(), name='user-recipes'),
     path('recipes/recommended/', views.recommended_recipes, name='recommended-recipes'),
+    path('recipes/facets/', views.recipe_facets, name='recipe-facets'),
     path('recipes/<int:recipe_id>/rate/', views.rate_recipe, name='rate-recipe'),
     path('recipes/<int:recipe_id>/rate/delete/', views.delete_rating, name='delete-rating'),
     path('recipes/<int:recipe_id>/save/', views.save_recipe, name='save-recipe'),
     path('recipes/<int:recipe_id>/unsave/', views.unsave_recipe, name='unsave-recipe'),
     path('recipes/<int:recipe_id>/comments/', views.recipe_comments, name='recipe-comments'),
+    path('changes/', views.change_feed, name='change-feed'),
     path('comments/<int:comment_id>/', views.delete_comment, name='delete-comment'),
+    path('me/shopping-list/', views.shopping_list, name='shopping-list'),
     path('saved-recipes/', views.SavedRecipeListView.as_view(), name='saved-recipes'),
     path('ingredients/categories/', views.IngredientCategoryListView.as_view(), name='ingredient-categories'),
     path('ingredients/', views.IngredientItemListView.as_view(), name='ingredient-items'),
+    path('ingredients/suggest/', views.ingredient_suggest, name='ingredient-suggest'),
+    path('ingredients/catalog/', views.ingredient_catalog, name='ingredient-catalog'),
 ]
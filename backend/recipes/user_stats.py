@@ -0,0 +1,97 @@
+"""
+Denormalized author stats (users.models.UserStats).
+
+Recipe, rating and save writes queue a background job that recomputes the
+stats of the affected author, so the request that made the write only pays
+for the job insert; the dedup key keeps one queued refresh per author or
+recipe however many writes land before a worker runs it. A daily job
+recomputes every user's stats to correct drift from writes that skip
+signals (queryset update() and bulk operations).
+
+Only public recipes count: recipe_count is the number of public recipes,
+saves_received and ratings_received the saves and ratings of those recipes.
+Stats are recomputed with three grouped queries per batch of users.
+"""
+from django.db.models import Count, Sum
+
+from jobs.queue import task
+from users.models import User, UserStats
+from .models import Rating, Recipe, SavedRecipe
+
+# Users recomputed per batch of grouped queries
+STATS_BATCH_SIZE = 500
+
+STATS_FIELDS = ['recipe_count', 'saves_received', 'ratings_received', 'rating_total', 'updated_at']
+
+
+def _refresh_batch(user_ids):
+    """Recompute and store the stats of a batch of existing user ids."""
+    public = Recipe.objects.filter(is_public=True, author_id__in=user_ids)
+    recipe_counts = dict(
+        public.values('author_id').annotate(count=Count('id')).values_list('author_id', 'count')
+    )
+    save_counts = dict(
+        SavedRecipe.objects.filter(recipe__in=public)
+        .values('recipe__author_id').annotate(count=Count('id'))
+        .values_list('recipe__author_id', 'count')
+    )
+    ratings = {
+        author_id: (count, total)
+        for author_id, count, total in (
+            Rating.objects.filter(recipe__in=public)
+            .values('recipe__author_id').annotate(count=Count('id'), total=Sum('rating'))
+            .values_list('recipe__author_id', 'count', 'total')
+        )
+    }
+
+    rows = []
+    for user_id in user_ids:
+        rating_count, rating_total = ratings.get(user_id, (0, 0))
+        rows.append(UserStats(
+            user_id=user_id,
+            recipe_count=recipe_counts.get(user_id, 0),
+            saves_received=save_counts.get(user_id, 0),
+            ratings_received=rating_count,
+            rating_total=rating_total or 0,
+        ))
+    UserStats.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['user'], update_fields=STATS_FIELDS
+    )
+
+
+def refresh_user_stats(user_ids=None, batch_size=STATS_BATCH_SIZE):
+    """Recompute the stats of the given users, or of every user; returns the count."""
+    users = User.objects.order_by('pk')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+
+    refreshed = 0
+    last_id = 0
+    while True:
+        # Walk the primary key so each batch is an index range scan
+        batch = list(users.filter(pk__gt=last_id).values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            break
+        _refresh_batch(batch)
+        refreshed += len(batch)
+        last_id = batch[-1]
+    return refreshed
+
+
+@task(max_attempts=3, backoff=10)
+def update_user_stats(user_id=None, recipe_id=None):
+    """Recompute the stats of a user, or of the author of a recipe."""
+    if user_id is None:
+        user_id = Recipe.objects.filter(pk=recipe_id).values_list('author_id', flat=True).first()
+        if user_id is None:
+            # The recipe was deleted; its delete queued the author's refresh
+            return
+    refresh_user_stats([user_id])
+
+
+def schedule_stats_refresh(user_id=None, recipe_id=None):
+    """Queue a stats refresh for a user, or for the author of a recipe."""
+    key = f'user:{user_id}' if user_id is not None else f'recipe:{recipe_id}'
+    update_user_stats.enqueue(
+        user_id=user_id, recipe_id=recipe_id, dedup_key=f'user-stats:{key}'
+    )
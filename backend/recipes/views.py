@@ -4,16 +4,33 @@ Handles API endpoints for recipes, ratings, saved recipes, ingredients, and comm
 """
 # pylint: disable=no-member
 # Django models have dynamically added 'objects' manager and 'DoesNotExist' exception
-from datetime import timedelta
-
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django.db import models
 from django.db.models import Q, Avg
-from django.utils import timezone
+from recipe_app.throttling import throttle_scope
+from .cache import get_recipe_version
+from .catalog import select_page
+from .changes import MAX_PAGE_SIZE, head_cursor, is_expired, read_changes
+from .cards import (
+    CardListMixin, card_rows, render_cards, render_saved_cards, saved_card_rows
+)
+from .facets import compute_facets
+from .fieldsets import SparseFieldsetMixin, annotate_user_state, parse_fieldset
+from .filters import filter_recipes
+from .ingredient_catalog import filter_ingredients, get_ingredient_snapshot
+from .ingredient_search import get_ingredient_index
+from .parsers import MessagePackParser
+from .shopping import build_shopping_list, parse_shopping_params
+from .units import convert_recipe, parse_conversion_params
 from .models import Recipe, Rating, SavedRecipe, IngredientItem, IngredientCategory, Comment
 from .serializers import (
     RecipeListSerializer, RecipeDetailSerializer, RecipeCreateUpdateSerializer,
@@ -21,8 +38,11 @@ from .serializers import (
     IngredientCategorySerializer, CommentSerializer
 )
 
+# Recipe writes also accept MessagePack bodies from internal bulk clients
+RECIPE_WRITE_PARSER_CLASSES = [*api_settings.DEFAULT_PARSER_CLASSES, MessagePackParser]
+
 
-class RecipeListCreateView(generics.ListCreateAPIView):
+class RecipeListCreateView(CardListMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating recipes.
 
@@ -38,79 +58,37 @@ class RecipeListCreateView(generics.ListCreateAPIView):
         - min_rating: Filter by minimum average rating
         - ordering: Sort results (created_at, -created_at, title, -title)
         - page_size: Number of results per page
+        - fields: Comma-separated card fields to return
+        - expand: Return the full author with ?expand=author
+
+    Authenticated users also get is_saved and user_rating on each card.
     """
     queryset = Recipe.objects.filter(is_public=True)
     permission_classes = [IsAuthenticatedOrReadOnly]
+    parser_classes = RECIPE_WRITE_PARSER_CLASSES
+    personalize_fieldset = True
+
     def get_serializer_class(self):
         """Return appropriate serializer based on request method."""
         if self.request.method == 'POST':
             return RecipeCreateUpdateSerializer
         return RecipeListSerializer
 
+    def get_throttle_scope(self, request):
+        """Throttle text searches as their own, stricter route class."""
+        if request.method == 'GET' and request.GET.get('search'):
+            return 'search'
+        return None
+
     def get_queryset(self):
         """
         Get filtered and sorted queryset of recipes.
         Supports multiple filters and ordering options via query parameters.
         """
-        queryset = Recipe.objects.filter(is_public=True)
-
-        # Extract query parameters
-        food_type = self.request.query_params.get('food_type', None)
-        cuisine = self.request.query_params.get('cuisine', None)
-        search = self.request.query_params.get('search', None)
-        min_rating = self.request.query_params.get('min_rating', None)
-        hours_ago = self.request.query_params.get('hours_ago', None)
-        difficulty = self.request.query_params.get('difficulty', None)
-        max_cook_time = self.request.query_params.get('max_cook_time', None)
+        queryset = self.personalize_queryset(Recipe.objects.filter(is_public=True))
+        queryset = filter_recipes(queryset, self.request.query_params)
         ordering = self.request.query_params.get('ordering', '-created_at')
 
-        # Filter by food type (appetizer, main_course, dessert, etc.)
-        if food_type:
-            queryset = queryset.filter(food_type=food_type)
-
-        # Filter by cuisine (italian, mexican, chinese, etc.)
-        if cuisine:
-            queryset = queryset.filter(cuisine=cuisine)
-
-        # Search in title and description
-        if search:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search) |
-                models.Q(description__icontains=search)
-            )
-
-        # Filter by difficulty
-        if difficulty:
-            queryset = queryset.filter(difficulty=difficulty)
-
-        # Filter by maximum cook time
-        if max_cook_time:
-            try:
-                max_time = int(max_cook_time)
-                queryset = queryset.filter(cook_time__lte=max_time)
-            except (ValueError, TypeError):
-                pass  # Invalid max_cook_time parameter, ignore it
-
-        # Filter by minimum rating (4+ stars for featured recipes)
-        if min_rating:
-            try:
-                min_rating_float = float(min_rating)
-                # Use aggregation to filter by average rating
-                queryset = queryset.annotate(
-                    avg_rating=Avg('ratings__rating')
-                ).filter(avg_rating__gte=min_rating_float)
-            except (ValueError, TypeError):
-                pass  # Invalid min_rating parameter, ignore it
-
-        # Filter by time (e.g., last 24 hours for recent recipes)
-        if hours_ago:
-            try:
-                hours = int(hours_ago)
-                cutoff_time = timezone.now() - timedelta(hours=hours)
-                queryset = queryset.filter(created_at__gte=cutoff_time)
-            except (ValueError, TypeError):
-                pass  # Invalid hours_ago parameter, ignore it
-
         # Apply ordering - default to newest first
         # Allowed ordering fields for security
         allowed_orderings = ['created_at', '-created_at', 'title', '-title']
@@ -119,11 +97,46 @@ class RecipeListCreateView(generics.ListCreateAPIView):
 
         return queryset.order_by('-created_at')
 
+    def get_card_rows(self, queryset):
+        """
+        Select the page from the in-memory catalog when it is enabled and
+        can answer the query, hydrating only the selected recipes.
+        """
+        fields, expand = self.get_fieldset()
+        user = self.request.user
+        # The catalog can lag writes made by other workers, so hydrate with the
+        # list's visibility filter; recipes made private since drop off the page
+        page = select_page(
+            self.request.query_params,
+            lambda ids: card_rows(
+                annotate_user_state(
+                    Recipe.objects.filter(id__in=ids, is_public=True), user, fields
+                ),
+                fields, expand
+            )
+        )
+        if page is not None:
+            return page
+        return super().get_card_rows(queryset)
+
     def perform_create(self, serializer):
         """Automatically set the recipe author to the current user."""
         serializer.save(author=self.request.user)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def recipe_facets(request):
+    """
+    Get filter counts for the recipe browser.
+
+    Accepts the same filters as the recipe list and returns counts per
+    cuisine, food_type, difficulty and cook time threshold. Each facet
+    ignores its own filter so alternative choices show their counts.
+    """
+    return Response(compute_facets(request.query_params))
+
+
 class RecipeDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     API view for retrieving, updating, and deleting a single recipe.
@@ -131,9 +144,14 @@ class RecipeDetailView(generics.RetrieveUpdateDestroyAPIView):
     GET: Returns recipe details (public recipes or own recipes)
     PUT/PATCH: Updates recipe (requires authentication and ownership)
     DELETE: Deletes recipe (requires authentication and ownership)
+
+    Query Parameters (GET):
+        - units: Convert ingredient amounts to "metric" or "imperial"
+        - servings: Scale ingredient amounts to this many servings
     """
     queryset = Recipe.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    parser_classes = RECIPE_WRITE_PARSER_CLASSES
 
     def get_serializer_class(self):
         """Return appropriate serializer based on request method."""
@@ -148,23 +166,36 @@ class RecipeDetailView(generics.RetrieveUpdateDestroyAPIView):
         Anonymous users can only see public recipes.
         """
         if self.request.user.is_authenticated:
-            return Recipe.objects.filter(
+            # Saved and rating state are annotated instead of queried per field
+            return annotate_user_state(Recipe.objects.filter(
                 models.Q(is_public=True) | models.Q(author=self.request.user)
-            )
+            ), self.request.user)
         return Recipe.objects.filter(is_public=True)
 
+    def retrieve(self, request, *args, **kwargs):
+        """Return the recipe, with converted and scaled ingredients if requested."""
+        system, servings = parse_conversion_params(request.query_params)
+        # Read before the recipe so cached conversions never outlive its rows
+        version = get_recipe_version(kwargs['pk'])
+        response = super().retrieve(request, *args, **kwargs)
+        response.data = convert_recipe(response.data, system, servings, version)
+        return response
+
 
-class UserRecipeListView(generics.ListAPIView):
+class UserRecipeListView(CardListMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     API view for listing recipes created by the authenticated user.
     Returns all recipes (public and private) owned by the current user.
+    Supports the same ?fields= and ?expand= parameters as the recipe list
+    and returns is_saved and user_rating on each card.
     """
     serializer_class = RecipeListSerializer
     permission_classes = [IsAuthenticated]
+    personalize_fieldset = True
 
     def get_queryset(self):
         """Return all recipes authored by the current user."""
-        return Recipe.objects.filter(author=self.request.user)
+        return self.personalize_queryset(Recipe.objects.filter(author=self.request.user))
 
 
 @api_view(['POST'])
@@ -275,10 +306,11 @@ def unsave_recipe(request, recipe_id):
         )
 
 
-class SavedRecipeListView(generics.ListAPIView):
+class SavedRecipeListView(CardListMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     API view for listing all recipes saved by the authenticated user.
     Returns recipes in the order they were saved.
+    The ?fields= and ?expand= parameters apply to the nested recipe cards.
     """
     serializer_class = SavedRecipeSerializer
     permission_classes = [IsAuthenticated]
@@ -287,44 +319,119 @@ class SavedRecipeListView(generics.ListAPIView):
         """Return all recipes saved by the current user."""
         return SavedRecipe.objects.filter(user=self.request.user)
 
+    def get_card_rows(self, queryset):
+        """Return saved recipe rows with the nested card columns."""
+        return saved_card_rows(queryset, *self.get_fieldset())
+
+    def render_card_rows(self, rows):
+        """Render rows in the shape of SavedRecipeSerializer."""
+        return render_saved_cards(rows, *self.get_fieldset(), self.request)
+
 
 class IngredientCategoryListView(generics.ListAPIView):
     """
     API view for listing all ingredient categories.
     Returns categories like Vegetables, Fruits, Proteins, etc.
+    Served from the in-memory ingredient snapshot.
     """
     queryset = IngredientCategory.objects.all()
     serializer_class = IngredientCategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def list(self, request, *args, **kwargs):
+        """List pre-serialized categories without querying the database."""
+        rows = get_ingredient_snapshot().categories
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(rows)
+
 
 class IngredientItemListView(generics.ListAPIView):
     """
     API view for listing and searching ingredient items.
     Supports filtering by category and search by name.
+    Served from the in-memory ingredient snapshot.
 
     Query Parameters:
         - category: Filter by category name
         - search: Search in ingredient name
     """
+    queryset = IngredientItem.objects.filter(is_active=True)
     serializer_class = IngredientItemSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-    def get_queryset(self):
-        """Return filtered and sorted ingredients."""
-        queryset = IngredientItem.objects.filter(is_active=True)
-        category = self.request.query_params.get('category', None)
-        search = self.request.query_params.get('search', None)
+    def list(self, request, *args, **kwargs):
+        """List pre-serialized ingredients, filtered and sorted by name."""
+        rows = filter_ingredients(get_ingredient_snapshot().items, request.query_params)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(rows)
 
-        # Filter by category name
-        if category:
-            queryset = queryset.filter(category__name__icontains=category)
 
-        # Search by ingredient name
-        if search:
-            queryset = queryset.filter(name__icontains=search)
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def ingredient_suggest(request):
+    """
+    Suggest ingredients for a typeahead.
+
+    Matches names and aliases by exact match, prefix and word prefix, falling
+    back to typo-tolerant trigram matches, and ranks ties by how many recipes
+    use the ingredient.
+
+    Query Parameters:
+        - q: Text typed so far
+        - limit: Maximum number of suggestions (default 10, max 50)
+        - category: Filter by category name
+    """
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
 
-        return queryset.order_by('name')
+    suggestions = get_ingredient_index().suggest(
+        request.query_params.get('q', ''), limit, request.query_params.get('category')
+    )
+    return Response(suggestions)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def ingredient_catalog(request):
+    """
+    Get the whole ingredient catalog (categories and active items).
+
+    Responses carry an ETag and answer If-None-Match with 304. Clients that
+    keep a local copy pass ?since_version=<version> to receive only the
+    categories and items changed since then, plus the ids removed since
+    then; "full" is true when a complete catalog was returned instead.
+    """
+    snapshot = get_ingredient_snapshot()
+
+    try:
+        since_version = int(request.query_params.get('since_version', ''))
+    except ValueError:
+        since_version = None
+
+    if snapshot.can_answer_since(since_version):
+        etag = f'"ingredients-{snapshot.version}-{since_version}"'
+        body = None
+    else:
+        etag = snapshot.etag
+        body = snapshot.body
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            body if body is not None else snapshot.render_since(since_version),
+            content_type='application/json'
+        )
+    response['ETag'] = etag
+    # Clients may reuse their copy but must revalidate it
+    patch_cache_control(response, no_cache=True)
+    return response
 
 
 @api_view(['GET', 'POST'])
@@ -395,6 +502,7 @@ def delete_comment(request, comment_id):
         )
 
 
+@throttle_scope('recommendations')
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def recommended_recipes(request):
@@ -406,7 +514,12 @@ def recommended_recipes(request):
     2. If no saved recipes: Return highly-rated recipes (4+ stars)
     3. Exclude recipes user has already saved or authored
     4. Return top 6 recommendations ordered by rating
+
+    Supports the same ?fields= and ?expand= parameters as the recipe list
+    and returns is_saved and user_rating on each card.
     """
+    fields, expand = parse_fieldset(request, personalize=True)
+
     # Get IDs of recipes the user has saved
     saved_recipes = SavedRecipe.objects.filter(user=request.user).values_list('recipe', flat=True)
 
@@ -414,7 +527,7 @@ def recommended_recipes(request):
         # No saved recipes yet - recommend highly rated recipes
         recommended = Recipe.objects.filter(is_public=True).annotate(
             avg_rating=Avg('ratings__rating')
-        ).filter(avg_rating__gte=4.0).order_by('-avg_rating')[:6]
+        ).filter(avg_rating__gte=4.0).order_by('-avg_rating')
     else:
         # User has saved recipes - find similar ones
         saved_recipe_objs = Recipe.objects.filter(id__in=saved_recipes)
@@ -433,7 +546,76 @@ def recommended_recipes(request):
             author=request.user  # Exclude user's own recipes
         ).annotate(
             avg_rating=Avg('ratings__rating')
-        ).order_by('-avg_rating', '-created_at')[:6]
+        ).order_by('-avg_rating', '-created_at')
+
+    recommended = annotate_user_state(recommended, request.user, fields)
+    rows = card_rows(recommended, fields, expand)[:6]
+    return Response(render_cards(rows, fields, expand, request))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def shopping_list(request):
+    """
+    Get one merged shopping list for several recipes.
+
+    Sums ingredient quantities per ingredient and unit family (volume,
+    weight, count or other unit) and groups them by ingredient category.
+    Ingredients whose amount could not be parsed are counted in "unmeasured".
+
+    Query Parameters:
+        - recipes: Comma-separated recipe ids (default: the user's saved recipes)
+        - servings: Servings for every recipe ("8"), or per recipe ("1:4,2:6")
+        - units: "metric" (default) or "imperial"
+    """
+    recipe_ids, servings, per_recipe, system = parse_shopping_params(request.query_params)
+
+    # Only public recipes and the user's own recipes can be listed
+    recipes = Recipe.objects.filter(Q(is_public=True) | Q(author=request.user))
+    if recipe_ids is None:
+        recipes = recipes.filter(saved_by__user=request.user)
+    else:
+        recipes = recipes.filter(id__in=recipe_ids)
+
+    categories = build_shopping_list(recipes.values('pk'), servings, per_recipe, system)
+    return Response({'units': system, 'categories': categories})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def change_feed(request):
+    """
+    Get changes to the public catalog since a cursor.
+
+    Without ?since=, returns the current cursor only: mirror the catalog
+    once, then sync from that cursor. With ?since=<cursor>, returns the
+    objects (recipe, recipe_ingredient, instruction, rating, comment)
+    changed since then in change order, each once: "upsert" with its
+    current data, or "delete" when it was deleted or its recipe is no longer
+    public. Pass the returned cursor to the next request and repeat while
+    has_more is true. Returns 410 when the cursor is older than the log.
+
+    Query Parameters:
+        - since: Cursor from the previous response
+        - limit: Maximum number of log entries to read (default 500, max 1000)
+    """
+    since = request.query_params.get('since')
+    if not since:
+        return Response({'cursor': str(head_cursor()), 'has_more': False, 'changes': []})
+
+    try:
+        since = int(since)
+        limit = int(request.query_params.get('limit', 500))
+    except ValueError as exc:
+        raise ValidationError({'detail': 'since and limit must be whole numbers.'}) from exc
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+
+    if is_expired(since):
+        return Response(
+            {'detail': 'This cursor has expired. Mirror the catalog again and '
+                       'sync from a new cursor.'},
+            status=status.HTTP_410_GONE
+        )
 
-    serializer = RecipeListSerializer(recommended, many=True, context={'request': request})
-    return Response(serializer.data)
+    changes, cursor, has_more = read_changes(since, limit)
+    return Response({'cursor': str(cursor), 'has_more': has_more, 'changes': changes})
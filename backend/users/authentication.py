@@ -0,0 +1,140 @@
+"""
+JWT authentication with a per-process user cache.
+
+Token validation stays stateless; the user the token refers to is resolved
+from a small TTL/LRU cache keyed by user id, so authenticated requests only
+query the users table on a cache miss. Entries are evicted by the signal
+handlers in users.signals when a user is saved or deleted, and expire after
+JWT_USER_CACHE_TTL seconds to bound staleness across worker processes.
+
+Because request.user may be that stale a copy, views that write the user
+must load it from the database first instead of saving request.user.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """Thread-safe TTL/LRU cache of user instances keyed by user id."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return a copy of the cached user, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Each request gets its own instance so per-request state never leaks
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        """Cache a user, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Remove a user from the cache."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Remove every cached user."""
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'JWT_USER_CACHE_MAX_SIZE', 1024),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves users through the per-process cache."""
+
+    def get_user(self, validated_token):
+        """Return the token's user, querying the database only on a cache miss."""
+        user_id = self._get_user_id(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as exc:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found') from exc
+            user_cache.set(user_id, user)
+
+        return self._check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """Async variant of authenticate() for the ASGI read path."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Async variant of get_user() using the async ORM on a cache miss."""
+        user_id = self._get_user_id(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist as exc:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found') from exc
+            user_cache.set(user_id, user)
+
+        return self._check_user(user, validated_token)
+
+    def _get_user_id(self, validated_token):
+        """Read the user id claim from a validated token."""
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from exc
+
+    def _check_user(self, user, validated_token):
+        """Reject inactive users and tokens issued before a password change."""
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
@@ -9,6 +9,7 @@ class User(AbstractUser):
     last_name = models.CharField(max_length=30, blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     date_joined = models.DateTimeField(auto_now_add=True)
 
     USERNAME_FIELD = 'username'
@@ -16,3 +17,33 @@ class User(AbstractUser):
 
     def __str__(self):
         return str(self.username)
+
+
+class UserStats(models.Model):
+    """
+    Denormalized stats of a user's public recipes, kept up to date by
+    background jobs (recipes/user_stats.py) so author profiles and cards
+    never aggregate per request.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    recipe_count = models.PositiveIntegerField(default=0)
+    saves_received = models.PositiveIntegerField(default=0)
+    ratings_received = models.PositiveIntegerField(default=0)
+    rating_total = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta options for UserStats."""
+        verbose_name_plural = 'User Stats'
+
+    def __str__(self):
+        return f"Stats for {self.user_id}"
+
+    @property
+    def average_rating_received(self):
+        """Average rating across the user's public recipes."""
+        if self.ratings_received:
+            return float(self.rating_total) / self.ratings_received
+        return 0
@@ -1,6 +1,16 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import User
+from recipe_app.images import ImageVariantsField
+from .models import User, UserStats
+
+# Opt-in UserSerializer fields, requested with ?expand=stats
+USER_EXPANDABLE_FIELDS = ('stats',)
+
+
+def parse_user_expand(params):
+    """Return the opt-in user fields requested in the query parameters."""
+    requested = (params.get('expand') or '').split(',')
+    return tuple(name for name in USER_EXPANDABLE_FIELDS if name in requested)
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -29,17 +39,73 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
+class UserStatsSerializer(serializers.ModelSerializer):
+    """Serializer for a user's denormalized recipe stats."""
+    average_rating_received = serializers.FloatField(read_only=True)
+
+    class Meta:
+        """Meta options for UserStatsSerializer."""
+        model = UserStats
+        fields = ('recipe_count', 'saves_received', 'ratings_received', 'average_rating_received')
+        read_only_fields = fields
+
+
 class UserSerializer(serializers.ModelSerializer):
-    """Serializer for user data."""
+    """
+    Serializer for user data.
+    'stats' is only included when the context's expand contains it.
+    """
+    profile_picture_variants = ImageVariantsField('profile_picture')
+    stats = serializers.SerializerMethodField()
+
+    # Opt-in fields included without being requested
+    default_expand = ()
+
     class Meta:
         """Meta options for UserSerializer."""
         model = User
         fields = (
             'id', 'username', 'email', 'first_name', 'last_name', 
-            'bio', 'profile_picture', 'date_joined'
+            'bio', 'profile_picture', 'profile_picture_variants', 'date_joined', 'stats'
         )
         read_only_fields = ('id', 'date_joined')
 
+    def get_fields(self):
+        """Drop opt-in fields that were not requested."""
+        fields = super().get_fields()
+        expand = (*self.default_expand, *self.context.get('expand', ()))
+        for name in USER_EXPANDABLE_FIELDS:
+            if name not in expand:
+                fields.pop(name)
+        return fields
+
+    def get_stats(self, obj):
+        """Return the stored stats; users without a row yet have none."""
+        stats = getattr(obj, 'stats', None) or UserStats(user=obj)
+        return UserStatsSerializer(stats).data
+
+
+class AuthorProfileSerializer(UserSerializer):
+    """Public author profile: user data without the email, with stats."""
+    default_expand = USER_EXPANDABLE_FIELDS
+
+    class Meta(UserSerializer.Meta):
+        """Meta options for AuthorProfileSerializer."""
+        fields = (
+            'id', 'username', 'first_name', 'last_name', 'bio',
+            'profile_picture', 'profile_picture_variants', 'date_joined', 'stats'
+        )
+        read_only_fields = fields
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Compact serializer for authors shown on recipe cards."""
+    class Meta:
+        """Meta options for UserSummarySerializer."""
+        model = User
+        fields = ('id', 'username')
+        read_only_fields = ('id', 'username')
+
 
 class LoginSerializer(serializers.Serializer):
     """Serializer for user login."""
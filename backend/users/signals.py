@@ -0,0 +1,24 @@
+"""
+Signal handlers that keep the authentication user cache in sync.
+Connected in UsersConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from recipe_app.images import schedule_variants
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Evict a user from the cache when it is saved, deactivated or deleted."""
+    user_cache.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+@receiver(post_save, sender=User)
+def process_profile_picture(sender, instance, **kwargs):
+    """Generate thumbnails and placeholder when the profile picture changes."""
+    schedule_variants(instance, 'profile_picture', 'profile_picture_variants')
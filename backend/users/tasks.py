@@ -0,0 +1,12 @@
+"""Housekeeping tasks for user accounts."""
+from datetime import timedelta
+
+from django.core.management import call_command
+
+from jobs.queue import task
+
+
+@task(every=timedelta(days=1))
+def flush_expired_tokens():
+    """Delete expired outstanding and blacklisted refresh tokens."""
+    call_command('flushexpiredtokens')
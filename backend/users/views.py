@@ -1,11 +1,18 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
-from .serializers import UserRegistrationSerializer, UserSerializer, LoginSerializer
+from recipe_app.throttling import throttle_scope
+from .models import User
+from .serializers import (
+    AuthorProfileSerializer, LoginSerializer, UserRegistrationSerializer, UserSerializer,
+    parse_user_expand
+)
 
 
+@throttle_scope('login')
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
@@ -23,6 +30,7 @@ def register(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@throttle_scope('login')
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login(request):
@@ -43,15 +51,38 @@ def login(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def profile(request):
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(
+        request.user, context={'expand': parse_user_expand(request.query_params)}
+    )
     return Response(serializer.data)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def update_profile(request):
-    serializer = UserSerializer(request.user, data=request.data, partial=True)
+    # request.user may be a stale copy from the authentication cache; saving it
+    # would write back every column, so update a fresh row instead
+    user = get_object_or_404(User, pk=request.user.pk)
+    serializer = UserSerializer(
+        user, data=request.data, partial=True,
+        context={'expand': parse_user_expand(request.query_params)}
+    )
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def author_profile(request, user_id):
+    """
+    Get an author's public profile with their recipe stats.
+
+    Stats are read from the denormalized UserStats row, so the profile costs
+    one query however many recipes, saves and ratings the author has.
+    """
+    author = get_object_or_404(
+        User.objects.filter(is_active=True).select_related('stats'), pk=user_id
+    )
+    return Response(AuthorProfileSerializer(author).data)
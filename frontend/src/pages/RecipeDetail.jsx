@@ -11,6 +11,7 @@ import {
 import StarRating from '../components/StarRating';
 import CommentSection from '../components/CommentSection';
 import { convertIngredient, detectMeasurementSystem } from '../utils/unitConversion';
+import { takeInitialState } from '../utils/initialState';
 
 const RecipeDetail = () => {
   const { id } = useParams();
@@ -25,6 +26,8 @@ const RecipeDetail = () => {
     ['recipe', id],
     () => recipesAPI.getRecipe(id),
     {
+      // Server-rendered pages inline the recipe; it is refetched in the background
+      initialData: () => takeInitialState('recipe', (data) => String(data.id) === id),
       select: (response) => response.data,
       onSuccess: (data) => {
         setRating(data.user_rating || 0);
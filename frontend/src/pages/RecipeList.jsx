@@ -2,6 +2,7 @@ import React, { useState } from 'react';
 import { useQuery } from 'react-query';
 import { Link } from 'react-router-dom';
 import { recipesAPI } from '../services/api';
+import { takeInitialState } from '../utils/initialState';
 import { Search, Plus, Clock, Users, Star, ChefHat } from 'lucide-react';
 
 const SocialRecipeCard = ({ recipe }) => {
@@ -138,6 +139,8 @@ const RecipeList = () => {
       return recipesAPI.getRecipes(params);
     },
     {
+      // The server-rendered feed inlines the first unfiltered page
+      initialData: () => takeInitialState('recipes'),
       select: (response) => response.data,
     }
   );
@@ -34,6 +34,36 @@ api.interceptors.request.use(
   }
 );
 
+// Refresh in progress, shared by every request that got a 401 meanwhile
+let refreshPromise = null;
+
+/**
+ * Exchange the refresh token for a new access token, once at a time.
+ * Refresh tokens are rotated and the previous one is blacklisted, so
+ * concurrent 401s must wait for the same refresh instead of each posting
+ * the token again.
+ */
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    refreshPromise = axios
+      .post(`${API_BASE_URL}/auth/token/refresh/`, {
+        refresh: localStorage.getItem('refresh_token'),
+      })
+      .then((response) => {
+        const { access, refresh } = response.data;
+        localStorage.setItem('access_token', access);
+        if (refresh) {
+          localStorage.setItem('refresh_token', refresh);
+        }
+        return access;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 /**
  * Response interceptor - Handles token refresh on 401 errors
  * Automatically refreshes expired access tokens using refresh token
@@ -49,14 +79,8 @@ api.interceptors.response.use(
       originalRequest._retry = true;
       
       try {
-        const refreshToken = localStorage.getItem('refresh_token');
-        if (refreshToken) {
-          const response = await axios.post(`${API_BASE_URL}/auth/token/refresh/`, {
-            refresh: refreshToken,
-          });
-          
-          const { access } = response.data;
-          localStorage.setItem('access_token', access);
+        if (localStorage.getItem('refresh_token')) {
+          const access = await refreshAccessToken();
           
           // Retry original request with new access token
           originalRequest.headers.Authorization = `Bearer ${access}`;
@@ -82,6 +106,8 @@ export const authAPI = {
   register: (userData) => api.post('/auth/register/', userData),
   getProfile: () => api.get('/auth/profile/'),
   updateProfile: (profileData) => api.put('/auth/profile/update/', profileData),
+  // Public profile of any author, with recipe count, saves and ratings received
+  getAuthorProfile: (userId) => api.get(`/auth/users/${userId}/`),
 };
 
 /**
@@ -90,7 +116,8 @@ export const authAPI = {
 export const recipesAPI = {
   // Recipe CRUD operations
   getRecipes: (params = {}) => api.get('/recipes/', { params }),  // Supports search, filters, sorting, pagination
-  getRecipe: (id) => api.get(`/recipes/${id}/`),
+  getRecipeFacets: (params = {}) => api.get('/recipes/facets/', { params }),  // Filter counts for the same filters
+  getRecipe: (id, params = {}) => api.get(`/recipes/${id}/`, { params }),  // Supports units and servings
   createRecipe: (recipeData) => api.post('/recipes/', recipeData),
   updateRecipe: (id, recipeData) => api.put(`/recipes/${id}/`, recipeData),
   deleteRecipe: (id) => api.delete(`/recipes/${id}/`),
@@ -108,9 +135,18 @@ export const recipesAPI = {
   saveRecipe: (id) => api.post(`/recipes/${id}/save/`),
   unsaveRecipe: (id) => api.delete(`/recipes/${id}/unsave/`),
   
+  // Merged shopping list (recipes, servings and units params)
+  getShoppingList: (params = {}) => api.get('/me/shopping-list/', { params }),
+  
   // Ingredient operations
   getIngredientCategories: () => api.get('/ingredients/categories/'),
   getIngredients: (params = {}) => api.get('/ingredients/', { params }),  // Supports category filter and search
+  suggestIngredients: (q, params = {}) => api.get('/ingredients/suggest/', {
+    params: { q, ...params },
+  }),  // Ranked, typo-tolerant typeahead suggestions
+  getIngredientCatalog: (sinceVersion) => api.get('/ingredients/catalog/', {
+    params: sinceVersion ? { since_version: sinceVersion } : {},
+  }),  // Whole catalog, or only changes since a version
   
   // Comment operations
   getComments: (recipeId) => api.get(`/recipes/${recipeId}/comments/`),
@@ -0,0 +1,37 @@
+/**
+ * Initial State Utility
+ *
+ * Reads the API data inlined by the server-rendered recipe pages
+ * (backend/recipes/pages.py) in <script id="initial-state">.
+ * Each entry is used once, as the initial data of the first query
+ * that asks for it; later queries fetch from the API as usual.
+ */
+let initialState = null;
+
+const element = document.getElementById('initial-state');
+if (element) {
+  try {
+    initialState = JSON.parse(element.textContent);
+  } catch (error) {
+    initialState = null;
+  }
+}
+
+/**
+ * Takes an entry of the inlined state, wrapped like an axios response
+ * @param {string} key - State key ('recipe' or 'recipes')
+ * @param {function} [matches] - Optional check that the data fits the query
+ * @returns {object|undefined} { data } or undefined if not available
+ *
+ * @example
+ * useQuery(['recipe', id], fetchRecipe, {
+ *   initialData: () => takeInitialState('recipe', (data) => String(data.id) === id),
+ * })
+ */
+export function takeInitialState(key, matches) {
+  if (!initialState || !(key in initialState)) return undefined;
+  const data = initialState[key];
+  delete initialState[key];
+  if (matches && !matches(data)) return undefined;
+  return { data };
+}